@@ -1,5 +1,5 @@
 # Run with Python 3
-# Copyright 2022 VMware, Inc.  
+# Copyright 2026 VMware, Inc.  
 # SPDX-License-Identifier: BSD-2-Clause
 """\
 HTTP server that can be used as a back end for the Captivity application during
@@ -29,12 +29,18 @@ from harness.server import Main
 # Command handlers.
 from harness.command_handler.base import JSONFileCommandHandler
 from harness.command_handler.fetch import FetchCommandHandler
+from harness.command_handler.record_replay import record_replay
 
 class Captivity(Main):
     # Override.
     def command_handlers(self):
         yield JSONFileCommandHandler(__file__)
-        yield FetchCommandHandler()
+        fetch = FetchCommandHandler(self.arguments.openssl_check)
+        self.server.metrics.add_collector('fetch', fetch.as_dict)
+        fixtures = self.arguments.fixtures
+        # When replaying, fetches that weren't recorded are still fetched.
+        yield fetch if fixtures is None else record_replay(
+            fetch, fixtures, self.arguments.record)
         yield from super().command_handlers()
 
     # Override.
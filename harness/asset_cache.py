@@ -0,0 +1,119 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+In-memory cache of static files for the Captive Web View python harness server.
+
+The cache holds the contents of recently served files, up to a total number of
+bytes, and evicts the least recently used file first. Each cached file has a
+strong entity tag computed from its contents. A cached file is reloaded if its
+modification time or size changes."""
+#
+# Standard library imports, in alphabetic order.
+#
+# Ordered dictionary, used as the LRU list.
+# https://docs.python.org/3/library/collections.html#collections.OrderedDict
+from collections import OrderedDict
+#
+# Module for formatting HTTP dates.
+# https://docs.python.org/3/library/email.utils.html
+import email.utils
+#
+# Cryptographic hash module. Only used to generate entity tags.
+# https://docs.python.org/3/library/hashlib.html
+import hashlib
+#
+# Module for the operating system interface.
+# https://docs.python.org/3/library/os.html
+import os
+#
+# Module for threads and locks.
+# https://docs.python.org/3/library/threading.html
+import threading
+#
+# Module for simple immutable objects with type specification.
+# https://docs.python.org/3/library/typing.html#typing.NamedTuple
+from typing import NamedTuple, Optional
+
+class Asset(NamedTuple):
+    path: str
+    # Contents of the file, or None if the file is too big to cache.
+    data: Optional[bytes]
+    size: int
+    mtime: float
+    mtimeNs: int
+    etag: str
+    lastModified: str
+
+    @classmethod
+    def from_stat(cls, path, stat, data):
+        if data is None:
+            # Weak tag for a file that wasn't read.
+            etag = f'W/"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        else:
+            etag = f'"{hashlib.sha1(data).hexdigest()}"'
+        return cls(
+            path, data, stat.st_size, stat.st_mtime, stat.st_mtime_ns, etag,
+            email.utils.formatdate(stat.st_mtime, usegmt=True))
+
+    def matches(self, stat):
+        return (
+            self.mtimeNs == stat.st_mtime_ns and self.size == stat.st_size)
+
+class AssetCache:
+    def __init__(self, maxBytes, maxEntryBytes=None):
+        self._maxBytes = maxBytes
+        self._maxEntryBytes = (
+            maxBytes // 4 if maxEntryBytes is None else maxEntryBytes)
+        self._assets = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def bytes(self):
+        return self._bytes
+
+    def __len__(self):
+        return len(self._assets)
+
+    def get(self, path):
+        """Asset for the path. Raises OSError if the file can't be read."""
+        key = os.path.abspath(path)
+        stat = os.stat(key)
+        with self._lock:
+            asset = self._assets.get(key)
+            if asset is not None and asset.matches(stat):
+                self._assets.move_to_end(key)
+                self.hits += 1
+                return asset
+            self.misses += 1
+
+        if stat.st_size > self._maxEntryBytes:
+            self._discard(key)
+            return Asset.from_stat(key, stat, None)
+
+        with open(key, 'rb') as file:
+            data = file.read()
+            # Stat again in case the file changed between the stat and the read.
+            stat = os.fstat(file.fileno())
+        if len(data) != stat.st_size:
+            return Asset.from_stat(key, stat, None)
+
+        asset = Asset.from_stat(key, stat, data)
+        with self._lock:
+            previous = self._assets.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._assets[key] = asset
+            self._bytes += asset.size
+            while self._bytes > self._maxBytes:
+                _, evicted = self._assets.popitem(last=False)
+                self._bytes -= evicted.size
+        return asset
+
+    def _discard(self, key):
+        with self._lock:
+            previous = self._assets.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size
@@ -0,0 +1,391 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Server engine for the Captive Web View python harness based on asyncio streams.
+
+All connections are served by one event loop thread, instead of each having a
+thread of its own. The request handler is the same Handler class as the
+threading engine, mixed in with the AsyncioHandlerMixIn, so the directory
+mapping and response rules are the same. The mix-in reads each request from the
+stream, lets the Handler write its response into a memory buffer, and then
+writes the buffer to the stream.
+
+POST commands are dispatched by the handle_command_async() method of the server,
+which runs command handlers that are coroutines in the event loop and runs other
+handlers in an executor thread. GET and HEAD requests for files are also handled
+in an executor thread, so that reading and compressing a file doesn't block the
+loop."""
+#
+# Standard library imports, in alphabetic order.
+#
+# Asynchronous I/O module.
+# https://docs.python.org/3/library/asyncio.html
+import asyncio
+#
+# Thread pool for running blocking command handlers.
+# https://docs.python.org/3/library/concurrent.futures.html#threadpoolexecutor
+from concurrent.futures import ThreadPoolExecutor
+#
+# Module for in-memory binary streams.
+# https://docs.python.org/3/library/io.html#io.BytesIO
+from io import BytesIO
+#
+# Module for the current directory.
+# https://docs.python.org/3/library/os.html#os.getcwd
+import os
+#
+# Module for the event that shutdown() waits on.
+# https://docs.python.org/3/library/threading.html#event-objects
+import threading
+# Module for monotonic time, used to time WebSocket commands.
+# https://docs.python.org/3/library/time.html#time.monotonic
+import time
+#
+# Module for parsing the path of a request.
+# https://docs.python.org/3/library/urllib.parse.html
+from urllib.parse import urlsplit
+#
+# Local imports.
+#
+# Heartbeat of event streams.
+from harness.push import heartbeat
+#
+# Request body reading.
+from harness.request_body import BodyError, read_body_async
+#
+# WebSocket protocol.
+from harness import websocket
+
+class AsyncioServerMixIn:
+    """\
+    Mix-in for a socketserver.TCPServer subclass. The server binds and listens
+    in the usual way but serve_forever() runs an event loop that accepts
+    connections from the listening socket. The RequestHandlerClass must have the
+    AsyncioHandlerMixIn."""
+
+    def __init__(self, *args, executorWorkers=None, **kwargs):
+        self._executorWorkers = executorWorkers
+        self._loop = None
+        self._task = None
+        self._shutdownRequest = False
+        self._isShutDown = threading.Event()
+        super().__init__(*args, **kwargs)
+
+    # Override.
+    def serve_forever(self, poll_interval=0.5):
+        self._isShutDown.clear()
+        self.start_serving()
+        try:
+            asyncio.run(self._serve())
+        finally:
+            self.stop_serving()
+            self._shutdownRequest = False
+            self._isShutDown.set()
+
+    # Override.
+    def shutdown(self):
+        """\
+        Stops the serve_forever() loop and waits until it has stopped. Must be
+        called from a different thread, the same as for a socketserver."""
+        # The request is set before the loop is read, and the loop is set before
+        # the request is read by the _serve() method, so one of them sees the
+        # other whichever thread runs first.
+        self._shutdownRequest = True
+        loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._task.cancel)
+        self._isShutDown.wait()
+
+    async def _serve(self):
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(
+            self._executorWorkers, thread_name_prefix='Executor'))
+        self.socket.setblocking(False)
+        server = await asyncio.start_server(self._connected, sock=self.socket)
+        self._task = asyncio.current_task()
+        self._loop = asyncio.get_running_loop()
+        try:
+            async with server:
+                if not self._shutdownRequest:
+                    await server.serve_forever()
+        except asyncio.CancelledError:
+            # Cancelled by the shutdown() method.
+            pass
+        finally:
+            self._loop = None
+
+    async def _connected(self, reader, writer):
+        handler = self.RequestHandlerClass(reader, writer, self)
+        try:
+            await handler.handle_async()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # Connections that are still open when the server shuts down are
+            # cancelled. Returning normally means the cancellation isn't logged
+            # as an error by the stream.
+            pass
+        except Exception:
+            # Prints the exception, like a socketserver does.
+            self.handle_error(None, handler.client_address)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+class AsyncioHandlerMixIn:
+    """\
+    Mix-in for a BaseHTTPRequestHandler subclass. One instance handles all the
+    requests on one connection."""
+    # Same limit as the BaseHTTPRequestHandler.handle_one_request() method.
+    maxRequestLine = 65536
+
+    def __init__(self, reader, writer, server):
+        # The base class constructor isn't called because it would handle the
+        # request synchronously.
+        self._reader = reader
+        self._writer = writer
+        self._fileResponse = None
+        self._body = b''
+        self.server = server
+        # Same as the SimpleHTTPRequestHandler constructor, which would also set
+        # the directory.
+        self.directory = os.getcwd()
+        self.request = None
+        self.connection = None
+        self.client_address = writer.get_extra_info('peername')
+        self.rfile = BytesIO()
+        self.wfile = BytesIO()
+        self._setup_connection()
+
+    async def handle_async(self):
+        self.close_connection = True
+        await self.handle_one_request_async()
+        while not self.close_connection:
+            await self.handle_one_request_async()
+
+    async def handle_one_request_async(self):
+        self._started = None
+        try:
+            await self._handle_one_request_async()
+        finally:
+            self._end_request()
+
+    async def _handle_one_request_async(self):
+        # This is the asynchronous equivalent of the handle_one_request() method
+        # in the BaseHTTPRequestHandler class.
+        try:
+            head = await asyncio.wait_for(
+                self._reader.readuntil(b'\r\n\r\n'), self.timeout)
+        except asyncio.TimeoutError:
+            self.log_error("Request timed out: %r", "idle")
+            self.close_connection = True
+            return
+        except asyncio.IncompleteReadError:
+            # Connection closed by the client.
+            self.close_connection = True
+            return
+        except asyncio.LimitOverrunError:
+            self.requestline = ''
+            self.request_version = ''
+            self.command = ''
+            self.send_error(431)
+            await self._flush()
+            self.close_connection = True
+            return
+
+        self._requests += 1
+        self._keepAliveError = False
+        self._fileResponse = None
+        self.wfile = BytesIO()
+        self.raw_requestline, _, headerBlock = head.partition(b'\r\n')
+        self.raw_requestline += b'\r\n'
+        if len(self.raw_requestline) > self.maxRequestLine:
+            self.requestline = ''
+            self.request_version = ''
+            self.command = ''
+            self.send_error(414)
+            await self._flush()
+            self.close_connection = True
+            return
+
+        # The parse_request() method reads the headers from the rfile.
+        self.rfile = BytesIO(headerBlock)
+        if not self.parse_request():
+            await self._flush()
+            return
+
+        # For example, a 100 Continue response.
+        if self.wfile.tell() > 0:
+            await self._flush()
+        try:
+            self._body = await read_body_async(
+                self._reader, self.headers, self.server.maxBodyBytes)
+        except BodyError as error:
+            if self.command == 'POST':
+                self._route = ('command', '(none)')
+            self.send_error(error.status, explain=error.message)
+            await self._flush()
+            self.close_connection = True
+            return
+
+        asyncMethod = getattr(self, 'do_async_' + self.command, None)
+        method = getattr(self, 'do_' + self.command, None)
+        if asyncMethod is not None:
+            await asyncMethod()
+        elif method is not None:
+            method()
+        else:
+            self.send_error(501, "Unsupported method (%r)" % self.command)
+        await self._flush()
+
+    async def do_async_GET(self):
+        if urlsplit(self.path).path == self.websocketPath:
+            await self._serve_websocket_async()
+            return
+        channel = self._events_channel()
+        if channel is None:
+            # Static files are stat'ed, read, and maybe compressed on a cache
+            # miss, so they're served in the executor, the same as blocking
+            # command handlers. The response is written to the memory buffer,
+            # and a large file is sent later by the _flush() method.
+            await asyncio.get_running_loop().run_in_executor(None, self.do_GET)
+            return
+        subscription = self._start_events(channel)
+        if subscription is None:
+            return
+        push = self.server.push
+        try:
+            self.wfile.write(heartbeat)
+            await self._flush()
+            while not self._writer.is_closing():
+                events = await subscription.get_async(push.heartbeatInterval)
+                if events is None:
+                    break
+                self._writer.write(
+                    b''.join(event.frame for event in events) if events
+                    else heartbeat)
+                await self._writer.drain()
+        finally:
+            push.unsubscribe(subscription)
+
+    async def do_async_HEAD(self):
+        # The same as the do_async_GET() method.
+        await asyncio.get_running_loop().run_in_executor(None, self.do_HEAD)
+
+    async def _websocket_command_async(self, payload):
+        started = time.monotonic()
+        requestID = None
+        try:
+            requestID, commandObject = self._websocket_request(payload)
+            response = await self.server.handle_command_async(
+                commandObject, self)
+        except Exception as error:
+            return self._websocket_failure(requestID, error, started)
+        return self._websocket_response(
+            requestID, response, self._command_name(commandObject), started)
+
+    async def _serve_websocket_async(self):
+        if not self._start_websocket():
+            return
+        await self._flush()
+        concurrency = asyncio.Semaphore(self.server.websocketConcurrency)
+        tasks = set()
+
+        async def send(header, payload):
+            # Each frame is written in one go, so frames from concurrent
+            # commands can't interleave.
+            self._writer.write(header + payload)
+            await self._writer.drain()
+
+        async def run(payload):
+            try:
+                await send(*await self._websocket_command_async(payload))
+            except ConnectionError:
+                pass
+            finally:
+                concurrency.release()
+
+        parser = websocket.FrameParser(self.server.maxBodyBytes)
+        try:
+            while True:
+                data = await self._reader.read(64 * 1024)
+                if data == b'':
+                    break
+                try:
+                    messages = parser.feed(data)
+                except websocket.ProtocolError as error:
+                    await send(*websocket.frame(websocket.CLOSE, (
+                        websocket.close_payload(error.code, str(error)))))
+                    break
+                for opcode, payload in messages:
+                    if opcode == websocket.CLOSE:
+                        await send(
+                            *websocket.frame(websocket.CLOSE, payload[:2]))
+                        return
+                    if opcode == websocket.PING:
+                        await send(*websocket.frame(websocket.PONG, payload))
+                    elif opcode in (websocket.TEXT, websocket.BINARY):
+                        # Waits while the connection has the maximum number of
+                        # commands running, which stops reading.
+                        await concurrency.acquire()
+                        task = asyncio.create_task(run(payload))
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+        finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    # Override.
+    def _read_body(self):
+        # Read already, by the _handle_one_request_async() method.
+        body = self._body
+        self._body = b''
+        return body
+
+    async def do_async_POST(self):
+        try:
+            content = self._read_content()
+        except BodyError as error:
+            self._route = ('command', '(none)')
+            self.send_error(error.status, explain=error.message)
+            return
+        try:
+            if content is None:
+                self.send_error(400)
+                return
+            try:
+                response = await self.server.handle_command_async(
+                    content, self)
+                if response is not None:
+                    self._send_object(response)
+            except:
+                self.send_error(501)
+                await self._flush()
+                raise
+        finally:
+            # Set after the command is handled, the same as in the do_POST()
+            # method.
+            self._route = ('command', self._command_name(content))
+
+    # Override.
+    def _send_file(self, response):
+        # Sent from the event loop by the _flush() method.
+        self._fileResponse = response
+
+    async def _flush(self):
+        self._writer.write(self.wfile.getvalue())
+        self.wfile = BytesIO()
+        if self._fileResponse is not None:
+            response = self._fileResponse
+            self._fileResponse = None
+            await self._writer.drain()
+            with open(response.path, 'rb') as file:
+                # Uses zero-copy sendfile where the platform and transport
+                # support it, and falls back to reading the file otherwise.
+                # https://docs.python.org/3/library/asyncio-eventloop.html#asyncio.loop.sendfile
+                await asyncio.get_running_loop().sendfile(
+                    self._writer.transport, file, response.start,
+                    response.count)
+        await self._writer.drain()
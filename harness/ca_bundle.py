@@ -0,0 +1,179 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Certificate authority bundles for the Captive Web View python harness.
+
+A bundle is the trusted CA certificates used to verify the servers that the
+harness fetches from. The first available of these is used.
+
+-   keychain, the macOS system keychains. They're exported with the security
+    CLI into a PEM file in the cache directory. The file name has a hash of the
+    keychain modification times and sizes, so the export is reused until a
+    keychain changes. The cache directory is under XDG_CACHE_HOME, if set, or
+    ~/.cache otherwise. If the cache directory can't be written, the export is
+    written to a temporary file that is deleted when the process exits.
+-   certifi, the Mozilla bundle from the certifi module, if it's installed.
+-   system, the default OpenSSL store, for example on Linux."""
+#
+# Standard library imports, in alphabetic order.
+#
+# Module for deleting the temporary export at exit.
+# https://docs.python.org/3/library/atexit.html
+import atexit
+#
+# Cryptographic hash module, for the cache file name.
+# https://docs.python.org/3/library/hashlib.html
+import hashlib
+#
+# Module for environment variables and replacing files.
+# https://docs.python.org/3/library/os.html
+import os
+#
+# Module for OO path handling.
+# https://docs.python.org/3/library/pathlib.html
+from pathlib import Path
+#
+# Module for finding the security CLI.
+# https://docs.python.org/3/library/shutil.html#shutil.which
+import shutil
+#
+# Module for the default OpenSSL store locations.
+# https://docs.python.org/3/library/ssl.html#ssl.get_default_verify_paths
+import ssl
+#
+# Module for spawning a process to run a command.
+# https://docs.python.org/3/library/subprocess.html
+import subprocess
+#
+# Temporary file module, for writing the cache file atomically, and for the
+# export if the cache can't be written.
+# https://docs.python.org/3/library/tempfile.html
+from tempfile import NamedTemporaryFile
+#
+# Module for simple immutable objects with type specification.
+# https://docs.python.org/3/library/typing.html#typing.NamedTuple
+from typing import NamedTuple
+#
+# Optional Mozilla CA bundle.
+# https://github.com/certifi/python-certifi
+try:
+    import certifi
+except ImportError:
+    certifi = None
+
+_rootPath = Path().resolve().root
+# TOTH macOS `security` CLI and how to export the system CA stores:
+# https://stackoverflow.com/a/72053605/7657675
+keychains = (
+    Path(_rootPath, 'System', 'Library', 'Keychains'
+         , 'SystemRootCertificates.keychain'),
+    Path(_rootPath, 'Library', 'Keychains', 'System.keychain')
+)
+
+class CABundle(NamedTuple):
+    # Where the certificates came from: keychain, certifi, or system.
+    source: str
+    # PEM file and directory of certificates, either of which can be None.
+    cafile: str
+    capath: str
+
+    def load(self, context):
+        """Load the certificates into an SSLContext as trusted CAs."""
+        if self.cafile is None and self.capath is None:
+            context.load_default_certs()
+        else:
+            context.load_verify_locations(self.cafile, self.capath)
+
+    def openssl_arguments(self):
+        """Arguments for the openssl s_client CLI to use the certificates."""
+        return (
+            ('-CAfile', self.cafile) if self.cafile is not None
+            else ('-CApath', self.capath) if self.capath is not None
+            else ())
+
+def cache_directory():
+    cacheHome = os.environ.get('XDG_CACHE_HOME')
+    return (
+        Path(cacheHome) if cacheHome else Path.home() / '.cache'
+    ) / 'captive-web-view'
+
+def _process_file(pem):
+    # Writes the PEM to a temporary file that is deleted when the process exits.
+    # Returns the path of the file.
+    with NamedTemporaryFile(
+        mode='w', prefix='keychains-', suffix='.pem', delete=False
+    ) as file:
+        file.write(pem)
+    atexit.register(Path(file.name).unlink, missing_ok=True)
+    return file.name
+
+def keychain_bundle(keychainPaths=keychains, directory=None):
+    """\
+    Bundle of the certificates in the keychains, or None if there are none or
+    the security CLI isn't available. keychainPaths is a sequence of Path."""
+    if shutil.which('security') is None:
+        return None
+    stats = []
+    for keychainPath in keychainPaths:
+        try:
+            stat = keychainPath.stat()
+        except OSError:
+            continue
+        stats.append((str(keychainPath), stat.st_mtime_ns, stat.st_size))
+    if not stats:
+        return None
+
+    directory = cache_directory() if directory is None else directory
+    digest = hashlib.sha256(repr(stats).encode()).hexdigest()[:16]
+    pemPath = directory / f'keychains-{digest}.pem'
+    if pemPath.is_file():
+        return CABundle('keychain', str(pemPath), None)
+
+    pem = []
+    for keychainPath, _, _ in stats:
+        # TOTH macOS `security` CLI and how to export the system CA stores:
+        # https://stackoverflow.com/a/72053605/7657675
+        securityRun = subprocess.run(
+            (
+                'security', 'export', '-k', keychainPath, '-t', 'certs'
+                , '-f', 'pemseq'
+            ), stdout=subprocess.PIPE, text=True
+        )
+        pem.append(securityRun.stdout)
+    pem = ''.join(pem)
+    if 'BEGIN CERTIFICATE' not in pem:
+        return None
+
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        # Written to a temporary file and then renamed, so that another process
+        # can't read a partial file.
+        with NamedTemporaryFile(
+            mode='w', dir=directory, suffix='.tmp', delete=False
+        ) as file:
+            file.write(pem)
+        os.replace(file.name, pemPath)
+        # Exports of earlier versions of the keychains.
+        for stale in directory.glob('keychains-*.pem'):
+            if stale != pemPath:
+                stale.unlink(missing_ok=True)
+    except OSError:
+        # For example, a read-only home directory. The export isn't thrown away
+        # because that would mean falling back to a different store.
+        try:
+            return CABundle('keychain', _process_file(pem), None)
+        except OSError:
+            return None
+    return CABundle('keychain', str(pemPath), None)
+
+def certifi_bundle():
+    return None if certifi is None else CABundle(
+        'certifi', certifi.where(), None)
+
+def system_bundle():
+    paths = ssl.get_default_verify_paths()
+    return CABundle('system', paths.cafile, paths.capath)
+
+def default_bundle(keychainPaths=keychains):
+    return (
+        keychain_bundle(keychainPaths) or certifi_bundle() or system_bundle())
@@ -0,0 +1,108 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Cache of peer certificate details for the Captive Web View python harness.
+
+A server sends the same certificate on every connection, so its details are
+worked out once: the base 64 encoding of its DER, its decoded dictionary, and
+its thumbprints. They're kept until the certificate expires.
+
+The cache is keyed by the DER bytes themselves. Looking one up hashes the bytes
+with the dictionary's own hash, which is much quicker than a cryptographic
+digest, and then compares them, so a hit needs no digest at all."""
+#
+# Standard library imports, in alphabetic order.
+#
+# Module for Base 64 encoding certificate DER data.
+# https://docs.python.org/3/library/base64.html
+import base64
+#
+# Module for the least recently used order.
+# https://docs.python.org/3/library/collections.html#collections.OrderedDict
+from collections import OrderedDict
+#
+# Cryptographic hash module, for certificate thumbprints.
+# https://docs.python.org/3/library/hashlib.html
+import hashlib
+#
+# Module for parsing certificate validity times.
+# https://docs.python.org/3/library/ssl.html#ssl.cert_time_to_seconds
+import ssl
+#
+# Module for threads and locks.
+# https://docs.python.org/3/library/threading.html
+import threading
+#
+# Module for the current time, which is compared to certificate expiry times.
+# https://docs.python.org/3/library/time.html#time.time
+import time
+#
+# Module for simple immutable objects with type specification.
+# https://docs.python.org/3/library/typing.html#typing.NamedTuple
+from typing import NamedTuple
+
+class Certificate(NamedTuple):
+    # Base 64 encoding of the DER.
+    DER: str
+    length: int
+    sha1: str
+    sha256: str
+    # Dictionary from the SSLSocket getpeercert() method.
+    details: dict
+    # Expiry time in seconds since the epoch, from the notAfter date.
+    expires: float
+
+def certificate(binary, details):
+    try:
+        expires = ssl.cert_time_to_seconds(details['notAfter'])
+    except (KeyError, ValueError):
+        # For example, the details are empty because the certificate wasn't
+        # validated. Keep it until it's evicted.
+        expires = float('inf')
+    return Certificate(
+        base64.b64encode(binary).decode('utf-8'), len(binary),
+        # TOTH Generate fingerprint with openssl and Python:
+        # https://stackoverflow.com/q/70781380/7657675
+        hashlib.sha1(binary).hexdigest(), hashlib.sha256(binary).hexdigest(),
+        details, expires)
+
+class CertificateCache:
+    def __init__(self, maxEntries=256):
+        self.maxEntries = maxEntries
+        self._lock = threading.Lock()
+        # Dictionary of DER bytes to Certificate, in least recently used order.
+        self._certificates = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, binary):
+        """Certificate for the DER bytes, or None if it isn't cached."""
+        with self._lock:
+            cached = self._certificates.get(binary)
+            if cached is not None and cached.expires > time.time():
+                self._certificates.move_to_end(binary)
+                self.hits += 1
+                return cached
+            if cached is not None:
+                del self._certificates[binary]
+            self.misses += 1
+            return None
+
+    def put(self, binary, details):
+        """\
+        Work out the Certificate for the DER bytes, cache it, and return it."""
+        cached = certificate(binary, details)
+        with self._lock:
+            self._certificates[binary] = cached
+            self._certificates.move_to_end(binary)
+            while len(self._certificates) > self.maxEntries:
+                self._certificates.popitem(last=False)
+        return cached
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'entries': len(self._certificates),
+                'hits': self.hits,
+                'misses': self.misses
+            }
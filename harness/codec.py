@@ -0,0 +1,174 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+JSON codec for the Captive Web View python harness.
+
+The loads() function parses JSON from bytes, bytearray, or str. By default it
+uses the standard json module. Call configure() to select the orjson or ujson
+module instead, which are faster. Anything the faster module rejects, like NaN,
+is parsed again by the standard module, which either accepts it or raises the
+usual json.JSONDecodeError. orjson reads integers too big for 64 bits as floats,
+so a response that echoes one back wouldn't be the same, byte for byte. That's
+why a faster module is only used if it's selected.
+
+The dumps() function encodes an object as bytes. By default the output is the
+same, byte for byte, as json.dumps(value).encode() so that responses don't
+change. Neither orjson nor ujson can produce that layout, so the default encoder
+is the standard module. Call configure(compact=True) to encode with orjson, or
+ujson, instead. That output has no spaces and doesn't escape non-ASCII
+characters. orjson writes bytes directly, without an intermediate str.
+
+Run this module to benchmark the codecs on typical command payloads, like this.
+
+    cd /path/where/you/cloned/captive-web-view/
+    python3 -m harness.codec
+"""
+#
+# Standard library imports, in alphabetic order.
+#
+# JSON module.
+# https://docs.python.org/3/library/json.html
+import json
+#
+# Module for timing the benchmark.
+# https://docs.python.org/3/library/timeit.html
+import timeit
+#
+# Optional fast JSON modules.
+# https://github.com/ijl/orjson
+# https://github.com/ultrajson/ultrajson
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+decoders = ('auto', 'orjson', 'ujson', 'json')
+
+def _json_loads(data):
+    return json.loads(data)
+
+def _orjson_loads(data):
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        return json.loads(data)
+
+def _ujson_loads(data):
+    try:
+        return ujson.loads(data)
+    except ValueError:
+        return json.loads(data)
+
+def _json_dumps(value):
+    return json.dumps(value).encode()
+
+def _json_dumps_compact(value):
+    return json.dumps(value, separators=(',', ':')).encode()
+
+def _orjson_dumps_compact(value):
+    try:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    except TypeError:
+        # For example, an integer too big for 64 bits.
+        return _json_dumps_compact(value)
+
+def _ujson_dumps_compact(value):
+    try:
+        return ujson.dumps(
+            value, ensure_ascii=False, escape_forward_slashes=False
+        ).encode()
+    except (OverflowError, TypeError, ValueError):
+        return _json_dumps_compact(value)
+
+_loaders = {'orjson': _orjson_loads, 'ujson': _ujson_loads, 'json': _json_loads}
+_compactDumpers = {
+    'orjson': _orjson_dumps_compact, 'ujson': _ujson_dumps_compact,
+    'json': _json_dumps_compact}
+_modules = {'orjson': orjson, 'ujson': ujson, 'json': json}
+
+def available():
+    return tuple(
+        name for name, module in _modules.items() if module is not None)
+
+def configure(decoder='json', compact=False):
+    """\
+    Select the module used by loads(), and by dumps() if compact is True. The
+    auto decoder is the first available of orjson, ujson, and json. Raises
+    ValueError if the decoder isn't installed."""
+    global loads, dumps, decoderName, encoderName
+    if decoder == 'auto':
+        decoder = available()[0]
+    if _modules.get(decoder) is None:
+        raise ValueError(f'JSON module "{decoder}" isn\'t installed.')
+    loads = _loaders[decoder]
+    decoderName = decoder
+    if compact:
+        dumps = _compactDumpers[decoder]
+        encoderName = f'{decoder} compact'
+    else:
+        dumps = _json_dumps
+        encoderName = 'json'
+
+loads = _json_loads
+dumps = _json_dumps
+decoderName = encoderName = 'json'
+configure()
+
+def _payloads():
+    # Typical payloads of the Captive Web View bridge: a command, its response,
+    # a batch, a fetch response with certificate details, and a camera frame.
+    ready = {"command": "ready", "parameters": {}}
+    readyResponse = {
+        "from": "file", "confirm": "Main SimpleHTTP/0.6 Python/3.11.7"}
+    fetchResponse = {
+        "command": "fetch",
+        "parameters": {"resource": "https://example.com/api/v1/items",
+                       "options": {"method": "GET", "headers": {
+                           "Accept": "application/json"}}},
+        "fetchedRaw": None,
+        "fetched": {"items": [
+            {"id": index, "name": f"Item {index}", "ok": index % 2 == 0,
+             "score": index / 7} for index in range(20)]},
+        "peerCertificate": {
+            "subject": [[["commonName", "example.com"]]],
+            "issuer": [[["countryName", "US"]], [["organizationName", "CA"]]],
+            "notAfter": "Jan  1 00:00:00 2030 GMT",
+            "DER": "MIIB" + "A" * 1400,
+            "thumbprint": "0123456789abcdef" * 5},
+        "confirm": "Main SimpleHTTP/0.6 Python/3.11.7"}
+    return (
+        ('command', ready),
+        ('response', readyResponse),
+        ('batch', [ready] * 10),
+        ('fetch', fetchResponse),
+        ('frame', {"command": "frame", "parameters": {
+            "jpeg": "/9j/" + "QUJD" * 25000}}))
+
+def benchmark(number=2000):
+    payloads = _payloads()
+    names = [name for name, _ in payloads]
+    print(
+        'Microseconds per loads(dumps(payload)). The row is the decoder, and'
+        ' compact\nmeans that it is the encoder too, otherwise json is.')
+    print(f'{"codec":<16}' + ''.join(f'{name:>10}' for name in names))
+    for decoder in available():
+        for compact in (False, True):
+            if compact and decoder == 'json':
+                continue
+            configure(decoder, compact)
+            label = f'{decoder}{" compact" if compact else ""}'
+            times = []
+            for name, payload in payloads:
+                count = max(number // (100 if name == 'frame' else 1), 10)
+                seconds = timeit.timeit(
+                    lambda: loads(dumps(payload)), number=count)
+                times.append(seconds / count * 1e6)
+            print(f'{label:<16}' + ''.join(f'{time:>10.1f}' for time in times))
+    configure()
+
+if __name__ == '__main__':
+    benchmark()
@@ -1,4 +1,4 @@
-# Copyright 2023 VMware, Inc.  
+# Copyright 2026 VMware, Inc.  
 # SPDX-License-Identifier: BSD-2-Clause
 """\
 Captive Web View python harness command handler base class and JSON handler.
@@ -6,15 +6,33 @@ Captive Web View python harness command handler base class and JSON handler.
 Import and use it like the ../../captivityHarness/__main__.py server does."""
 # Standard library imports, in alphabetic order.
 #
-# JSON module.
-# https://docs.python.org/3/library/json.html
-import json
+# Asynchronous I/O module, used by handlers that are coroutines.
+# https://docs.python.org/3/library/asyncio.html
+import asyncio
 #
 # Module for OO path handling.
 # https://docs.python.org/3/library/pathlib.html
 from pathlib import Path
+#
+# Local imports.
+#
+# Store of JSON responses loaded from files.
+from ..response_store import ResponseStore
 
 class CommandHandler:
+    # Names of the commands that the handler serves. The Main class routes only
+    # those commands to the handler. None means the handler is a fallback, which
+    # is called for every command, in the order that handlers are registered.
+    commands = None
+    # Number of seconds after which a call to the handler fails, or None for no
+    # limit. The command gets a failed response.
+    timeout = None
+    # Number of calls to the handler that can run at the same time, or None for
+    # no limit. Further calls wait for one to finish. Set it before the server
+    # starts.
+    concurrency = None
+    # Name of the handler in logs and metrics, or None for its class name.
+    name = None
 
     @staticmethod
     def parseCommandObject(commandObject):
@@ -33,27 +51,64 @@ class CommandHandler:
     def __call__(self, commandObject, httpHandler):
         return None
 
+    @staticmethod
+    def publish(httpHandler, channel, data, event=None):
+        """\
+        Publish an event to the pages subscribed to a push channel. data is a
+        str, or an object that is sent as JSON. Returns the number of
+        subscribers that got the event."""
+        push = httpHandler.server.push
+        return 0 if push is None else push.publish(channel, data, event)
+
+class AsyncCommandHandler(CommandHandler):
+    """\
+    Base class for a handler that is a coroutine. With the asyncio server
+    engine, it runs in the server's event loop, so it mustn't block. Use the
+    run_blocking() method for blocking calls."""
+
+    # Override.
+    async def __call__(self, commandObject, httpHandler):
+        return None
+
+    @staticmethod
+    async def run_blocking(function, *args):
+        """\
+        Call a blocking function in the event loop's executor, and return its
+        return value."""
+        return await asyncio.get_running_loop().run_in_executor(
+            None, function, *args)
+
 class JSONFileCommandHandler(CommandHandler):
+    # Serves any command that has a JSON file, so it's a fallback handler.
 
-    def __init__(self, pathSpecifier=None):
+    def __init__(self, pathSpecifier=None, interval=1.0):
+        """\
+        The files are loaded on the first command, and reloaded if they change.
+        interval is the minimum number of seconds between checks for changes,
+        or zero to load the files only once."""
         path = (
             Path() if pathSpecifier is None else Path(pathSpecifier)).resolve()
         self._path = path.parent.resolve() if path.is_file() else path
+        self._store = ResponseStore(self._path, interval)
         super().__init__()
 
     # Override.
     def __call__(self, commandObject, httpHandler):
         command, _ = self.parseCommandObject(commandObject)
 
-        if command is None:
+        # A command name that isn't a plain file name can't have a response
+        # file, so reject it without touching the file system. That also stops
+        # a command from reading a file outside the directory.
+        if not isinstance(command, str) or command in ("", ".", "..") or any(
+            separator in command for separator in ("/", "\\", "\0")
+        ):
             return None
 
-        commandPath = Path(self._path, command).with_suffix(".json").resolve()
-        if commandPath.exists():
-            httpHandler.log_message(
-                "%s", f'Loading response from "{commandPath}".')
-            with commandPath.open() as file:
-                return json.load(file)
-
-        httpHandler.log_message("%s", f'No response object "{commandPath}".')
-        return None
+        # The response is shared by every request for the command, and has its
+        # JSON encoding already, so it's read-only. Subclasses that add to it
+        # should call its with_items() or copy() method.
+        response = self._store.get(command)
+        httpHandler.log_debug(
+            'No response object for "%s" in "%s".' if response is None
+            else 'Response for "%s" from "%s".', command, self._path)
+        return response
@@ -1,4 +1,4 @@
-# Copyright 2023 VMware, Inc.  
+# Copyright 2026 VMware, Inc.  
 # SPDX-License-Identifier: BSD-2-Clause
 """\
 Captive Web View python harness command handler for the fetch command.
@@ -9,24 +9,25 @@ Import and use it like the ../../captivityHarness/__main__.py server does."""
 # Module for HTTP server, not imported here but handy to have the link.
 # https://docs.python.org/3/library/http.server.html
 #
-# Module for Base 64 encoding certificate DER data.
-# https://docs.python.org/3/library/base64.html
-import base64
+# Thread pools for running the openssl check in the background, and the fetches
+# of a fetchMany command at the same time.
+# https://docs.python.org/3/library/concurrent.futures.html#threadpoolexecutor
+from concurrent.futures import ThreadPoolExecutor
 #
-# Cryptographic hash module. Only used to generate a certificate thumbprint.
-# https://docs.python.org/3/library/hashlib.html
-import hashlib
-#
-# HTTP modules.
+# HTTP modules, for reference but without explicit imports. Connections are made
+# by the connection pool.
 # https://docs.python.org/3/library/http.client.html#http.client.HTTPSConnection
-from http.client import HTTPSConnection
-# Also for reference but without explicit imports.
 # https://docs.python.org/3/library/http.client.html#httpresponse-objects
 #
-# JSON module.
+# JSON module, only used for its error class. JSON is parsed and encoded by the
+# codec.
 # https://docs.python.org/3/library/json.html
 import json
 #
+# Logging module, only used for level constants.
+# https://docs.python.org/3/library/logging.html
+import logging
+#
 # Module for OO path handling.
 # https://docs.python.org/3/library/pathlib.html
 from pathlib import Path
@@ -49,9 +50,13 @@ import subprocess
 # https://docs.python.org/3/library/sys.html#sys.path
 import sys
 #
-# Temporary file module.
-# https://docs.python.org/3/library/tempfile.html
-from tempfile import NamedTemporaryFile
+# Module for threads and locks.
+# https://docs.python.org/3/library/threading.html
+import threading
+#
+# Module for monotonic time, used for fetchMany deadlines.
+# https://docs.python.org/3/library/time.html#time.monotonic
+import time
 #
 # URL parsing module.
 # https://docs.python.org/3/library/urllib.parse.html#urllib.parse.urlparse
@@ -61,77 +66,123 @@ from urllib.parse import urlparse
 #
 # Command handler base class.
 from .base import CommandHandler
+#
+# JSON codec.
+from .. import codec
+#
+# Certificate authority bundles.
+from ..ca_bundle import CABundle, default_bundle, keychain_bundle, keychains
+#
+# Cache of peer certificate details.
+from ..certificate_cache import CertificateCache
+#
+# Pool of keep-alive HTTPS connections.
+from ..connection_pool import ConnectionPool
+#
+# Harness logger.
+from ..log import logger
 
 class Fetcher:
-    _rootPath = Path().resolve().root
-    # TOTH macOS `security` CLI and how to export the system CA stores:
-    # https://stackoverflow.com/a/72053605/7657675
-    _keychains = (
-        (
-            _rootPath, 'System', 'Library', 'Keychains'
-            , 'SystemRootCertificates.keychain'
-        ), (
-            _rootPath, 'Library', 'Keychains', 'System.keychain'
-        )
-    )
-
-    def __init__(self):
-        self._pemPath = self.keychain_PEM()
-
-        # Create a context in which the certificates from the keychain will be
-        # used to verify the host.
-        self._sslContext = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
-        self._sslContext.load_verify_locations(self._pemPath)
-
-        # Note that host verification has to be switched on here for the peer
-        # certificate to be available later, when the secure socket is
-        # connected. Also, the host certificate has to be valid. For later
-        # maybe, use something from this SO answer to get the certificate even
-        # if it isn't valid.
-        # https://stackoverflow.com/a/7691293/7657675
-
-        # The sslContext no longer requires the PEM file but it's used later by
-        # the openssl s_client.
-        # self._pemPath.unlink()
+    # Keychains from which the trusted certificates are exported, on macOS. Each
+    # is a sequence of path parts.
+    _keychains = tuple(keychain.parts for keychain in keychains)
+    # Limits of the connection pool. Connections are kept open for reuse for
+    # idleTimeout seconds, and a fetch waits up to connectWait seconds for a
+    # connection if there are maxPerHost open to the host already.
+    maxPerHost = 4
+    idleTimeout = 30.0
+    connectWait = 30.0
+    # Methods of requests that can be sent again if a pooled connection fails,
+    # because sending them twice has the same effect as sending them once.
+    # https://www.rfc-editor.org/rfc/rfc9110#name-idempotent-methods
+    idempotentMethods = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE', 'TRACE')
+    # Whether to check peer certificate thumbprints with the openssl CLI, unless
+    # the fetch parameters say otherwise. The result of each check is kept, for
+    # up to maxOpensslChecks certificates.
+    opensslCheck = False
+    maxOpensslChecks = 256
+    # Defaults for the fetchMany command: the number of fetches that run at the
+    # same time, and the number of seconds each one has to finish. Fetches from
+    # every fetchMany command run in a pool of up to maxFetchWorkers threads.
+    fetchManyConcurrency = 8
+    fetchManyTimeout = 30.0
+    maxFetchWorkers = 16
+
+    def __init__(self, opensslCheck=None):
+        if opensslCheck is not None:
+            self.opensslCheck = opensslCheck
+        # The openssl check runs the openssl CLI twice and makes a connection of
+        # its own, so it runs in the background and not in the fetch.
+        self._opensslExecutor = ThreadPoolExecutor(
+            1, thread_name_prefix='OpenSSL')
+        self._opensslLock = threading.Lock()
+        # Dictionary of host and thumbprint to the check result, or to None
+        # while the check is running.
+        self._opensslChecks = {}
+        self._certificates = CertificateCache()
+        # The CA bundle, SSL context, and connection pool are set up on the
+        # first fetch, so that starting the harness doesn't wait for them.
+        self._setupLock = threading.Lock()
+        self._bundle = None
+        self._sslContext = None
+        self._pool = None
+        self._fetchExecutor = None
+
+    def ca_bundle(self):
+        # Returns the CABundle of trusted certificates. Override to use other
+        # certificates. An override of keychain_PEM() from before there was a
+        # ca_bundle() is used too.
+        if type(self).keychain_PEM is not Fetcher.keychain_PEM:
+            return CABundle('keychain', str(self.keychain_PEM()), None)
+        return default_bundle(self._keychain_paths())
+
+    def _keychain_paths(self):
+        return tuple(Path(*keychain) for keychain in self._keychains)
 
     def keychain_PEM(self):
-        # Export all the certificates from the system keychains into a single
-        # temporary PEM file. Return the Path of the file.
-        #
-        # TOTH macOS `security` CLI and how to export the system CA stores:
-        # https://stackoverflow.com/a/72053605/7657675
-        #
-        # TOTH creating a temporary file instead of loading it in the bash
-        # profile:  
-        # https://stackoverflow.com/a/70054211/7657675
-        with NamedTemporaryFile(mode='w', delete=False, suffix=".pem") as file:
-            pemPath = Path(file.name)
-
-        for keychain in self._keychains:
-            keychainPath = Path(*keychain)
-            # TOTH macOS `security` CLI and how to export the system CA stores:
-            # https://stackoverflow.com/a/72053605/7657675
-            securityRun = subprocess.run(
-                (
-                    'security', 'export', '-k', keychainPath, '-t', 'certs'
-                    , '-f', 'pemseq'
-                ), stdout=subprocess.PIPE, text=True
-            )
-            print(f'"{keychainPath}" PEM {len(securityRun.stdout)} characters.')
-            with pemPath.open('a') as file:
-                file.write(securityRun.stdout)
-
-        certificates = 0
-        with pemPath.open() as file:
-            while True:
-                line = file.readline()
-                if line == '':
-                    break
-                if line.startswith('--') and 'BEGIN CERTIFICATE' in line:
-                    certificates += 1
-        print(f'Keychain certificates: {certificates}.')
-
-        return pemPath
+        # Returns the Path of a PEM file of the certificates in the system
+        # keychains, or None if they can't be exported. Kept for compatibility,
+        # the file is made by the ca_bundle module.
+        bundle = keychain_bundle(self._keychain_paths())
+        return None if bundle is None else Path(bundle.cafile)
+
+    @property
+    def _pemPath(self):
+        # Path of the PEM file of trusted certificates, or None if they aren't
+        # in a file. Kept for compatibility, use ca_bundle() instead.
+        self._connection_pool()
+        cafile = self._bundle.cafile
+        return None if cafile is None else Path(cafile)
+
+    def _connection_pool(self):
+        if self._pool is not None:
+            return self._pool
+        with self._setupLock:
+            if self._pool is None:
+                self._bundle = self.ca_bundle()
+                self._log(None, 'CA certificates from %s "%s".'
+                    , self._bundle.source
+                    , self._bundle.cafile or self._bundle.capath)
+
+                # Create a context in which the certificates from the bundle
+                # will be used to verify the host.
+                self._sslContext = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+                self._bundle.load(self._sslContext)
+
+                # Note that host verification has to be switched on here for
+                # the peer certificate to be available later, when the secure
+                # socket is connected. Also, the host certificate has to be
+                # valid. For later maybe, use something from this SO answer to
+                # get the certificate even if it isn't valid.
+                # https://stackoverflow.com/a/7691293/7657675
+
+                # Connections are kept alive and reused, and new connections
+                # resume the TLS session of the last connection to the same
+                # host, so that repeated fetches from a server skip the TCP and
+                # TLS setup.
+                self._pool = ConnectionPool(
+                    self._sslContext, self.maxPerHost, self.idleTimeout)
+        return self._pool
 
 # Returns a 404 and empty body.
 # https://httpbin.org/status/404
@@ -146,7 +197,9 @@ class Fetcher:
 # value for the example.com server.  
 # https://example.com/404
 
-    def fetch(self, parameters, httpHandler=None):
+    def fetch(self, parameters, httpHandler=None, timeout=None):
+        # The timeout is in seconds, and applies to connecting and to each read
+        # and write on the connection. None means no limit.
         return_ = {
             'peerCertificate': { 'DER': None, 'length': None },
             "text": None, "json": None, "ok": False
@@ -157,22 +210,47 @@ class Fetcher:
             return_['status'] = 0
             return_.update(parameterError)
             return return_
-        self._log(httpHandler, f'fetch() {url.hostname} {port}.')
-
-        connection, connectError = self._connect(url.hostname, port)
-        if connectError is not None:
-            return_['status'] = 1
-            return_.update(connectError)
-            return return_
-
-        (
-            return_['peerCertificate']['DER'],
-            return_['peerCertificate']['length']
-        ) = self.get_peer_certificate(connection, httpHandler)
-
-        return_['text'], details = self._request(
-            connection, parameters, httpHandler)
-        connection.close()
+        self._log(httpHandler, 'fetch() %s %s.', url.hostname, port)
+
+        # A pooled connection could have been closed by the server after it
+        # was checked. In that case, a request with an idempotent method is
+        # tried again once, on a new connection. Other requests aren't, because
+        # the server could have acted on the first one before the failure.
+        idempotent = str(
+            parameters.get('options', {}).get('method', 'GET')
+        ).upper() in self.idempotentMethods
+        for reuse in (True, False):
+            connection, reused, connectError = self._connect(
+                url.hostname, port, reuse, httpHandler, timeout)
+            if connectError is not None:
+                return_['status'] = 1
+                return_.update(connectError)
+                return return_
+
+            # The connection is discarded if anything fails, so that it isn't
+            # left checked out of the pool.
+            try:
+                certificate = self.peer_certificate(connection, httpHandler)
+                return_['peerCertificate'].update({
+                    'DER': certificate.DER,
+                    'length': certificate.length,
+                    'thumbprint': certificate.sha1
+                })
+                # Reused connections keep the timeout of their last fetch.
+                connection.sock.settimeout(timeout)
+                return_['text'], details = self._request(
+                    connection, parameters, httpHandler)
+            except ConnectionError as error:
+                self._pool.discard(connection)
+                if not (reused and idempotent):
+                    raise
+                self._log(httpHandler, 'Pooled connection failed %r.', error)
+                continue
+            except BaseException:
+                self._pool.discard(connection)
+                raise
+            break
+        self._pool.release(connection)
  
         return_['json'], jsonError = self._parse_JSON(return_['text'])
 
@@ -185,17 +263,160 @@ class Fetcher:
         else:
             return_.update(details)
 
-        # As an additional manual check, dump the thumbprint with the openssl
-        # CLI.
-        #
-        # url.netloc includes port, if there was one in the URL.
-        self.openssl_thumbprint(
-            url.hostname
-            , f'{url.hostname}:{port}' if url.port is None else url.netloc
-            , httpHandler)
+        # As an additional manual check, compare the thumbprint with the openssl
+        # CLI's.
+        if parameters.get('opensslCheck', self.opensslCheck):
+            return_['peerCertificate']['opensslCheck'] = self.openssl_check(
+                url.hostname, port, return_['peerCertificate']['thumbprint'])
         
         return return_
 
+    def fetch_many(self, parameters, httpHandler=None):
+        """\
+        Fetch a list of resources at the same time. The parameters are like
+        this.
+
+            {
+                resources: [
+                    "https://path.of/a/resource",
+                    {resource: "https://path.of/another", options: {...}},
+                    ...
+                ],
+                options: {...},
+                concurrency: 8,
+                timeout: 30
+            }
+
+        Each item in resources is a resource URL, or fetch parameters. The
+        options, and an opensslCheck, are used for items that don't have their
+        own. Up to concurrency fetches run at the same time. Each has timeout
+        seconds to finish, counting from when it starts, or the number in its
+        own timeout parameter.
+
+        The response has a results list, in the same order as the resources.
+        Each result is the response to a fetch command. A fetch that raised an
+        exception, or didn't finish in time, has status 3 and the exception
+        class name as its statusText. The response ok is true if every result
+        is ok."""
+        resources = parameters.get('resources')
+        if not isinstance(resources, list):
+            return {
+                'ok': False, 'status': 0, 'results': None,
+                'statusText': 'No "resources" list in parameters.',
+                'headers': { 'parameterKeys': tuple(parameters.keys()) }
+            }
+
+        items = []
+        for resource in resources:
+            item = (
+                dict(resource) if isinstance(resource, dict)
+                else {'resource': resource})
+            for key in ('options', 'opensslCheck'):
+                if key in parameters:
+                    item.setdefault(key, parameters[key])
+            items.append(item)
+
+        try:
+            concurrency = min(max(int(parameters.get(
+                'concurrency', self.fetchManyConcurrency)), 1),
+                self.maxFetchWorkers)
+            timeout = float(parameters.get('timeout', self.fetchManyTimeout))
+            for item in items:
+                item['timeout'] = float(item.get('timeout', timeout))
+        except (TypeError, ValueError) as error:
+            return {
+                'ok': False, 'status': 0, 'results': None,
+                'statusText': error.__class__.__name__,
+                'headers': { 'message': f'{error}' }
+            }
+        self._log(httpHandler, 'fetch_many() %s, concurrency %s.'
+            , len(items), concurrency)
+
+        executor = self._fetch_executor()
+        results = [None] * len(items)
+        queued = iter(enumerate(items))
+        # Dictionary of future to index.
+        running = {}
+        # Dictionary of index to deadline. The deadline is set in the worker
+        # thread when the fetch starts, so that time spent waiting for a thread
+        # isn't counted. The event is set when a fetch starts or finishes.
+        deadlines = {}
+        changed = threading.Event()
+
+        def timed_fetch(index, item):
+            deadlines[index] = time.monotonic() + item['timeout']
+            changed.set()
+            return self.fetch(item, httpHandler, item['timeout'])
+
+        while True:
+            while len(running) < concurrency:
+                index, item = next(queued, (None, None))
+                if item is None:
+                    break
+                future = executor.submit(timed_fetch, index, item)
+                future.add_done_callback(lambda future: changed.set())
+                running[future] = index
+            if not running:
+                break
+
+            # Cleared before the checks, so that a fetch that starts or
+            # finishes during them sets it again.
+            changed.clear()
+            now = time.monotonic()
+            finished = False
+            for future, index in tuple(running.items()):
+                if future.done():
+                    try:
+                        results[index] = future.result()
+                    except Exception as error:
+                        results[index] = self._failed_fetch(
+                            items[index], error)
+                elif index in deadlines and deadlines[index] <= now:
+                    # The fetch carries on in its thread until its socket
+                    # times out, but its result is no longer waited for.
+                    results[index] = self._failed_fetch(
+                        items[index], TimeoutError(
+                            'Fetch didn\'t finish in'
+                            f' {items[index]["timeout"]}s.'))
+                else:
+                    continue
+                del running[future]
+                finished = True
+            if finished:
+                continue
+
+            started = tuple(
+                deadlines[index] for index in running.values()
+                if index in deadlines)
+            changed.wait(
+                max(0.0, min(started) - time.monotonic()) if started else None)
+
+        return {
+            'ok': all(result['ok'] for result in results),
+            'results': results
+        }
+
+    def _fetch_executor(self):
+        if self._fetchExecutor is None:
+            with self._setupLock:
+                if self._fetchExecutor is None:
+                    self._fetchExecutor = ThreadPoolExecutor(
+                        self.maxFetchWorkers, thread_name_prefix='Fetch')
+        return self._fetchExecutor
+
+    def _failed_fetch(self, parameters, error):
+        return {
+            'peerCertificate': { 'DER': None, 'length': None },
+            "text": None, "json": None, "ok": False,
+            'status': 3,
+            'statusText': error.__class__.__name__,
+            'headers': {
+                'resource': parameters.get('resource'),
+                'args': error.args,
+                'message': f'{error}'
+            }
+        }
+
     def _parse_resource(self, parameters):
         try:
             resource = parameters['resource']
@@ -216,7 +437,9 @@ class Fetcher:
 
         return url, 443 if url.port is None else url.port, None
 
-    def _connect(self, host, port):
+    def _connect(self, host, port, reuse=True, httpHandler=None, timeout=None):
+        # Returns the connection, whether it was reused from the pool, and an
+        # error, which is None if the connection is ready for a request.
         def return_(error, stage):
             return {
                 'statusText': error.__class__.__name__,
@@ -230,40 +453,62 @@ class Fetcher:
             }
 
         try:
-            connection = HTTPSConnection(
-                host, port=port, context=self._sslContext)
+            connection, reused = self._connection_pool().acquire(
+                host, port,
+                self.connectWait if timeout is None
+                else min(timeout, self.connectWait),
+                reuse)
         except Exception as error:
-            return None, return_(error, 'HTTPSConnection()')
+            return None, False, return_(error, 'HTTPSConnection()')
+
+        if reused:
+            self._log(httpHandler, 'Reused connection %s:%s.', host, port
+                , level=logging.DEBUG)
+            return connection, True, None
 
         try:
+            connection.timeout = timeout
             connection.connect()
         except Exception as error:
-            return None, return_(error, 'connect()')
-        
-        return connection, None
+            self._pool.discard(connection)
+            return None, False, return_(error, 'connect()')
+        self._log(httpHandler
+            , 'New connection %s:%s, TLS session resumed: %s.'
+            , host, port, connection.sessionReused, level=logging.DEBUG)
+
+        return connection, False, None
 
     def get_peer_certificate(self, connection, httpHandler):
+        # Returns the DER of the peer certificate, in base 64, and its length.
+        certificate = self.peer_certificate(connection, httpHandler)
+        return certificate.DER, certificate.length
+
+    def peer_certificate(self, connection, httpHandler):
+        # Returns a Certificate from the cache. Its details, encoding, and
+        # thumbprints are only worked out the first time a certificate is seen.
+        #
         # The connection.sock property mightn't be documented but seems safe.
         peerCertBinary = connection.sock.getpeercert(True)
-        peerCertDict = connection.sock.getpeercert(False)
-
-        peerCertLength = len(peerCertBinary)
-        peerCertMessage = "\n".join([
-            f'{key} "{value}"' for key, value in peerCertDict.items()
-        ])
-        self._log(httpHandler
-            , f'Peer certificate. Binary length: {peerCertLength}'
-            f'. Dictionary:\n{peerCertMessage}')
-
-        # TOTH Generate fingerprint with openssl and Python:
-        # https://stackoverflow.com/q/70781380/7657675
-        peerThumb = hashlib.sha1(peerCertBinary).hexdigest()
-        self._log(httpHandler, f'Peer certificate thumbprint:\n{peerThumb}')
+        certificate = self._certificates.get(peerCertBinary)
+        if certificate is None:
+            certificate = self._certificates.put(
+                peerCertBinary, connection.sock.getpeercert(False))
+            if logger.isEnabledFor(logging.DEBUG):
+                peerCertMessage = "\n".join([
+                    f'{key} "{value}"'
+                    for key, value in certificate.details.items()
+                ])
+                self._log(httpHandler
+                    , 'Peer certificate. Binary length: %s. Dictionary:\n%s'
+                    , certificate.length, peerCertMessage, level=logging.DEBUG)
+
+        self._log(
+            httpHandler, 'Peer certificate thumbprint:\n%s', certificate.sha1)
         # www.python.org SHA1 Fingerprint=B0:9E:C3:40:F4:19:78:D7:7A:76:84:79:0A:EF:84:0E:AD:DA:49:FD
         # B09EC340F41978D77A7684790AEF840EADDA49FD
         # b09ec340f41978d77a7684790aef840eadda49fd
 
-        return base64.b64encode(peerCertBinary).decode('utf-8'), peerCertLength
+        return certificate
 
     def _request(self, connection, parameters, httpHandler):
         options = parameters.get('options', {})
@@ -271,11 +516,13 @@ class Fetcher:
         # If the 'resource' key is missing the code won't reach this point. That
         # key is checked for in _parse_resource() before connecting even.
         resource = parameters['resource']
-        self._log(httpHandler, f'putrequest\n({method},{resource})')
+        self._log(httpHandler, 'putrequest\n(%s,%s)', method, resource
+            , level=logging.DEBUG)
         connection.putrequest(method, resource)
 
         def put_header(header, value):
-            self._log(httpHandler, f'putheader\n({header},{value})')
+            self._log(httpHandler, 'putheader\n(%s,%s)', header, value
+                , level=logging.DEBUG)
             connection.putheader(header, value)
 
         for header, value in options.get('headers', {}).items():
@@ -287,13 +534,13 @@ class Fetcher:
 
         body = (
             options['body'].encode() if 'body' in options
-            else json.dumps(options['bodyObject']).encode()
+            else codec.dumps(options['bodyObject'])
             if 'bodyObject' in options
             else b'')
         put_header('Content-Length', len(body))
         connection.endheaders()
 
-        self._log(httpHandler, f'send\n({body})')
+        self._log(httpHandler, 'send\n(%s)', body, level=logging.DEBUG)
         connection.send(body)
         response = connection.getresponse()
 
@@ -311,7 +558,8 @@ class Fetcher:
             raw = ""
 
         try:
-            return json.loads(raw), None
+            # The codec raises the standard JSONDecodeError for invalid JSON.
+            return codec.loads(raw), None
         except json.decoder.JSONDecodeError as error:
             # https://docs.python.org/3/library/json.html#json.JSONDecodeError
             return None, {
@@ -321,7 +569,50 @@ class Fetcher:
                     'lineno': error.lineno, 'colno': error.colno
                 }}
 
+    def openssl_check(self, host, port, thumbprint):
+        """\
+        Result of checking the thumbprint with the openssl CLI. The check runs
+        in the background the first time a host has a certificate, and the
+        result is pending until it finishes. After that, the result is a
+        dictionary with the openssl thumbprint and whether it matches, or an
+        error message."""
+        key = (host, thumbprint)
+        with self._opensslLock:
+            if key in self._opensslChecks:
+                result = self._opensslChecks[key]
+                return {'pending': True} if result is None else result
+            while len(self._opensslChecks) >= self.maxOpensslChecks:
+                # Forget the oldest.
+                del self._opensslChecks[next(iter(self._opensslChecks))]
+            self._opensslChecks[key] = None
+        self._opensslExecutor.submit(
+            self._run_openssl_check, key, f'{host}:{port}')
+        return {'pending': True}
+
+    def _run_openssl_check(self, key, connectAddress):
+        host, thumbprint = key
+        try:
+            opensslThumbprint = self.openssl_thumbprint(
+                host, connectAddress, None)
+            result = {
+                'thumbprint': opensslThumbprint,
+                'match': opensslThumbprint == thumbprint}
+            self._log(None, 'openssl thumbprint %s %s %s.'
+                , connectAddress, opensslThumbprint
+                , 'matches' if result['match'] else 'doesn\'t match'
+                , level=logging.INFO if result['match'] else logging.WARNING)
+        except Exception as error:
+            result = {'error': f'{error.__class__.__name__}: {error}'}
+            self._log(None, 'openssl check %s failed. %s'
+                , connectAddress, result['error'], level=logging.WARNING)
+        with self._opensslLock:
+            # Unless it was forgotten in the meantime.
+            if key in self._opensslChecks:
+                self._opensslChecks[key] = result
+
     def openssl_thumbprint(self, serverName, connectAddress, httpHandler):
+        # Returns the SHA-1 thumbprint, in lower case hexadecimal digits, the
+        # same as get_peer_certificate() logs.
         # TOTH Generate fingerprint with openssl and Python:
         # https://stackoverflow.com/q/70781380/7657675
         #
@@ -336,11 +627,12 @@ class Fetcher:
         s_clientRun = subprocess.run(
             (
                 'openssl', 's_client', '-servername', serverName, '-showcerts'
-                , '-CAfile', str(self._pemPath), '-connect', connectAddress
+                , *self._bundle.openssl_arguments(), '-connect', connectAddress
             ), stdin=subprocess.DEVNULL, stdout=subprocess.PIPE
-            , stderr=subprocess.PIPE, text=True
+            , stderr=subprocess.PIPE, text=True, timeout=30
         )
-        self._log(httpHandler, f'openssl s_client stderr\n{s_clientRun.stderr}')
+        self._log(httpHandler, 'openssl s_client stderr\n%s'
+            , s_clientRun.stderr, level=logging.DEBUG)
 
         # Extract the PEM dump of the peer certificate from the s_client output.
         s_clientCertificatePEM = None
@@ -351,34 +643,63 @@ class Fetcher:
                 s_clientCertificatePEM.append(line)
             if line.startswith('--') and 'END CERTIFICATE' in line:
                 break
+        if s_clientCertificatePEM is None:
+            raise ValueError('No certificate in openssl s_client output.')
         self._log(httpHandler
-            , f'openssl s_client PEM lines: {len(s_clientCertificatePEM)}')
+            , 'openssl s_client PEM lines: %s', len(s_clientCertificatePEM))
 
         # Pipe the PEM back into the openssl x509 CLI and have it calculate the
         # thumbprint aka fingerprint.
         x509Run = subprocess.run(
-            ('openssl', 'x509', '-inform', 'PEM', '-fingerprint', '-noout')
-            , input=''.join(s_clientCertificatePEM)
+            (
+                'openssl', 'x509', '-inform', 'PEM', '-fingerprint', '-sha1'
+                , '-noout'
+            ), input=''.join(s_clientCertificatePEM)
             , stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+            , timeout=30
         )
-        self._log(httpHandler, f'openssl x509\n{x509Run.stdout}')
-
-    def _log(self, httpHandler, message):
-        if httpHandler is None:
-            print(message)
-        else:
-            httpHandler.log_message("%s", message)
+        self._log(httpHandler, 'openssl x509\n%s', x509Run.stdout)
+
+        # The output is like: SHA1 Fingerprint=B0:9E:C3:...:49:FD
+        _, separator, fingerprint = x509Run.stdout.strip().partition('=')
+        if separator == '':
+            raise ValueError(f'No fingerprint in "{x509Run.stdout.strip()}".')
+        return fingerprint.replace(':', '').lower()
+
+    def as_dict(self):
+        # Connection pool counts, none before the first fetch.
+        return {} if self._pool is None else self._pool.as_dict()
+
+    def _log(self, httpHandler, message, *args, level=logging.INFO):
+        # Formatting is deferred to the logger, which skips it if the level
+        # isn't enabled.
+        logger.log(level, message, *args, extra=(
+            None if httpHandler is None
+            else {'client': httpHandler.address_string()}))
     
 class FetchCommandHandler(CommandHandler):
-    def __init__(self):
-        self._fetcher = Fetcher()
+    commands = ('fetch', 'fetchMany')
+
+    def __init__(self, opensslCheck=False):
+        """\
+        opensslCheck is whether to check certificate thumbprints with the
+        openssl CLI by default. Either way, a fetch can have an opensslCheck
+        parameter of true or false."""
+        self._fetcher = Fetcher(opensslCheck)
         super().__init__()
 
+    def as_dict(self):
+        """\
+        Numbers of connections open, idle, created, reused, resumed, and
+        evicted. Add it to the server metrics as a collector."""
+        return self._fetcher.as_dict()
+
     # Override.
     def __call__(self, commandObject, httpHandler):
         command, parameters = self.parseCommandObject(commandObject)
 
-        if command != 'fetch':
-            return None
-
-        return self._fetcher.fetch(parameters, httpHandler)
+        if command == 'fetch':
+            return self._fetcher.fetch(parameters, httpHandler)
+        if command == 'fetchMany':
+            return self._fetcher.fetch_many(parameters, httpHandler)
+        return None
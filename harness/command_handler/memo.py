@@ -0,0 +1,174 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Captive Web View python harness command handler wrapper that memoizes
+responses.
+
+Wrap a handler whose responses depend only on the command and parameters, like
+this.
+
+    yield memoize(LookupCommandHandler(), {'lookup': 60, 'search': 5})
+
+Only the listed commands are memoized, each for its number of seconds. Other
+commands are passed to the handler every time. Two command objects with the
+same command and parameters share a response, see the command_key module.
+
+A memoized response is stored with its JSON encoding, so that it is only encoded
+once however many times it's sent. The least recently used response is dropped
+when there are more than maxEntries. Failed responses, which have a failed item
+or have ok false, aren't memoized."""
+#
+# Standard library imports, in alphabetic order.
+#
+# Module for the least recently used order.
+# https://docs.python.org/3/library/collections.html#collections.OrderedDict
+from collections import OrderedDict
+#
+# Module for threads and locks.
+# https://docs.python.org/3/library/threading.html
+import threading
+#
+# Module for monotonic time, used for expiry.
+# https://docs.python.org/3/library/time.html#time.monotonic
+import time
+#
+# Local imports.
+#
+# Command handler base class.
+from .base import CommandHandler
+#
+# Canonical keys of command objects.
+from ..command_key import command_key
+#
+# Check for coroutine handlers, and handler names.
+from ..dispatch import handler_name, is_coroutine_handler
+#
+# Response objects that have their JSON encoding already.
+from ..response_store import EncodedResponse
+
+class ResponseCache:
+    def __init__(self, maxEntries=256):
+        self.maxEntries = maxEntries
+        self._lock = threading.Lock()
+        # Dictionary of key to expiry time and response, in least recently used
+        # order.
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Response for the key, or None if there isn't one that is current."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, response = entry
+                if expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return response
+                del self._entries[key]
+                self.expired += 1
+            self.misses += 1
+            return None
+
+    def put(self, key, response, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxEntries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'evictions': self.evictions
+            }
+
+class MemoizingCommandHandler(CommandHandler):
+    def __init__(self, handler, memoized, ttl=60.0, maxEntries=256):
+        """\
+        memoized is a dictionary of command name to the number of seconds to
+        memoize its responses, or an iterable of command names that are all
+        memoized for ttl seconds."""
+        self.handler = handler
+        self._ttls = (
+            dict(memoized) if isinstance(memoized, dict)
+            else dict.fromkeys(memoized, ttl))
+        self.cache = ResponseCache(maxEntries)
+        # Routed, limited, and timed out the same as the handler.
+        self.commands = getattr(handler, 'commands', None)
+        self.timeout = getattr(handler, 'timeout', None)
+        self.concurrency = getattr(handler, 'concurrency', None)
+        super().__init__()
+
+    # Override.
+    @property
+    def name(self):
+        return handler_name(self.handler)
+
+    def _lookup(self, commandObject):
+        # Returns the key and TTL, and the memoized response if there is one.
+        # The key is None if the command isn't memoized.
+        command, _ = self.parseCommandObject(commandObject)
+        try:
+            ttl = self._ttls.get(command)
+            key = None if ttl is None else command_key(commandObject)
+        except (TypeError, ValueError):
+            # Unhashable command, or parameters that can't be encoded.
+            return None, None, None
+        return key, ttl, None if key is None else self.cache.get(key)
+
+    def _memoize(self, key, ttl, response):
+        # Failures aren't memoized, so the command is tried again next time.
+        # That includes fetch failures, which have ok false.
+        if key is None or not isinstance(response, dict) or (
+            'failed' in response or response.get('ok') is False
+        ):
+            return response
+        if not isinstance(response, EncodedResponse):
+            try:
+                response = EncodedResponse(response)
+            except (TypeError, ValueError):
+                return response
+        self.cache.put(key, response, ttl)
+        return response
+
+    # Override.
+    def __call__(self, commandObject, httpHandler):
+        key, ttl, response = self._lookup(commandObject)
+        if response is not None:
+            return response
+        return self._memoize(
+            key, ttl, self.handler(commandObject, httpHandler))
+
+class AsyncMemoizingCommandHandler(MemoizingCommandHandler):
+    # Override.
+    async def __call__(self, commandObject, httpHandler):
+        key, ttl, response = self._lookup(commandObject)
+        if response is not None:
+            return response
+        return self._memoize(
+            key, ttl, await self.handler(commandObject, httpHandler))
+
+def memoize(handler, memoized, ttl=60.0, maxEntries=256):
+    """\
+    Memoizing wrapper of a handler, which is a coroutine if the handler is
+    one."""
+    return (
+        AsyncMemoizingCommandHandler if is_coroutine_handler(handler)
+        else MemoizingCommandHandler
+    )(handler, memoized, ttl, maxEntries)
@@ -0,0 +1,114 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Captive Web View python harness command handler wrapper that records and
+replays responses.
+
+Wrap a handler whose responses are to be recorded, like this.
+
+    yield JSONFileCommandHandler(__file__)
+    yield record_replay(FetchCommandHandler(), 'fixtures.jsonl', record)
+
+The wrapper takes the place of the handler, so commands reach it in the same
+order as they would reach the handler, and with the handler's timeout and
+concurrency limit. In record mode, each command is passed to the handler and
+the response is added to a fixtures file. In replay mode, a command that has the
+same command and parameters as a recorded one gets the recorded response,
+without calling the handler. Other commands are passed to the handler.
+
+To record the responses of more than one handler in the same file, open a
+FixtureStore and pass it to each wrapper instead of the path."""
+#
+# Standard library imports, in alphabetic order.
+#
+# Module for OO path handling.
+# https://docs.python.org/3/library/pathlib.html
+from pathlib import Path
+#
+# Local imports.
+#
+# Command handler base class.
+from .base import CommandHandler
+#
+# Canonical keys of command objects.
+from ..command_key import command_key
+#
+# Check for coroutine handlers, and handler names.
+from ..dispatch import handler_name, is_coroutine_handler
+#
+# Store of recorded responses.
+from ..fixture_store import FixtureStore
+
+class RecordReplayCommandHandler(CommandHandler):
+    def __init__(self, handler, fixtures, record=False):
+        """\
+        fixtures is the JSON lines file of recorded responses, or a
+        FixtureStore that was opened with the same record value."""
+        self.handler = handler
+        self._fixtures = (
+            fixtures if isinstance(fixtures, FixtureStore)
+            else FixtureStore(Path(fixtures).resolve(), record))
+        self._record = record
+        # Routed, limited, and timed out the same as the handler.
+        self.commands = getattr(handler, 'commands', None)
+        self.timeout = getattr(handler, 'timeout', None)
+        self.concurrency = getattr(handler, 'concurrency', None)
+        super().__init__()
+
+    # Override.
+    @property
+    def name(self):
+        return handler_name(self.handler)
+
+    def _replay(self, commandObject, httpHandler):
+        # Returns the key, or None if the command can't have one, and the
+        # recorded response, if replaying and there is one.
+        try:
+            key = command_key(commandObject)
+        except (TypeError, ValueError):
+            return None, None
+        if self._record:
+            return key, None
+        response = self._fixtures.get(key)
+        if response is not None:
+            httpHandler.log_debug(
+                'Replayed response for "%s".', commandObject.get('command'))
+        return key, response
+
+    def _recorded(self, key, commandObject, response, httpHandler):
+        if key is not None and self._record and response is not None:
+            try:
+                self._fixtures.record(key, commandObject, response)
+            except (TypeError, ValueError) as error:
+                httpHandler.log_error(
+                    'Response to "%s" not recorded. %s',
+                    commandObject.get('command'), error)
+        return response
+
+    # Override.
+    def __call__(self, commandObject, httpHandler):
+        key, response = self._replay(commandObject, httpHandler)
+        if response is not None:
+            return response
+        return self._recorded(
+            key, commandObject, self.handler(commandObject, httpHandler),
+            httpHandler)
+
+class AsyncRecordReplayCommandHandler(RecordReplayCommandHandler):
+    # Override.
+    async def __call__(self, commandObject, httpHandler):
+        key, response = self._replay(commandObject, httpHandler)
+        if response is not None:
+            return response
+        return self._recorded(
+            key, commandObject, await self.handler(commandObject, httpHandler),
+            httpHandler)
+
+def record_replay(handler, fixtures, record=False):
+    """\
+    Recording or replaying wrapper of a handler, which is a coroutine if the
+    handler is one."""
+    return (
+        AsyncRecordReplayCommandHandler if is_coroutine_handler(handler)
+        else RecordReplayCommandHandler
+    )(handler, fixtures, record)
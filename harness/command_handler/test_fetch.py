@@ -0,0 +1,283 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Tests of the fetch command handler, which fetch from a TLS server running in a
+thread. Run them with pytest, like this.
+
+    cd /path/where/you/cloned/captive-web-view/
+    python3 -m pytest harness
+
+The certificates and tls_server fixtures are in the harness/conftest.py file."""
+#
+# Standard library imports, in alphabetic order.
+#
+# Thread pool for running fetchMany commands at the same time.
+# https://docs.python.org/3/library/concurrent.futures.html#threadpoolexecutor
+from concurrent.futures import ThreadPoolExecutor
+#
+# Module for Base 64 decoding.
+# https://docs.python.org/3/library/base64.html
+import base64
+#
+# Module for executable file lookup, used to skip tests that need openssl.
+# https://docs.python.org/3/library/shutil.html#shutil.which
+import shutil
+#
+# Module for TCP sockets, used to find a port that nothing listens on.
+# https://docs.python.org/3/library/socket.html
+import socket
+#
+# Module for threads and locks.
+# https://docs.python.org/3/library/threading.html
+import threading
+#
+# Module for monotonic time, used to wait for the openssl check.
+# https://docs.python.org/3/library/time.html#time.monotonic
+import time
+#
+# PyPI https://pypi.org/project/pytest
+import pytest
+#
+# Local imports.
+#
+# Module under test.
+from .fetch import Fetcher
+
+@pytest.fixture
+def fetcher(certificates):
+    class TestFetcher(Fetcher):
+        # Trust the test CA instead of the keychains.
+        def keychain_PEM(self):
+            return certificates / 'ca.pem'
+    return TestFetcher()
+
+def resource(server, path='/'):
+    return f'https://localhost:{server.server_address[1]}{path}'
+
+def test_fetch(fetcher, tls_server):
+    fetched = fetcher.fetch({'resource': resource(tls_server, '/one')})
+    assert (fetched['ok'], fetched['status']) == (True, 200)
+    # The request target is the whole resource URL.
+    assert fetched['json']['path'] == resource(tls_server, '/one')
+    assert fetched['peerCertificate']['length'] > 0
+
+    fetched = fetcher.fetch({
+        'resource': resource(tls_server, '/two'),
+        'options': {'method': 'POST', 'bodyObject': {'two': 2}}})
+    assert fetched['json']['method'] == 'POST'
+    assert fetched['json']['body'] == '{"two": 2}'
+
+def test_setup_is_lazy(fetcher, tls_server):
+    assert fetcher.as_dict() == {}
+    assert fetcher._bundle is None
+    fetcher.fetch({'resource': resource(tls_server)})
+    assert fetcher._bundle.source == 'keychain'
+    assert fetcher.as_dict()['created'] == 1
+
+def test_connection_is_reused(fetcher, tls_server):
+    ports = [
+        fetcher.fetch({'resource': resource(tls_server)})['json']['port']
+        for _ in range(3)]
+    assert len(set(ports)) == 1
+    counts = fetcher.as_dict()
+    assert (counts['created'], counts['reused']) == (1, 2)
+    # The certificate details were only worked out once.
+    assert fetcher._certificates.as_dict() == {
+        'entries': 1, 'hits': 2, 'misses': 1}
+
+def test_get_peer_certificate(fetcher, tls_server):
+    connection, _, _ = fetcher._connect(
+        'localhost', tls_server.server_address[1])
+    try:
+        DER, length = fetcher.get_peer_certificate(connection, None)
+    finally:
+        fetcher._pool.discard(connection)
+    certificate = fetcher._certificates.get(base64.b64decode(DER))
+    assert (certificate.DER, certificate.length) == (DER, length)
+
+def test_stale_connection(fetcher, tls_server, monkeypatch):
+    firstPort = fetcher.fetch({'resource': resource(tls_server)})['json'][
+        'port']
+    # The server closes the connection after the pool's check, so the request
+    # is sent on a closed connection.
+    tls_server.close_connections()
+    monkeypatch.setattr(fetcher._pool, '_healthy', lambda connection: True)
+    fetched = fetcher.fetch({'resource': resource(tls_server)})
+    # GET is idempotent, so it's sent again on a new connection.
+    assert fetched['ok']
+    assert fetched['json']['port'] != firstPort
+
+    tls_server.close_connections()
+    with pytest.raises(ConnectionError):
+        fetcher.fetch({
+            'resource': resource(tls_server), 'options': {'method': 'POST'}})
+    assert fetcher.as_dict()['open'] == 0
+
+def test_failure_after_checkout_discards_the_connection(
+    fetcher, tls_server, monkeypatch
+):
+    def fail(connection, httpHandler):
+        raise ValueError('Failed.')
+    monkeypatch.setattr(fetcher, 'peer_certificate', fail)
+    with pytest.raises(ValueError):
+        fetcher.fetch({'resource': resource(tls_server)})
+    assert fetcher.as_dict()['open'] == 0
+
+def test_parameter_errors(fetcher):
+    fetched = fetcher.fetch({})
+    assert (fetched['ok'], fetched['status']) == (False, 0)
+    fetched = fetcher.fetch({'resource': 'not a URL'})
+    assert (fetched['ok'], fetched['status']) == (False, 0)
+
+def test_connect_error(fetcher):
+    with socket.socket() as unused:
+        unused.bind(('localhost', 0))
+        port = unused.getsockname()[1]
+    fetched = fetcher.fetch({'resource': f'https://localhost:{port}/'})
+    assert (fetched['ok'], fetched['status']) == (False, 1)
+    assert fetched['headers']['stage'] == 'connect()'
+    assert fetcher.as_dict()['open'] == 0
+
+def test_openssl_check_is_opt_in(fetcher, tls_server, monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        fetcher, 'openssl_thumbprint', lambda *args: calls.append(args))
+    fetched = fetcher.fetch({'resource': resource(tls_server)})
+    assert 'opensslCheck' not in fetched['peerCertificate']
+    fetcher._opensslExecutor.shutdown()
+    assert calls == []
+
+@pytest.mark.skipif(shutil.which('openssl') is None, reason="No openssl CLI.")
+def test_openssl_check(fetcher, tls_server):
+    fetched = fetcher.fetch({
+        'resource': resource(tls_server), 'opensslCheck': True})
+    thumbprint = fetched['peerCertificate']['thumbprint']
+    assert fetched['peerCertificate']['opensslCheck'] == {'pending': True}
+
+    port = tls_server.server_address[1]
+    deadline = time.monotonic() + 30
+    result = {'pending': True}
+    while result == {'pending': True}:
+        result = fetcher.openssl_check('localhost', port, thumbprint)
+        assert time.monotonic() < deadline, 'Timed out.'
+        time.sleep(0.05)
+    assert result == {'thumbprint': thumbprint, 'match': True}
+
+    # The result is kept, so there's no other check.
+    fetched = fetcher.fetch({
+        'resource': resource(tls_server), 'opensslCheck': True})
+    assert fetched['peerCertificate']['opensslCheck'] == result
+
+def test_openssl_check_error(fetcher, monkeypatch):
+    def fail(serverName, connectAddress, httpHandler):
+        raise ValueError('No certificate.')
+    monkeypatch.setattr(fetcher, 'openssl_thumbprint', fail)
+    fetcher.maxOpensslChecks = 2
+    for host in ('one', 'two', 'three'):
+        assert fetcher.openssl_check(host, 443, 'ab') == {'pending': True}
+    fetcher._opensslExecutor.shutdown()
+    # The oldest result was forgotten.
+    assert set(fetcher._opensslChecks) == {('two', 'ab'), ('three', 'ab')}
+    assert fetcher.openssl_check('three', 443, 'ab') == {
+        'error': 'ValueError: No certificate.'}
+
+class StubFetcher(Fetcher):
+    # Fetch that takes the number of seconds in its delay parameter, or raises
+    # the exception in its raise_ parameter.
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self.fetching = 0
+        self.maxFetching = 0
+
+    def fetch(self, parameters, httpHandler=None, timeout=None):
+        with self._lock:
+            self.fetching += 1
+            self.maxFetching = max(self.maxFetching, self.fetching)
+        try:
+            time.sleep(parameters.get('delay', 0))
+            if 'raise_' in parameters:
+                raise parameters['raise_']
+            return {'ok': True, 'parameters': parameters, 'timeout': timeout}
+        finally:
+            with self._lock:
+                self.fetching -= 1
+
+def test_fetch_many_results():
+    fetcher = StubFetcher()
+    fetched = fetcher.fetch_many({
+        'resources': [
+            'https://localhost/one',
+            {'resource': 'https://localhost/two', 'options': {'method': 'PUT'}},
+            {'resource': 'https://localhost/three', 'timeout': 5}
+        ],
+        'options': {'method': 'POST'}, 'opensslCheck': True, 'timeout': 10
+    })
+    assert fetched['ok']
+    assert [result['parameters'] for result in fetched['results']] == [
+        {
+            'resource': 'https://localhost/one', 'options': {'method': 'POST'},
+            'opensslCheck': True, 'timeout': 10.0
+        }, {
+            'resource': 'https://localhost/two', 'options': {'method': 'PUT'},
+            'opensslCheck': True, 'timeout': 10.0
+        }, {
+            'resource': 'https://localhost/three', 'timeout': 5.0,
+            'options': {'method': 'POST'}, 'opensslCheck': True
+        }
+    ]
+    assert [result['timeout'] for result in fetched['results']] == [
+        10.0, 10.0, 5.0]
+
+def test_fetch_many_concurrency():
+    fetcher = StubFetcher()
+    fetched = fetcher.fetch_many({
+        'resources': [{'resource': 'one', 'delay': 0.05}] * 6,
+        'concurrency': 2})
+    assert fetched['ok'] and len(fetched['results']) == 6
+    assert fetcher.maxFetching == 2
+
+def test_fetch_many_failures():
+    fetcher = StubFetcher()
+    fetched = fetcher.fetch_many({'resources': [
+        {'resource': 'slow', 'delay': 1, 'timeout': 0.1},
+        {'resource': 'raises', 'raise_': ConnectionResetError('Reset.')},
+        'quick'
+    ]})
+    assert not fetched['ok']
+    slow, raises, quick = fetched['results']
+    assert (slow['status'], slow['statusText']) == (3, 'TimeoutError')
+    assert slow['headers']['resource'] == 'slow'
+    assert (raises['status'], raises['statusText']) == (
+        3, 'ConnectionResetError')
+    assert raises['headers']['message'] == 'Reset.'
+    assert quick['ok']
+
+def test_fetch_many_deadline_starts_with_the_fetch():
+    # Two commands share one worker thread, so one command's fetch waits for
+    # the other's before it starts. The wait doesn't count against its timeout.
+    fetcher = StubFetcher()
+    fetcher.maxFetchWorkers = 1
+    parameters = {'resources': [
+        {'resource': 'one', 'delay': 0.3, 'timeout': 0.5}]}
+    with ThreadPoolExecutor(2) as executor:
+        futures = [
+            executor.submit(fetcher.fetch_many, parameters) for _ in range(2)]
+    assert [future.result()['ok'] for future in futures] == [True, True]
+    assert fetcher.maxFetching == 1
+
+@pytest.mark.parametrize('parameters', (
+    {}, {'resources': 'one'}, {'resources': [], 'timeout': 'one'},
+    {'resources': [], 'concurrency': None}
+))
+def test_fetch_many_parameter_errors(parameters):
+    fetched = StubFetcher().fetch_many(parameters)
+    assert (fetched['ok'], fetched['status'], fetched['results']) == (
+        False, 0, None)
+
+def test_fetch_many(fetcher, tls_server):
+    fetched = fetcher.fetch_many({'resources': [
+        resource(tls_server, '/one'), resource(tls_server, '/two')]})
+    assert fetched['ok']
+    assert [result['json']['path'] for result in fetched['results']] == [
+        resource(tls_server, '/one'), resource(tls_server, '/two')]
@@ -0,0 +1,118 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Tests of the memo command handler wrapper. Run them with pytest, like this.
+
+    cd /path/where/you/cloned/captive-web-view/
+    python3 -m pytest harness
+"""
+#
+# Standard library imports, in alphabetic order.
+#
+# Module for a stand-in clock.
+# https://docs.python.org/3/library/types.html#types.SimpleNamespace
+from types import SimpleNamespace
+#
+# PyPI https://pypi.org/project/pytest
+import pytest
+#
+# Local imports.
+#
+# Command handler base class.
+from harness.command_handler.base import CommandHandler
+#
+# Module under test.
+from harness.command_handler import memo
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Stand-in for the time module, whose now can be set by the test."""
+    clock = SimpleNamespace(now=1000.0)
+    clock.monotonic = lambda: clock.now
+    monkeypatch.setattr(memo, 'time', clock)
+    return clock
+
+def test_ttl(clock):
+    cache = memo.ResponseCache()
+    cache.put('a', {'a': 1}, 10)
+    clock.now += 9.9
+    assert cache.get('a') == {'a': 1}
+    clock.now += 0.1
+    assert cache.get('a') is None
+    assert len(cache) == 0
+    assert cache.as_dict() == {
+        'entries': 0, 'hits': 1, 'misses': 1, 'expired': 1, 'evictions': 0}
+
+def test_least_recently_used_is_evicted(clock):
+    cache = memo.ResponseCache(2)
+    cache.put('a', {'a': 1}, 10)
+    cache.put('b', {'b': 2}, 10)
+    # Now b is the least recently used.
+    assert cache.get('a') == {'a': 1}
+    cache.put('c', {'c': 3}, 10)
+    assert cache.get('b') is None
+    assert cache.get('a') == {'a': 1}
+    assert cache.get('c') == {'c': 3}
+    assert cache.evictions == 1
+    assert cache.expired == 0
+
+def test_put_again_refreshes(clock):
+    cache = memo.ResponseCache(2)
+    cache.put('a', {'a': 1}, 10)
+    cache.put('b', {'b': 2}, 10)
+    clock.now += 5
+    cache.put('a', {'a': 2}, 10)
+    cache.put('c', {'c': 3}, 10)
+    clock.now += 9
+    assert cache.get('a') == {'a': 2}
+    assert cache.get('b') is None
+
+class Counter(CommandHandler):
+    commands = ('count', 'fail', 'fetch', 'other')
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def __call__(self, commandObject, httpHandler):
+        self.calls += 1
+        command, parameters = self.parseCommandObject(commandObject)
+        if command == 'fail':
+            return {'failed': self.calls}
+        if command == 'fetch':
+            # Same as a fetch failure, which has no failed item.
+            return {'ok': False, 'status': 1, 'calls': self.calls}
+        return {'calls': self.calls}
+
+def test_wrapper(clock):
+    counter = Counter()
+    handler = memo.memoize(counter, {'count': 10, 'fail': 10, 'fetch': 10})
+    assert handler.name == 'Counter'
+    assert handler.commands == counter.commands
+
+    command = {'command': 'count', 'parameters': {'a': 1, 'b': 2}}
+    same = {'command': 'count', 'parameters': {'b': 2, 'a': 1}}
+    assert handler(command, None) == {'calls': 1}
+    assert handler(same, None) == {'calls': 1}
+    assert handler({'command': 'count', 'parameters': {}}, None) == {
+        'calls': 2}
+    # Commands that aren't listed, and failed responses, aren't memoized.
+    assert handler({'command': 'other'}, None) == {'calls': 3}
+    assert handler({'command': 'other'}, None) == {'calls': 4}
+    assert handler({'command': 'fail'}, None) == {'failed': 5}
+    assert handler({'command': 'fail'}, None) == {'failed': 6}
+    assert handler({'command': 'fetch'}, None)['calls'] == 7
+    assert handler({'command': 'fetch'}, None)['calls'] == 8
+
+    clock.now += 10
+    assert handler(command, None) == {'calls': 9}
+
+def test_plain_function_is_a_fallback(clock):
+    calls = []
+    def handler(commandObject, httpHandler):
+        calls.append(commandObject)
+        return {'calls': len(calls)}
+    wrapper = memo.memoize(handler, {'count': 10})
+    assert wrapper.commands is None
+    assert wrapper({'command': 'count'}, None) == {'calls': 1}
+    assert wrapper({'command': 'count'}, None) == {'calls': 1}
@@ -0,0 +1,80 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Tests of the record and replay wrapper. Run them with pytest, like this.
+
+    cd /path/where/you/cloned/captive-web-view/
+    python3 -m pytest harness
+"""
+#
+# Standard library imports, in alphabetic order.
+#
+# Asynchronous I/O module, used to call coroutine handlers.
+# https://docs.python.org/3/library/asyncio.html
+import asyncio
+#
+# Module for a simple object with attributes, used as a stand-in HTTP handler.
+# https://docs.python.org/3/library/types.html#types.SimpleNamespace
+from types import SimpleNamespace
+#
+# Local imports.
+#
+# Command handler base class.
+from .base import CommandHandler
+#
+# Module under test.
+from .record_replay import AsyncRecordReplayCommandHandler, record_replay
+
+httpHandler = SimpleNamespace(
+    log_debug=lambda *args: None, log_error=lambda *args: None)
+
+class Counter(CommandHandler):
+    commands = ('count',)
+    timeout = 2.0
+    def __init__(self):
+        self.calls = 0
+        super().__init__()
+    def __call__(self, commandObject, httpHandler):
+        self.calls += 1
+        return {'calls': self.calls}
+
+def test_record_then_replay(tmp_path):
+    path = tmp_path / 'fixtures.jsonl'
+    handler = Counter()
+    recorder = record_replay(handler, path, True)
+    assert (recorder.commands, recorder.timeout) == (('count',), 2.0)
+    command = {'command': 'count', 'parameters': {'b': 1, 'a': 2}}
+    assert recorder(command, httpHandler) == {'calls': 1}
+    # Recording always calls the handler.
+    assert recorder(command, httpHandler) == {'calls': 2}
+    recorder._fixtures.close()
+
+    replayer = record_replay(handler, path)
+    # The key doesn't depend on the order of the parameters.
+    reordered = {'command': 'count', 'parameters': {'a': 2, 'b': 1}}
+    assert replayer(reordered, httpHandler) == {'calls': 2}
+    assert handler.calls == 2
+    # Not recorded, so passed to the handler.
+    assert replayer({'command': 'count'}, httpHandler) == {'calls': 3}
+
+def test_plain_function_is_a_fallback(tmp_path):
+    def handler(commandObject, httpHandler):
+        return {'from': 'function'}
+    wrapper = record_replay(handler, tmp_path / 'fixtures.jsonl')
+    assert wrapper.commands is None
+    assert wrapper.timeout is None
+    assert wrapper({'command': 'any'}, httpHandler) == {'from': 'function'}
+
+def test_coroutine_handler(tmp_path):
+    async def handler(commandObject, httpHandler):
+        return {'from': 'coroutine'}
+    path = tmp_path / 'fixtures.jsonl'
+    wrapper = record_replay(handler, path, True)
+    assert isinstance(wrapper, AsyncRecordReplayCommandHandler)
+    assert asyncio.run(wrapper({'command': 'any'}, httpHandler)) == {
+        'from': 'coroutine'}
+    wrapper._fixtures.close()
+    async def unused(commandObject, httpHandler):
+        raise AssertionError('Not replayed.')
+    assert asyncio.run(record_replay(unused, path)(
+        {'command': 'any'}, httpHandler)) == {'from': 'coroutine'}
@@ -0,0 +1,37 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Canonical keys of command objects for the Captive Web View python harness.
+
+Two command objects have the same key if they have the same command and
+parameters, regardless of the order of the items in them, their spacing, and any
+other items like a WebSocket message ID. The key is a short hash so that it can
+be held in memory, and written to an index, for any number of commands."""
+#
+# Standard library imports, in alphabetic order.
+#
+# Module for the BLAKE2 hash.
+# https://docs.python.org/3/library/hashlib.html#hashlib.blake2b
+import hashlib
+#
+# JSON module. The canonical form always uses the standard module, and not the
+# configured codec, so that keys don't depend on which module is installed.
+# https://docs.python.org/3/library/json.html
+import json
+
+def canonical_command(commandObject):
+    """\
+    Canonical JSON encoding of the command and parameters of a command object,
+    as bytes. Raises TypeError or ValueError if they can't be encoded."""
+    return json.dumps(
+        {
+            "command": commandObject.get('command'),
+            "parameters": commandObject.get('parameters')
+        },
+        sort_keys=True, separators=(',', ':'), ensure_ascii=False
+    ).encode()
+
+def command_key(commandObject):
+    """Hash of the canonical command, as a str of hexadecimal digits."""
+    return hashlib.blake2b(
+        canonical_command(commandObject), digest_size=16).hexdigest()
@@ -0,0 +1,140 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Compressed variants of static text files for the Captive Web View python harness
+server.
+
+Variants are built in memory from the contents of cached files and are rebuilt
+whenever the contents, and hence the entity tag, of the file change. The gzip
+encoding is always available. The br encoding is available if the brotli module
+is installed, for example by running `python3 -m pip install brotli`."""
+#
+# Standard library imports, in alphabetic order.
+#
+# Module for gzip compression.
+# https://docs.python.org/3/library/gzip.html
+import gzip
+#
+# Module for threads and locks.
+# https://docs.python.org/3/library/threading.html
+import threading
+#
+# Module for simple immutable objects with type specification.
+# https://docs.python.org/3/library/typing.html#typing.NamedTuple
+from typing import NamedTuple
+#
+# Optional imports.
+#
+# Brotli compression, which isn't in the standard library.
+# https://pypi.org/project/Brotli/
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+class Variant(NamedTuple):
+    encoding: str
+    data: bytes
+    etag: str
+
+def compress_gzip(data):
+    # The mtime is fixed so that the same input always gives the same output.
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def compress_br(data):
+    return brotli.compress(data, quality=11)
+
+def accepted_encodings(acceptEncoding):
+    """\
+    Dictionary of encoding names to quality values from an Accept-Encoding
+    header value."""
+    # https://www.rfc-editor.org/rfc/rfc9110#section-12.5.3
+    accepted = {}
+    if acceptEncoding is None:
+        return accepted
+    for item in acceptEncoding.split(","):
+        coding, *parameters = item.split(";")
+        coding = coding.strip().lower()
+        if coding == "":
+            continue
+        quality = 1.0
+        for parameter in parameters:
+            name, _, value = parameter.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+class Compressor:
+    # Encodings in order of preference.
+    encodings = (
+        ((('br', compress_br),) if brotli is not None else ())
+        + (('gzip', compress_gzip),))
+
+    textTypes = (
+        'application/javascript', 'application/json', 'image/svg+xml',
+        'text/')
+
+    def __init__(self, minimumBytes=256):
+        self._minimumBytes = minimumBytes
+        self._lock = threading.Lock()
+        # Dictionary of path to asset entity tag and a dictionary of encoding
+        # name to Variant or None if compression didn't make the file smaller.
+        self._variants = {}
+
+    def __len__(self):
+        return sum(
+            1 for _, variants in self._variants.values()
+            for variant in variants.values() if variant is not None)
+
+    def compressible(self, asset, contentType):
+        return (
+            asset.data is not None
+            and asset.size >= self._minimumBytes
+            and contentType.startswith(self.textTypes))
+
+    def variant(self, asset, contentType, acceptEncoding):
+        """\
+        Variant of the asset for the best encoding that the client accepts, or
+        None to send the asset uncompressed."""
+        if not self.compressible(asset, contentType):
+            return None
+        accepted = accepted_encodings(acceptEncoding)
+        wildcard = accepted.get('*', 0.0)
+        for encoding, _ in self.encodings:
+            if accepted.get(encoding, wildcard) > 0:
+                variant = self._variant(asset, encoding)
+                if variant is not None:
+                    return variant
+        return None
+
+    def build(self, asset, contentType):
+        """Build all variants of an asset ahead of time."""
+        if not self.compressible(asset, contentType):
+            return 0
+        return sum(
+            1 for encoding, _ in self.encodings
+            if self._variant(asset, encoding) is not None)
+
+    def _variant(self, asset, encoding):
+        with self._lock:
+            etag, variants = self._variants.get(asset.path, (None, None))
+            if etag != asset.etag:
+                variants = {}
+                self._variants[asset.path] = (asset.etag, variants)
+            if encoding in variants:
+                return variants[encoding]
+
+        # Compress outside the lock. Two threads might compress the same file
+        # at the same time, which is wasteful but harmless.
+        compress = dict(self.encodings)[encoding]
+        data = compress(asset.data)
+        variant = (
+            Variant(encoding, data, f'{asset.etag[:-1]}-{encoding}"')
+            if len(data) < asset.size else None)
+        with self._lock:
+            variants[encoding] = variant
+        return variant
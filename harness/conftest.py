@@ -0,0 +1,172 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Shared pytest fixtures for the harness tests."""
+#
+# Standard library imports, in alphabetic order.
+#
+# HTTP client module.
+# https://docs.python.org/3/library/http.client.html
+import http.client
+#
+# HTTP server module, for the TLS server that fetch tests connect to.
+# https://docs.python.org/3/library/http.server.html
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+#
+# JSON module.
+# https://docs.python.org/3/library/json.html
+import json
+#
+# Module for finding the openssl CLI.
+# https://docs.python.org/3/library/shutil.html#shutil.which
+import shutil
+#
+# Module for shutting down server sockets.
+# https://docs.python.org/3/library/socket.html
+import socket
+#
+# Module for TLS.
+# https://docs.python.org/3/library/ssl.html
+import ssl
+#
+# Module for running the openssl CLI to make test certificates.
+# https://docs.python.org/3/library/subprocess.html
+import subprocess
+#
+# Module for threads.
+# https://docs.python.org/3/library/threading.html
+import threading
+#
+# PyPI https://pypi.org/project/pytest
+import pytest
+#
+# Local imports.
+#
+# Harness server.
+from harness.server import Main
+
+@pytest.fixture
+def serve(tmp_path, monkeypatch):
+    """\
+    Function that starts a harness in a thread, serving the tmp_path directory,
+    and returns its Main instance. The arguments are command line options. The
+    harness is shut down after the test."""
+    # The server changes directory, so change back after the test.
+    monkeypatch.chdir(tmp_path)
+    started = []
+
+    def serve(*options, mainClass=Main):
+        main = mainClass(
+            'harness', None, ('harness', '--port', '0', *options, str(tmp_path)))
+        thread = threading.Thread(target=main, daemon=True)
+        thread.start()
+        started.append((main, thread))
+        return main
+
+    yield serve
+    for main, thread in started:
+        # Unless the harness failed to start, in which case shutdown() would
+        # wait for it forever.
+        if thread.is_alive():
+            main.server.shutdown()
+        thread.join(5)
+        main.server.server_close()
+
+@pytest.fixture
+def connect():
+    """\
+    Function that returns an HTTP client connection to a harness started by the
+    serve fixture."""
+    def connect(main):
+        host, port = main.server.server_address[:2]
+        return http.client.HTTPConnection(host, port, timeout=5)
+    return connect
+
+@pytest.fixture(scope='session')
+def certificates(tmp_path_factory):
+    """\
+    Directory with a test CA certificate, ca.pem, and a certificate and key for
+    localhost signed by it, localhost.pem and localhost.key. Tests that use it
+    are skipped if the openssl CLI isn't installed."""
+    if shutil.which('openssl') is None:
+        pytest.skip('No openssl CLI to make test certificates.')
+    directory = tmp_path_factory.mktemp('certificates')
+    def openssl(*arguments):
+        subprocess.run(
+            ('openssl', *arguments), cwd=directory, check=True,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    openssl(
+        'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+        '-keyout', 'ca.key', '-out', 'ca.pem', '-subj', '/CN=Harness Test CA',
+        '-addext', 'basicConstraints=critical,CA:TRUE',
+        '-addext', 'keyUsage=critical,keyCertSign,cRLSign')
+    openssl(
+        'req', '-newkey', 'rsa:2048', '-nodes', '-keyout', 'localhost.key',
+        '-out', 'localhost.csr', '-subj', '/CN=localhost')
+    directory.joinpath('localhost.ext').write_text(
+        'subjectAltName=DNS:localhost\n')
+    openssl(
+        'x509', '-req', '-in', 'localhost.csr', '-CA', 'ca.pem', '-CAkey',
+        'ca.key', '-CAcreateserial', '-days', '1', '-out', 'localhost.pem',
+        '-extfile', 'localhost.ext')
+    return directory
+
+class EchoHandler(BaseHTTPRequestHandler):
+    # Keeps connections alive.
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.connections.add(self.connection)
+
+    def do_GET(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        responseBytes = json.dumps({
+            'method': self.command, 'path': self.path, 'body': body.decode(),
+            'port': self.client_address[1]
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(responseBytes)))
+        if self.path.endswith('/close'):
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(responseBytes)
+
+    do_DELETE = do_POST = do_PUT = do_GET
+
+    def log_message(self, format, *args):
+        pass
+
+class TLSServer(ThreadingHTTPServer):
+    def close_connections(self):
+        """\
+        Close the server end of every connection, as a server does when a
+        connection has been idle too long."""
+        for connection in tuple(self.connections):
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self.connections.clear()
+
+@pytest.fixture
+def tls_server(certificates):
+    """\
+    HTTPS server on localhost, with a certificate signed by the test CA, that
+    responds with a JSON object of the request method, path, body, and client
+    port. The connection is closed after the response if the path ends with
+    /close."""
+    server = TLSServer(('localhost', 0), EchoHandler)
+    server.connections = set()
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(
+        certificates / 'localhost.pem', certificates / 'localhost.key')
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.close_connections()
+    thread.join(5)
+    server.server_close()
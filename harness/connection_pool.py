@@ -0,0 +1,214 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Pool of keep-alive HTTPS connections for the Captive Web View python harness.
+
+Connections are pooled per host and port. A connection that is released after a
+complete response goes back in the pool, unless the server said it would close
+it, and the next request to the same host and port reuses it. That skips the
+TCP and TLS setup. Connections that have been idle longer than the idle timeout
+are closed when they're next looked at. A pooled connection is also checked
+before it's reused, and closed if the server has closed its end, or sent
+something unexpected, in the meantime.
+
+New connections resume the TLS session of the last connection to the same host
+and port, if there was one. That skips most of the TLS handshake even when a
+connection can't be reused. See:
+https://docs.python.org/3/library/ssl.html#ssl-session
+
+There is a limit to the number of connections open to each host and port at the
+same time. A request for another connection waits until one is released."""
+#
+# Standard library imports, in alphabetic order.
+#
+# HTTP modules.
+# https://docs.python.org/3/library/http.client.html#http.client.HTTPSConnection
+from http.client import HTTPConnection, HTTPSConnection
+#
+# Module for checking whether an idle socket has anything to read.
+# https://docs.python.org/3/library/select.html#select.select
+import select
+#
+# Module for threads and locks.
+# https://docs.python.org/3/library/threading.html
+import threading
+#
+# Module for monotonic time, used for idle times.
+# https://docs.python.org/3/library/time.html#time.monotonic
+import time
+
+class ResumingHTTPSConnection(HTTPSConnection):
+    """\
+    HTTPS connection that resumes a TLS session, if it's given one. The
+    session that was resumed, or the new session, is in the session property
+    after connecting."""
+    def __init__(self, host, port=None, context=None, session=None, **kwargs):
+        super().__init__(host, port=port, context=context, **kwargs)
+        self._resumeContext = context
+        self.session = session
+        self.sessionReused = False
+
+    # Override.
+    def connect(self):
+        # Same as the base class, but with a session.
+        HTTPConnection.connect(self)
+        self.sock = self._resumeContext.wrap_socket(
+            self.sock,
+            server_hostname=self._tunnel_host or self.host,
+            session=self.session)
+        self.sessionReused = self.sock.session_reused
+        self.session = self.sock.session
+
+class ConnectionPool:
+    def __init__(self, context, maxPerHost=4, idleTimeout=30.0):
+        self._context = context
+        self.maxPerHost = maxPerHost
+        self.idleTimeout = idleTimeout
+        self._condition = threading.Condition()
+        # Dictionary of host and port to a list of the idle connections and the
+        # times they were released, most recent last.
+        self._idle = {}
+        # Dictionary of host and port to the number of open connections.
+        self._open = {}
+        # Dictionary of host and port to the last TLS session.
+        self._sessions = {}
+        # Time that idle connections to every host were last checked.
+        self._swept = time.monotonic()
+        self.created = 0
+        self.reused = 0
+        self.resumed = 0
+        self.evicted = 0
+
+    def acquire(self, host, port, timeout=None, reuse=True):
+        """\
+        Connection to the host and port, and whether it's from the pool. A new
+        connection isn't connected yet. Either way, pass it to release() or
+        discard() when it's finished with. If reuse is False, then a new
+        connection is made even if there's one in the pool. Raises TimeoutError
+        if the limit of connections to the host and port is reached and none is
+        released in time."""
+        key = (host, port)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                connection = self._pop_idle(key) if reuse else None
+                if connection is not None:
+                    self.reused += 1
+                    return connection, True
+                if not reuse and self._idle.get(key):
+                    # Make room by closing the connection idle longest.
+                    self._evict(key, self._idle[key].pop(0)[0])
+                if self._open.get(key, 0) < self.maxPerHost:
+                    self._open[key] = self._open.get(key, 0) + 1
+                    break
+                remaining = (
+                    None if deadline is None else deadline - time.monotonic())
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(
+                        f'No connection to {host}:{port} within {timeout}s.')
+                self._condition.wait(remaining)
+            session = self._sessions.get(key)
+            self.created += 1
+        return ResumingHTTPSConnection(
+            host, port=port, context=self._context, session=session), False
+
+    def release(self, connection):
+        """\
+        Return a connection to the pool after its response has been read
+        completely. It's closed instead if the server is closing it."""
+        key = (connection.host, connection.port)
+        if connection.sock is None:
+            # http.client closes the connection if the response said so.
+            self.discard(connection)
+            return
+        with self._condition:
+            if connection.sessionReused:
+                self.resumed += 1
+            # Sessions from TLS 1.3 are only available after the handshake, so
+            # the session is read again now.
+            session = connection.sock.session
+            if session is not None:
+                self._sessions[key] = session
+            self._idle.setdefault(key, []).append(
+                (connection, time.monotonic()))
+            # Only count each connection's resumption once.
+            connection.sessionReused = False
+            self._condition.notify()
+
+    def discard(self, connection):
+        """Close a connection, for example after an error."""
+        connection.close()
+        key = (connection.host, connection.port)
+        with self._condition:
+            self._closed(key)
+
+    def close(self):
+        with self._condition:
+            idle, self._idle = self._idle, {}
+            for key, connections in idle.items():
+                for connection, _ in connections:
+                    connection.close()
+                    self._closed(key)
+
+    def as_dict(self):
+        with self._condition:
+            return {
+                'open': sum(self._open.values()),
+                'idle': sum(len(idle) for idle in self._idle.values()),
+                'created': self.created,
+                'reused': self.reused,
+                'resumed': self.resumed,
+                'evicted': self.evicted
+            }
+
+    def _pop_idle(self, key):
+        # Called with the lock held. The most recently released connection is
+        # reused first, so that the others go idle and are closed.
+        now = time.monotonic()
+        if now - self._swept >= self.idleTimeout:
+            self._swept = now
+            for idleKey in tuple(self._idle):
+                self._evict_expired(idleKey, now)
+        else:
+            self._evict_expired(key, now)
+        idle = self._idle.get(key, [])
+        while idle:
+            connection, _ = idle.pop()
+            if self._healthy(connection):
+                return connection
+            self._evict(key, connection)
+        return None
+
+    def _evict_expired(self, key, now):
+        # The oldest connections are at the bottom of the stack.
+        idle = self._idle.get(key, [])
+        while idle and now - idle[0][1] >= self.idleTimeout:
+            self._evict(key, idle.pop(0)[0])
+
+    def _evict(self, key, connection):
+        connection.close()
+        self._closed(key)
+        self.evicted += 1
+
+    def _healthy(self, connection):
+        # An idle connection should have nothing to read. If it's readable then
+        # either the server closed it, or sent something that wasn't asked for.
+        sock = connection.sock
+        if sock is None or sock.pending() > 0:
+            return False
+        try:
+            readable, _, _ = select.select((sock,), (), (), 0)
+        except (OSError, ValueError):
+            return False
+        return not readable
+
+    def _closed(self, key):
+        count = self._open.get(key, 0) - 1
+        if count > 0:
+            self._open[key] = count
+        else:
+            self._open.pop(key, None)
+        idle = self._idle.get(key)
+        if idle is not None and not idle:
+            del self._idle[key]
+        self._condition.notify()
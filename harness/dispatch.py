@@ -0,0 +1,247 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Command handler dispatch for the Captive Web View python harness server.
+
+A command handler can be a plain callable, which blocks while it runs, or a
+coroutine function. The dispatcher calls either kind from either server engine.
+
+-   In the threads engine, a plain handler runs in the request thread and a
+    coroutine handler runs in an event loop of its own, in the request thread.
+-   In the asyncio engine, a coroutine handler runs in the server's event loop
+    and a plain handler runs in the loop's executor, so neither blocks the loop.
+
+Each handler can also have a timeout and a concurrency limit, from its timeout
+and concurrency properties. The limit is the number of calls to the handler
+that can run at the same time. Further calls wait for a running call to finish,
+so that a slow type of command can't take all the server's threads, or all its
+executor threads, from other commands. The timeout covers the wait and the call.
+A call that times out raises HandlerTimeout.
+
+A coroutine handler that times out is cancelled. A plain handler can't be
+interrupted so, in the threads engine, a plain handler that has a timeout runs
+in an executor of its own and the request thread stops waiting for it. Either
+way, its concurrency slot is only freed when it finishes, so that calls that
+time out can't pile up."""
+#
+# Standard library imports, in alphabetic order.
+#
+# Asynchronous I/O module, used to run and time out coroutine handlers.
+# https://docs.python.org/3/library/asyncio.html
+import asyncio
+#
+# Thread pools, used to time out plain handlers in the threads engine.
+# https://docs.python.org/3/library/concurrent.futures.html
+import concurrent.futures
+#
+# Module for inspecting live objects, only used to identify coroutines.
+# https://docs.python.org/3/library/inspect.html
+import inspect
+#
+# Module for threads and locks.
+# https://docs.python.org/3/library/threading.html
+import threading
+#
+# Module for monotonic time, used for deadlines.
+# https://docs.python.org/3/library/time.html#time.monotonic
+import time
+
+def is_coroutine_handler(handler):
+    return inspect.iscoroutinefunction(handler) or (
+        inspect.iscoroutinefunction(getattr(handler, '__call__', None)))
+
+def handler_name(handler):
+    """\
+    Name of a handler in logs and metrics, which is its name property or else
+    its class name. A wrapper has the name of the handler that it wraps."""
+    return getattr(handler, 'name', None) or handler.__class__.__name__
+
+class HandlerTimeout(Exception):
+    def __init__(self, handler, timeout):
+        super().__init__(
+            f'{handler_name(handler)} timed out after {timeout} seconds.')
+        self.handler = handler
+        self.timeout = timeout
+
+def _remaining(deadline):
+    return None if deadline is None else max(deadline - time.monotonic(), 0)
+
+class _Limit:
+    def __init__(self, concurrency):
+        self.concurrency = concurrency
+        self.semaphore = (
+            None if concurrency is None
+            else threading.BoundedSemaphore(concurrency))
+        # The asyncio semaphore binds to the event loop when it's first waited
+        # on, so it can be created here.
+        self.asyncSemaphore = (
+            None if concurrency is None else asyncio.Semaphore(concurrency))
+        # Executor for timing out plain handlers, created on first use.
+        self.executor = None
+        self.lock = threading.Lock()
+        self.running = 0
+        self.waiting = 0
+        self.timeouts = 0
+
+    def acquire(self, deadline):
+        if self.semaphore is not None:
+            with self.lock:
+                self.waiting += 1
+            try:
+                acquired = self.semaphore.acquire(timeout=_remaining(deadline))
+            finally:
+                with self.lock:
+                    self.waiting -= 1
+            if not acquired:
+                return False
+        with self.lock:
+            self.running += 1
+        return True
+
+    async def acquire_async(self, deadline):
+        if self.asyncSemaphore is not None:
+            with self.lock:
+                self.waiting += 1
+            try:
+                await asyncio.wait_for(
+                    self.asyncSemaphore.acquire(), _remaining(deadline))
+            except asyncio.TimeoutError:
+                return False
+            finally:
+                with self.lock:
+                    self.waiting -= 1
+        with self.lock:
+            self.running += 1
+        return True
+
+    def release(self):
+        with self.lock:
+            self.running -= 1
+        if self.semaphore is not None:
+            self.semaphore.release()
+
+    def release_async(self):
+        # Only called in the event loop.
+        with self.lock:
+            self.running -= 1
+        if self.asyncSemaphore is not None:
+            self.asyncSemaphore.release()
+
+    def timed_out(self, handler, timeout):
+        with self.lock:
+            self.timeouts += 1
+        return HandlerTimeout(handler, timeout)
+
+class Dispatcher:
+    # Maximum number of threads in the executor of a plain handler that has a
+    # timeout but no concurrency limit.
+    timeoutWorkers = 8
+
+    def __init__(self, handlers):
+        """\
+        The concurrency property of each handler is read here, and its timeout
+        property on each call."""
+        self._limits = {
+            handler: _Limit(getattr(handler, 'concurrency', None))
+            for handler in handlers}
+
+    def call(self, handler, commandObject, httpHandler):
+        """\
+        Response from a handler, in the threads engine. Raises HandlerTimeout if
+        the handler has a timeout and it elapses."""
+        limit = self._limits[handler]
+        timeout = getattr(handler, 'timeout', None)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if not limit.acquire(deadline):
+            raise limit.timed_out(handler, timeout)
+
+        if is_coroutine_handler(handler):
+            try:
+                return asyncio.run(self._wait_for(
+                    handler(commandObject, httpHandler), limit, handler,
+                    timeout, deadline))
+            finally:
+                limit.release()
+
+        if deadline is None:
+            try:
+                return handler(commandObject, httpHandler)
+            finally:
+                limit.release()
+
+        if limit.executor is None:
+            with limit.lock:
+                if limit.executor is None:
+                    limit.executor = concurrent.futures.ThreadPoolExecutor(
+                        limit.concurrency or self.timeoutWorkers,
+                        thread_name_prefix=handler_name(handler))
+        try:
+            future = limit.executor.submit(handler, commandObject, httpHandler)
+        except BaseException:
+            limit.release()
+            raise
+        future.add_done_callback(lambda future: limit.release())
+        try:
+            return future.result(_remaining(deadline))
+        except concurrent.futures.TimeoutError:
+            raise limit.timed_out(handler, timeout) from None
+
+    async def call_async(self, handler, commandObject, httpHandler):
+        """\
+        Response from a handler, in the asyncio engine. Raises HandlerTimeout
+        if the handler has a timeout and it elapses."""
+        limit = self._limits[handler]
+        timeout = getattr(handler, 'timeout', None)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if not await limit.acquire_async(deadline):
+            raise limit.timed_out(handler, timeout)
+
+        if is_coroutine_handler(handler):
+            try:
+                return await self._wait_for(
+                    handler(commandObject, httpHandler), limit, handler,
+                    timeout, deadline)
+            finally:
+                limit.release_async()
+
+        try:
+            future = asyncio.get_running_loop().run_in_executor(
+                None, handler, commandObject, httpHandler)
+        except BaseException:
+            limit.release_async()
+            raise
+
+        def finished(future):
+            if not future.cancelled():
+                # Retrieves the exception of a call that timed out, so that it
+                # isn't logged as never retrieved.
+                future.exception()
+            limit.release_async()
+        future.add_done_callback(finished)
+        # The shield stops wait_for() from cancelling the future, which would
+        # free the slot while the handler is still running.
+        return await self._wait_for(
+            asyncio.shield(future), limit, handler, timeout, deadline)
+
+    async def _wait_for(self, awaitable, limit, handler, timeout, deadline):
+        try:
+            return await asyncio.wait_for(awaitable, _remaining(deadline))
+        except asyncio.TimeoutError:
+            raise limit.timed_out(handler, timeout) from None
+
+    def as_dict(self):
+        handlers = {}
+        for handler, limit in self._limits.items():
+            with limit.lock:
+                counts = {
+                    'running': limit.running,
+                    'waiting': limit.waiting,
+                    'timeouts': limit.timeouts}
+            # Handlers with the same name are counted together.
+            name = handler_name(handler)
+            if name in handlers:
+                counts = {
+                    key: handlers[name][key] + value
+                    for key, value in counts.items()}
+            handlers[name] = counts
+        return handlers
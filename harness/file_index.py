@@ -0,0 +1,73 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Filename index for the Captive Web View python harness server.
+
+The server looks up files by name in each of its directories in turn. The index
+maps each name to the relative path of the file in the first directory that has
+it, so that a lookup is a dictionary access instead of a stat per directory. The
+index is rebuilt whenever a watcher notices a change to any of the directories.
+"""
+#
+# Standard library imports, in alphabetic order.
+#
+# Module for scanning directories.
+# https://docs.python.org/3/library/os.html#os.scandir
+import os
+#
+# Module for threads and locks.
+# https://docs.python.org/3/library/threading.html
+import threading
+#
+# Local imports.
+#
+# Polling watcher.
+from harness.watcher import Watcher, stat_snapshot
+
+class FileIndex:
+    def __init__(self, directories, relativePaths, interval=1.0):
+        self._directories = tuple(directories)
+        self._relativePaths = tuple(relativePaths)
+        self._lock = threading.Lock()
+        self._index = {}
+        self._watcher = Watcher(
+            stat_snapshot(self._directories), self._on_change, interval)
+
+    def __len__(self):
+        return len(self._index)
+
+    def get(self, filename):
+        """Relative path of the file, or None if there isn't one."""
+        # A plain dictionary read doesn't need the lock. The whole dictionary is
+        # replaced when the index is rebuilt.
+        return self._index.get(filename)
+
+    def items(self):
+        return self._index.items()
+
+    def build(self):
+        index = {}
+        # Directories are scanned in reverse order so that the first directory
+        # that has a file overwrites any later one.
+        for directory, relativePath in reversed(tuple(
+            zip(self._directories, self._relativePaths)
+        )):
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        index[entry.name] = relativePath.joinpath(entry.name)
+        with self._lock:
+            self._index = index
+        return self
+
+    def start(self):
+        self.build()
+        if self._watcher.interval > 0:
+            self._watcher.start()
+        return self
+
+    def stop(self):
+        self._watcher.stop()
+
+    def _on_change(self, snapshot):
+        self.build()
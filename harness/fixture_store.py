@@ -0,0 +1,206 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Store of recorded command responses for the Captive Web View python harness.
+
+The responses are in one append-only JSON lines file. Each line has the key of
+a command, the command object, and the response, like this.
+
+    {"key": "...", "command": {...}, "response": {...}}
+
+Beside it is an index file, with the same name and .index appended. Each line
+of the index is a key and the offset and length of its line in the responses
+file. The index is appended to as responses are recorded too. If a key is
+recorded more than once, the last recording is used.
+
+When the store is opened, only the index is read, into a dictionary. Any lines
+of the responses file that are after the last indexed line, for example if the
+recorder was interrupted, are indexed by reading them. The responses file is
+then mapped into memory. Each response is decoded, and encoded for sending, the
+first time that it's looked up, so that a store of thousands of responses opens
+quickly and there is no file access per command.
+
+Record with only one server process, so that there's only one writer."""
+#
+# Standard library imports, in alphabetic order.
+#
+# Module for memory-mapped files.
+# https://docs.python.org/3/library/mmap.html
+import mmap
+#
+# Module for threads and locks.
+# https://docs.python.org/3/library/threading.html
+import threading
+#
+# Local imports.
+#
+# JSON codec.
+from harness import codec
+#
+# Response objects that have their JSON encoding already.
+from harness.response_store import EncodedResponse
+
+class FixtureStore:
+    def __init__(self, path, record=False):
+        """\
+        path is the responses file, which needn't exist yet. If record is True,
+        then the files are opened for appending."""
+        self._path = path
+        self._indexPath = path.with_name(path.name + '.index')
+        self._record = record
+        self._lock = threading.Lock()
+        self._loaded = False
+        # Dictionary of key to the offset and length of its line.
+        self._entries = {}
+        # Dictionary of key to the decoded response, or to the encoded response
+        # if it isn't a dictionary.
+        self._responses = {}
+        self._map = None
+        self._file = None
+        self._indexFile = None
+        self._size = 0
+
+    def __len__(self):
+        self._load()
+        return len(self._entries)
+
+    def get(self, key):
+        """Response for the key, or None if there isn't one."""
+        self._load()
+        response = self._responses.get(key)
+        if response is None:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            offset, length = entry
+            loaded = codec.loads(self._map[offset:offset + length])['response']
+            response = (
+                EncodedResponse(loaded) if isinstance(loaded, dict)
+                else codec.dumps(loaded))
+            self._responses[key] = response
+        # Only dictionaries are shared, like in the ResponseStore.
+        return (
+            response if isinstance(response, EncodedResponse)
+            else codec.loads(response))
+
+    def record(self, key, commandObject, response):
+        """\
+        Append a response to the store. Raises TypeError or ValueError if it
+        can't be encoded as JSON."""
+        if not self._record:
+            raise RuntimeError('Store isn\'t open for recording.')
+        self._load()
+        line = codec.dumps({
+            "key": key,
+            "command": {
+                "command": commandObject.get('command'),
+                "parameters": commandObject.get('parameters')
+            },
+            "response": response
+        }) + b'\n'
+        stored = (
+            EncodedResponse(response) if isinstance(response, dict)
+            else codec.dumps(response))
+        with self._lock:
+            offset = self._size
+            self._file.write(line)
+            self._file.flush()
+            self._indexFile.write(f'{key} {offset} {len(line)}\n')
+            self._indexFile.flush()
+            self._size += len(line)
+            self._entries[key] = (offset, len(line))
+            self._responses[key] = stored
+
+    def close(self):
+        with self._lock:
+            for file in (self._map, self._file, self._indexFile):
+                if file is not None:
+                    file.close()
+            self._map = self._file = self._indexFile = None
+            self._loaded = False
+
+    def _load(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._open()
+            self._loaded = True
+
+    def _open(self):
+        try:
+            size = self._path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        entries, end, indexEnded = self._read_index(size)
+        unindexed, end = self._scan(end, entries)
+
+        if self._record:
+            self._file = open(self._path, 'ab')
+            if self._file.tell() > end:
+                # The last line is incomplete. End it, so that it's skipped as
+                # invalid and the next line starts on a line of its own.
+                self._file.write(b'\n')
+                self._file.flush()
+            self._size = self._file.tell()
+            self._indexFile = open(self._indexPath, 'a', encoding='utf-8')
+            if not indexEnded:
+                # Same for the index.
+                self._indexFile.write('\n')
+            self._indexFile.writelines(
+                f'{key} {offset} {length}\n'
+                for key, offset, length in unindexed)
+            self._indexFile.flush()
+
+        if size > 0:
+            with open(self._path, 'rb') as file:
+                self._map = mmap.mmap(
+                    file.fileno(), size, access=mmap.ACCESS_READ)
+        self._entries = entries
+
+    def _read_index(self, size):
+        # Returns the entries, the end of the last indexed line, and whether the
+        # index file ends with a line break.
+        entries = {}
+        end = 0
+        ended = True
+        try:
+            with open(self._indexPath, encoding='utf-8') as file:
+                for line in file:
+                    ended = line.endswith('\n')
+                    try:
+                        key, offset, length = line.split()
+                        offset, length = int(offset), int(length)
+                    except ValueError:
+                        # Incomplete line, or an empty line that ended one.
+                        continue
+                    if offset + length > size:
+                        continue
+                    entries[key] = (offset, length)
+                    end = max(end, offset + length)
+        except FileNotFoundError:
+            pass
+        return entries, end, ended
+
+    def _scan(self, offset, entries):
+        # Index the complete lines after the offset. Returns them, and the end
+        # of the last complete line.
+        unindexed = []
+        try:
+            with open(self._path, 'rb') as file:
+                file.seek(offset)
+                for line in file:
+                    if not line.endswith(b'\n'):
+                        break
+                    try:
+                        key = codec.loads(line)['key']
+                    except (ValueError, TypeError, KeyError):
+                        key = None
+                    if isinstance(key, str):
+                        entries[key] = (offset, len(line))
+                        unindexed.append((key, offset, len(line)))
+                    offset += len(line)
+        except FileNotFoundError:
+            pass
+        return unindexed, offset
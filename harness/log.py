@@ -0,0 +1,97 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Logging for the Captive Web View python harness.
+
+Log records are put on a queue by the thread that logs them and written to
+standard error by a background thread, so that request handling threads don't
+wait for the write. Messages are only formatted if their level is enabled, so
+debug messages, like dumps of request and response payloads, cost next to
+nothing unless the level is debug.
+
+The access log has one line per request, either in the same text format as the
+Python http.server module or as a JSON object per line."""
+#
+# Standard library imports, in alphabetic order.
+#
+# JSON module, only used for the JSON lines access log.
+# https://docs.python.org/3/library/json.html
+import json
+#
+# Logging module and its queue handler and listener.
+# https://docs.python.org/3/library/logging.html
+# https://docs.python.org/3/library/logging.handlers.html#queuehandler
+import logging
+import logging.handlers
+#
+# Module for a thread-safe queue.
+# https://docs.python.org/3/library/queue.html
+import queue
+#
+# Module for the operating system interface.
+# https://docs.python.org/3/library/sys.html
+import sys
+
+logger = logging.getLogger('harness')
+accessLogger = logging.getLogger('harness.access')
+
+levels = ('debug', 'info', 'warning', 'error')
+accessLogFormats = ('text', 'json', 'off')
+
+class HarnessFormatter(logging.Formatter):
+    # Same layout as the BaseHTTPRequestHandler.log_message() method.
+    textFormat = '%(client)s - - [%(asctime)s] %(message)s'
+    dateFormat = '%d/%b/%Y %H:%M:%S'
+
+    def __init__(self, jsonAccess):
+        super().__init__(self.textFormat, self.dateFormat)
+        self._jsonAccess = jsonAccess
+
+    # Override.
+    def format(self, record):
+        access = getattr(record, 'access', None)
+        if self._jsonAccess and access is not None:
+            return json.dumps({
+                'time': self.formatTime(record, self.dateFormat), **access})
+        if not hasattr(record, 'client'):
+            # Records that aren't about a request have no client. This isn't
+            # done by the defaults parameter of the base class constructor
+            # because that needs Python 3.10.
+            record.client = '-'
+        return super().format(record)
+
+class LogPipeline:
+    def __init__(self, level='info', accessLog='text', stream=None):
+        self._level = getattr(logging, level.upper())
+        self._accessLog = accessLog
+        self._stream = sys.stderr if stream is None else stream
+        self._queue = queue.SimpleQueue()
+        self._queueHandler = logging.handlers.QueueHandler(self._queue)
+        self._listener = None
+
+    @property
+    def debug(self):
+        return self._level <= logging.DEBUG
+
+    def start(self):
+        streamHandler = logging.StreamHandler(self._stream)
+        streamHandler.setFormatter(HarnessFormatter(self._accessLog == 'json'))
+        self._listener = logging.handlers.QueueListener(
+            self._queue, streamHandler)
+
+        logger.setLevel(self._level)
+        logger.addHandler(self._queueHandler)
+        logger.propagate = False
+        # The access log level is independent of the main log level.
+        accessLogger.setLevel(
+            logging.CRITICAL + 1 if self._accessLog == 'off'
+            else logging.INFO)
+        self._listener.start()
+        return self
+
+    def stop(self):
+        """Write any queued records and stop the background thread."""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+        logger.removeHandler(self._queueHandler)
@@ -0,0 +1,254 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Request metrics for the Captive Web View python harness server.
+
+Each request is recorded against a route, which is a kind and a name. The kinds
+are static, for GET requests of files, command, for POST requests by command
+name, and handler, for each command handler that was called. Command names that
+no handler has answered are counted together, under (unknown). Each route has
+counts by status, a total of bytes sent, and a histogram of durations from
+which the 50th, 95th, and 99th percentiles are estimated.
+
+Metrics can be rendered in the Prometheus text exposition format, see:
+https://prometheus.io/docs/instrumenting/exposition_formats/
+or as a JSON-able dictionary.
+
+Each server process has its own metrics."""
+#
+# Standard library imports, in alphabetic order.
+#
+# Module for searching the bucket bounds.
+# https://docs.python.org/3/library/bisect.html
+import bisect
+#
+# Module for counting statuses.
+# https://docs.python.org/3/library/collections.html#collections.Counter
+from collections import Counter
+#
+# Module for threads and locks.
+# https://docs.python.org/3/library/threading.html
+import threading
+#
+# Module for monotonic time, used by the Timer.
+# https://docs.python.org/3/library/time.html#time.monotonic
+import time
+
+class Histogram:
+    # Upper bounds of the buckets, in seconds. There is also an implicit
+    # infinite bucket.
+    bounds = (
+        0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+        2.5, 5.0, 10.0)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, fraction):
+        """\
+        Estimate of the quantile, by linear interpolation within the bucket that
+        contains it, like the Prometheus histogram_quantile() function."""
+        if self.count == 0:
+            return 0.0
+        rank = fraction * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            if count == 0 or cumulative + count < rank:
+                cumulative += count
+                continue
+            lower = 0.0 if index == 0 else self.bounds[index - 1]
+            if index == len(self.bounds):
+                # The infinite bucket, so the best estimate is the maximum.
+                return self.max
+            upper = self.bounds[index]
+            return min(
+                lower + (upper - lower) * (rank - cumulative) / count,
+                self.max)
+        return self.max
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.bounds + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+class Route:
+    def __init__(self):
+        self.statuses = Counter()
+        self.bytes = 0
+        self.durations = Histogram()
+
+    def as_dict(self, quantiles):
+        return {
+            'count': self.durations.count,
+            'statuses': {
+                str(status): count for status, count in self.statuses.items()},
+            'bytes': self.bytes,
+            'seconds': {
+                'sum': self.durations.sum,
+                'max': self.durations.max,
+                **{
+                    f'p{round(quantile * 100)}':
+                    self.durations.quantile(quantile)
+                    for quantile in quantiles
+                }
+            }
+        }
+
+class Timer:
+    """\
+    Context manager that observes the time taken by its block. Set the status
+    property in the block. If the block raises an exception, the status is
+    error."""
+    def __init__(self, metrics, kind, name):
+        self._metrics = metrics
+        self._kind = kind
+        self._name = name
+        self._started = None
+        self.status = 'error'
+
+    def __enter__(self):
+        self._started = time.monotonic()
+        return self
+
+    def __exit__(self, exceptionType, exception, traceback):
+        if exceptionType is not None:
+            self.status = 'error'
+        self._metrics.observe(
+            self._kind, self._name, self.status, None,
+            time.monotonic() - self._started)
+        return False
+
+def _label(value):
+    # https://prometheus.io/docs/instrumenting/exposition_formats/#comments-help-text-and-type-information
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace(
+        '"', '\\"')
+
+class Metrics:
+    quantiles = (0.5, 0.95, 0.99)
+    prefix = 'harness'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+        # Dictionary of collector name to a function and a label name, for
+        # other gauges and counters, like the worker pool and asset cache.
+        self._collectors = {}
+
+    def observe(self, kind, name, status, bytes, seconds):
+        with self._lock:
+            route = self._routes.get((kind, name))
+            if route is None:
+                route = self._routes[(kind, name)] = Route()
+            route.statuses[status] += 1
+            route.bytes += 0 if bytes is None else bytes
+            route.durations.observe(seconds)
+
+    def timer(self, kind, name):
+        return Timer(self, kind, name)
+
+    def add_collector(self, name, collector, label=None):
+        """\
+        Add a function that returns a dictionary of name to number. If there is
+        a label, the function returns a dictionary of label value to such
+        dictionaries instead, and each number is a sample with that label."""
+        self._collectors[name] = (collector, label)
+
+    def as_dict(self):
+        with self._lock:
+            routes = {}
+            for (kind, name), route in sorted(self._routes.items()):
+                routes.setdefault(kind, {})[name] = route.as_dict(
+                    self.quantiles)
+        return {
+            'routes': routes,
+            **{
+                name: collector()
+                for name, (collector, _) in self._collectors.items()
+            }
+        }
+
+    def prometheus(self):
+        lines = []
+        def family(name, type_, help_):
+            lines.append(f'# HELP {self.prefix}_{name} {help_}')
+            lines.append(f'# TYPE {self.prefix}_{name} {type_}')
+
+        with self._lock:
+            routes = sorted(self._routes.items())
+            family('requests_total', 'counter', 'Requests by route and status.')
+            for (kind, name), route in routes:
+                for status, count in sorted(route.statuses.items()):
+                    lines.append(
+                        f'{self.prefix}_requests_total{{kind="{kind}"'
+                        f',name="{_label(name)}",status="{status}"}} {count}')
+
+            family('response_bytes_total', 'counter', 'Bytes sent by route.')
+            for (kind, name), route in routes:
+                lines.append(
+                    f'{self.prefix}_response_bytes_total{{kind="{kind}"'
+                    f',name="{_label(name)}"}} {route.bytes}')
+
+            family(
+                'request_duration_seconds', 'histogram',
+                'Request durations by route.')
+            for (kind, name), route in routes:
+                labels = f'kind="{kind}",name="{_label(name)}"'
+                for bound, total in route.durations.cumulative():
+                    bound = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(
+                        f'{self.prefix}_request_duration_seconds_bucket'
+                        f'{{{labels},le="{bound}"}} {total}')
+                lines.append(
+                    f'{self.prefix}_request_duration_seconds_sum{{{labels}}}'
+                    f' {route.durations.sum}')
+                lines.append(
+                    f'{self.prefix}_request_duration_seconds_count{{{labels}}}'
+                    f' {route.durations.count}')
+
+            family(
+                'request_duration_quantile_seconds', 'gauge',
+                'Estimated request duration percentiles by route.')
+            for (kind, name), route in routes:
+                for quantile in self.quantiles:
+                    lines.append(
+                        f'{self.prefix}_request_duration_quantile_seconds'
+                        f'{{kind="{kind}",name="{_label(name)}"'
+                        f',quantile="{quantile}"}}'
+                        f' {route.durations.quantile(quantile)}')
+
+        for collectorName, (collector, label) in self._collectors.items():
+            collected = collector()
+            # Dictionary of name to the label values and numbers, so that all
+            # the samples of a family are together.
+            samples = {}
+            for labelValue, values in (
+                ((None, collected),) if label is None else collected.items()
+            ):
+                for name, value in values.items():
+                    if isinstance(value, (int, float)):
+                        samples.setdefault(name, []).append(
+                            (labelValue, int(value) if isinstance(value, bool)
+                             else value))
+            for name, values in samples.items():
+                family(
+                    f'{collectorName}_{name}', 'gauge',
+                    f'{collectorName} {name}.')
+                for labelValue, value in values:
+                    labels = (
+                        '' if labelValue is None
+                        else f'{{{label}="{_label(labelValue)}"}}')
+                    lines.append(
+                        f'{self.prefix}_{collectorName}_{name}{labels} {value}')
+
+        lines.append('')
+        return '\n'.join(lines)
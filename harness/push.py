@@ -0,0 +1,279 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Push channels for the Captive Web View python harness server.
+
+Pages subscribe to a channel with the EventSource interface, which opens a
+Server-Sent Events stream, see:
+https://html.spec.whatwg.org/multipage/server-sent-events.html
+
+Command handlers, or any other code in the server, publish events to a channel
+and every subscriber gets a copy. Each event is encoded once, when it is
+published, and the encoded bytes are shared by the subscribers.
+
+Each subscriber has a bounded buffer of events that haven't been written yet. If
+a subscriber falls so far behind that its buffer is full, then the drop policy
+applies.
+
+-   oldest drops the oldest buffered event, to make room for the new one.
+-   newest drops the new event.
+-   disconnect closes the subscriber's stream. The EventSource reconnects and
+    sends the ID of the last event it got, so it can be sent the events it
+    missed that are still in the channel history.
+
+A comment line is written to each stream that has had no events for the
+heartbeat interval, so that closed connections are noticed and idle ones are
+kept open."""
+#
+# Standard library imports, in alphabetic order.
+#
+# Asynchronous I/O module, only used to wait for events in the asyncio engine.
+# https://docs.python.org/3/library/asyncio.html
+import asyncio
+#
+# Module for double-ended queues.
+# https://docs.python.org/3/library/collections.html#collections.deque
+from collections import deque
+#
+# Module for the event ID counter.
+# https://docs.python.org/3/library/itertools.html#itertools.count
+import itertools
+#
+# Module for threads and locks.
+# https://docs.python.org/3/library/threading.html
+import threading
+#
+# Module for simple immutable objects with type specification.
+# https://docs.python.org/3/library/typing.html#typing.NamedTuple
+from typing import NamedTuple
+#
+# Local imports.
+#
+# JSON codec.
+from harness import codec
+
+dropPolicies = ('oldest', 'newest', 'disconnect')
+
+# Comment line, which the EventSource ignores.
+heartbeat = b':\n\n'
+
+class Event(NamedTuple):
+    id: int
+    # Encoded event, ready to write to a stream.
+    frame: bytes
+
+def event_frame(eventID, data, event=None):
+    """\
+    Encoded event. data is a str, or an object that is encoded as JSON."""
+    if not isinstance(data, str):
+        data = codec.dumps(data).decode()
+    lines = [f'id: {eventID}']
+    if event is not None:
+        if '\n' in event or '\r' in event:
+            raise ValueError(f'Line break in event type {event!r}.')
+        lines.append(f'event: {event}')
+    # A data field can't contain a line break, so each line goes in a field of
+    # its own. The EventSource joins them back together.
+    lines.extend(
+        f'data: {line}'
+        for line in data.replace('\r\n', '\n').replace('\r', '\n').split('\n'))
+    return ('\n'.join(lines) + '\n\n').encode()
+
+class Subscription:
+    def __init__(self, channel, bufferSize, dropPolicy):
+        self.channel = channel
+        self._bufferSize = bufferSize
+        self._dropPolicy = dropPolicy
+        self._events = deque()
+        self._condition = threading.Condition()
+        # Function that wakes an asyncio waiter, if there is one.
+        self._wake = None
+        self.closed = False
+        self.dropped = 0
+
+    def put(self, event):
+        """\
+        Add an event to the buffer. Returns False if it was dropped, or the
+        subscription is closed."""
+        with self._condition:
+            if self.closed:
+                return False
+            if len(self._events) >= self._bufferSize:
+                self.dropped += 1
+                if self._dropPolicy == 'newest':
+                    return False
+                if self._dropPolicy == 'disconnect':
+                    self._close()
+                    return False
+                self._events.popleft()
+            self._events.append(event)
+            self._notify()
+            return True
+
+    def close(self):
+        with self._condition:
+            self._close()
+
+    def get(self, timeout):
+        """\
+        List of the buffered events, waiting up to timeout seconds for one. The
+        list is empty if the timeout elapsed. Returns None once the subscription
+        is closed."""
+        with self._condition:
+            if not self._events and not self.closed:
+                self._condition.wait(timeout)
+            return self._take()
+
+    async def get_async(self, timeout):
+        """Same as the get() method but doesn't block the event loop."""
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        def wake():
+            if not waiter.done():
+                waiter.set_result(None)
+        with self._condition:
+            if self._events or self.closed:
+                return self._take()
+            # The event could be published from any thread.
+            self._wake = lambda: loop.call_soon_threadsafe(wake)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._condition:
+                self._wake = None
+        with self._condition:
+            return self._take()
+
+    def _take(self):
+        if self.closed:
+            return None
+        events = list(self._events)
+        self._events.clear()
+        return events
+
+    def _close(self):
+        self.closed = True
+        self._events.clear()
+        self._notify()
+
+    def _notify(self):
+        self._condition.notify_all()
+        if self._wake is not None:
+            try:
+                self._wake()
+            except RuntimeError:
+                # The event loop is closed.
+                pass
+
+class Channel:
+    def __init__(self, historySize):
+        self.subscriptions = set()
+        # Recent events, for subscribers that reconnect.
+        self.history = deque(maxlen=historySize)
+        self.published = 0
+
+class PushHub:
+    def __init__(
+        self, bufferSize=64, dropPolicy='oldest', heartbeatInterval=15.0,
+        historySize=32
+    ):
+        if dropPolicy not in dropPolicies:
+            raise ValueError(f'Unknown drop policy "{dropPolicy}".')
+        self.bufferSize = bufferSize
+        self.dropPolicy = dropPolicy
+        self.heartbeatInterval = heartbeatInterval
+        self._historySize = historySize
+        self._lock = threading.Lock()
+        self._channels = {}
+        self._ids = itertools.count(1)
+        self._closed = False
+        # Events dropped by subscriptions that have ended.
+        self._dropped = 0
+
+    def publish(self, channel, data, event=None):
+        """\
+        Send an event to every subscriber of the channel. data is a str, or an
+        object that is sent as JSON. event is the event type, or None for the
+        default message type. Returns the number of subscribers that got it."""
+        # The counter is thread-safe. The event is encoded outside the lock, in
+        # case it is large.
+        eventID = next(self._ids)
+        published = Event(eventID, event_frame(eventID, data, event))
+        with self._lock:
+            subscribers = self._channel(channel)
+            subscribers.history.append(published)
+            subscribers.published += 1
+            subscriptions = tuple(subscribers.subscriptions)
+        delivered = 0
+        for subscription in subscriptions:
+            if subscription.put(published):
+                delivered += 1
+        return delivered
+
+    def subscribe(self, channel, lastEventID=None):
+        """\
+        New subscription to the channel. If lastEventID is the ID of an event
+        in the channel history, then the subscription starts with the events
+        after it."""
+        subscription = Subscription(channel, self.bufferSize, self.dropPolicy)
+        with self._lock:
+            if self._closed:
+                subscription.close()
+                return subscription
+            subscribers = self._channel(channel)
+            subscribers.subscriptions.add(subscription)
+            try:
+                lastID = int(lastEventID)
+            except (TypeError, ValueError):
+                lastID = None
+            if lastID is not None:
+                for event in subscribers.history:
+                    if event.id > lastID:
+                        subscription.put(event)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscription.close()
+        with self._lock:
+            subscribers = self._channels.get(subscription.channel)
+            if subscribers is None:
+                return
+            if subscription in subscribers.subscriptions:
+                subscribers.subscriptions.discard(subscription)
+                self._dropped += subscription.dropped
+            if not subscribers.subscriptions and not subscribers.history:
+                del self._channels[subscription.channel]
+
+    def close(self):
+        """Close every subscription, which ends their streams."""
+        with self._lock:
+            self._closed = True
+            subscriptions = tuple(
+                subscription for subscribers in self._channels.values()
+                for subscription in subscribers.subscriptions)
+        for subscription in subscriptions:
+            subscription.close()
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'channels': len(self._channels),
+                'subscribers': sum(
+                    len(subscribers.subscriptions)
+                    for subscribers in self._channels.values()),
+                'published': sum(
+                    subscribers.published
+                    for subscribers in self._channels.values()),
+                'dropped': self._dropped + sum(
+                    subscription.dropped
+                    for subscribers in self._channels.values()
+                    for subscription in subscribers.subscriptions)
+            }
+
+    def _channel(self, name):
+        subscribers = self._channels.get(name)
+        if subscribers is None:
+            subscribers = self._channels[name] = Channel(self._historySize)
+        return subscribers
@@ -0,0 +1,126 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Request body reading for the Captive Web View python harness server.
+
+The body is either the Content-Length number of bytes or, if the request has
+Transfer-Encoding: chunked, a sequence of chunks. See:
+https://www.rfc-editor.org/rfc/rfc9112#section-6
+https://www.rfc-editor.org/rfc/rfc9112#section-7.1
+
+The size of a body can be limited. A Content-Length over the limit is rejected
+before any of the body is read. A chunked body is rejected as soon as its chunks
+add up to more than the limit.
+
+Either way, the body is read into one buffer, without any intermediate copies,
+so that a large body, like a base64 image, takes its own size in memory and no
+more until it is parsed. There is a synchronous and an asynchronous reader, one
+for each server engine."""
+
+# Same limit as the BaseHTTPRequestHandler class uses for header lines.
+maxLine = 65536
+
+class BodyError(Exception):
+    """\
+    Request body that can't be read. The status property is the HTTP status
+    code for the response."""
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+def body_length(headers, maxBytes):
+    """\
+    Number of bytes in the body, or None if it is chunked. maxBytes of zero
+    means no limit. Raises BodyError if the body can't be read."""
+    transferEncoding = headers.get('Transfer-Encoding')
+    if transferEncoding is not None:
+        if transferEncoding.strip().lower() != 'chunked':
+            raise BodyError(
+                501, f'Unsupported Transfer-Encoding "{transferEncoding}".')
+        return None
+
+    contentLength = headers.get('Content-Length')
+    if contentLength is None:
+        return 0
+    try:
+        length = int(contentLength)
+    except ValueError:
+        length = -1
+    if length < 0:
+        raise BodyError(400, f'Invalid Content-Length "{contentLength}".')
+    if maxBytes > 0 and length > maxBytes:
+        raise BodyError(
+            413, f'Content-Length {length} is more than the limit {maxBytes}.')
+    return length
+
+def _chunk_size(line, total, maxBytes):
+    if len(line) > maxLine or not line.endswith(b'\n'):
+        raise BodyError(400, 'Invalid chunk size line.')
+    # Chunk extensions, after a semicolon, are ignored.
+    try:
+        size = int(line.partition(b';')[0].strip(), 16)
+    except ValueError:
+        size = -1
+    if size < 0:
+        raise BodyError(400, 'Invalid chunk size.')
+    if maxBytes > 0 and total + size > maxBytes:
+        raise BodyError(413, f'Chunked body is more than the limit {maxBytes}.')
+    return size
+
+def _check_chunk_end(line):
+    if line not in (b'\r\n', b'\n'):
+        raise BodyError(400, 'Chunk data is longer than its size.')
+
+def read_body(rfile, headers, maxBytes):
+    """Body from a buffered binary file, like a request handler's rfile."""
+    length = body_length(headers, maxBytes)
+    if length is None:
+        body = bytearray()
+        while True:
+            size = _chunk_size(rfile.readline(maxLine + 1), len(body), maxBytes)
+            if size == 0:
+                break
+            data = rfile.read(size)
+            if len(data) < size:
+                raise BodyError(400, 'Incomplete chunk.')
+            body += data
+            _check_chunk_end(rfile.readline(maxLine + 1))
+        # Trailer fields, which are ignored, end with an empty line.
+        while rfile.readline(maxLine + 1) not in (b'\r\n', b'\n', b''):
+            pass
+        return body
+
+    body = bytearray(length)
+    view = memoryview(body)
+    offset = 0
+    while offset < length:
+        count = rfile.readinto(view[offset:])
+        if not count:
+            raise BodyError(400, 'Incomplete body.')
+        offset += count
+    return body
+
+async def read_body_async(reader, headers, maxBytes):
+    """Body from an asyncio.StreamReader."""
+    length = body_length(headers, maxBytes)
+    if length is not None:
+        return await reader.readexactly(length) if length > 0 else b''
+
+    async def readline():
+        try:
+            return await reader.readline()
+        except ValueError:
+            # Longer than the stream limit, which is the same as maxLine.
+            raise BodyError(400, 'Chunked body line too long.')
+
+    body = bytearray()
+    while True:
+        size = _chunk_size(await readline(), len(body), maxBytes)
+        if size == 0:
+            break
+        body += await reader.readexactly(size)
+        _check_chunk_end(await readline())
+    while await readline() not in (b'\r\n', b'\n', b''):
+        pass
+    return body
@@ -0,0 +1,209 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Store of canned JSON responses for the Captive Web View python harness.
+
+Every .json file in a directory is loaded and encoded once. A command lookup is
+then a dictionary access that returns the loaded object together with its
+encoded bytes, which the server writes without serialising again. Lookups of
+commands that have no file are remembered too, so they don't touch the file
+system either.
+
+The directory is checked for added, removed, and changed files at most once per
+interval, by the first lookup after the interval has elapsed, and the store is
+reloaded if there was any change. No thread is needed, so the store can be
+created before the server forks its processes."""
+#
+# Standard library imports, in alphabetic order.
+#
+# Module for scanning directories.
+# https://docs.python.org/3/library/os.html#os.scandir
+import os
+#
+# Module for pure path manipulation, without file system access.
+# https://docs.python.org/3/library/pathlib.html#pure-paths
+from pathlib import PurePath
+#
+# Module for threads and locks.
+# https://docs.python.org/3/library/threading.html
+import threading
+#
+# Module for monotonic time, used to limit the rate of directory checks.
+# https://docs.python.org/3/library/time.html#time.monotonic
+import time
+#
+# Local imports.
+#
+# JSON codec.
+from harness import codec
+#
+# Polling watcher.
+from harness.watcher import Watcher
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError(
+        'EncodedResponse is read-only. Use with_items(), or copy() it.')
+
+class EncodedResponse(dict):
+    """\
+    Response object that also has its JSON encoding, in the encoded property.
+    Instances are shared between requests, so they're read-only, and the items
+    can't get out of step with the encoding. Use the with_items() method to get
+    a response with more items, or the copy() method to get a dict that can be
+    modified. Values in the response, like lists, are shared too and mustn't be
+    modified."""
+    def __init__(self, responseObject, encoded=None):
+        super().__init__(responseObject)
+        self.encoded = (
+            codec.dumps(responseObject) if encoded is None else encoded)
+        self._extended = {}
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    # Override, so that copying and pickling don't set the items one by one.
+    def __reduce__(self):
+        return self.__class__, (dict(self), self.encoded)
+
+    def with_items(self, **items):
+        """\
+        Response with the items added, which is encoded the first time that
+        those items are added and then reused."""
+        key = tuple(sorted(items.items()))
+        extended = self._extended.get(key)
+        if extended is None:
+            extended = self._extended.setdefault(
+                key, EncodedResponse({**self, **items}))
+        return extended
+
+def encode_response(response):
+    """\
+    JSON encoding of a response object, which is the stored encoding if it's an
+    EncodedResponse."""
+    return (
+        response.encoded if isinstance(response, EncodedResponse)
+        else codec.dumps(response))
+
+def json_snapshot(directory):
+    """\
+    Snapshot function that returns the name, modification time, and size of
+    each .json file in the directory."""
+    def snapshot():
+        files = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.endswith('.json') and entry.is_file():
+                    stat = entry.stat()
+                    files.append((entry.name, stat.st_mtime_ns, stat.st_size))
+        return tuple(sorted(files))
+    return snapshot
+
+class ResponseStore:
+    # The remembered lookups are discarded when there are more than this many,
+    # so that clients sending arbitrary command names can't use up memory.
+    maxLookups = 1024
+
+    def __init__(self, directory, interval=1.0):
+        """\
+        interval is the minimum number of seconds between checks of the
+        directory for changes. Zero means only load the directory once."""
+        self._directory = directory
+        self._interval = interval
+        self._lock = threading.Lock()
+        self._watcher = Watcher(
+            json_snapshot(directory), self._on_change, interval)
+        self._checked = None
+        # Dictionary of file name to response, or to the exception raised when
+        # the file was loaded.
+        self._files = {}
+        # Dictionary of command name to file name, or to None for commands that
+        # have no file.
+        self._lookups = {}
+
+    def __len__(self):
+        return len(self._files)
+
+    def get(self, command):
+        """\
+        Response for the command, or None if there is no file for it. Raises
+        ValueError if the file isn't valid JSON."""
+        self._check()
+        fileName = self._lookups.get(command, False)
+        if fileName is False:
+            fileName = self._lookup(command)
+        if fileName is None:
+            return None
+
+        response = self._files.get(fileName)
+        if response is None:
+            # Removed by a reload since the lookup.
+            return None
+        if isinstance(response, Exception):
+            raise response
+        return (
+            response if isinstance(response, EncodedResponse)
+            # Only dictionaries are shared, so that the caller can't modify a
+            # list or other loaded object. Load a new copy.
+            else codec.loads(response))
+
+    def _check(self):
+        if self._checked is not None and (
+            self._interval <= 0
+            or time.monotonic() - self._checked < self._interval
+        ):
+            return
+        # If another thread is checking already then use the current files.
+        if not self._lock.acquire(blocking=self._checked is None):
+            return
+        try:
+            # The first check always calls back, which loads the files.
+            self._watcher.check()
+        except OSError:
+            # For example, the directory was removed. Keep the current files and
+            # try again after the interval.
+            pass
+        finally:
+            self._checked = time.monotonic()
+            self._lock.release()
+
+    def _lookup(self, command):
+        # Same file as the original JSONFileCommandHandler opened, which was the
+        # command path with its suffix, if any, replaced by .json
+        fileName = PurePath(command).with_suffix('.json').name
+        if fileName not in self._files:
+            fileName = None
+        lookups = self._lookups
+        if len(lookups) >= self.maxLookups:
+            lookups = {}
+        lookups[command] = fileName
+        self._lookups = lookups
+        return fileName
+
+    def _on_change(self, snapshot):
+        self._load(snapshot)
+
+    def _load(self, snapshot):
+        files = {}
+        for fileName, _, _ in snapshot:
+            try:
+                with open(self._directory / fileName, 'rb') as file:
+                    encoded = file.read()
+                loaded = codec.loads(encoded)
+            except FileNotFoundError:
+                # Removed since the snapshot. The next check will notice.
+                continue
+            except ValueError as exception:
+                files[fileName] = ValueError(
+                    f'Invalid JSON in "{self._directory / fileName}". '
+                    f'{exception}')
+                continue
+            # The encoding is the codec's encoding of the object, and not the
+            # file content, so that the response is byte for byte the same as
+            # the response to a command that isn't stored.
+            files[fileName] = (
+                EncodedResponse(loaded) if isinstance(loaded, dict)
+                else codec.dumps(loaded))
+        # Replace the dictionaries instead of modifying them so that lookups by
+        # other threads don't need the lock.
+        self._files = files
+        self._lookups = {}
@@ -1,5 +1,5 @@
 # Run with Python 3
-# Copyright 2022 VMware, Inc.  
+# Copyright 2026 VMware, Inc.  
 # SPDX-License-Identifier: BSD-2-Clause
 """\
 HTTP server that can be used as a back end to Captive Web View applications.
@@ -8,23 +8,110 @@ The server is based around a Python3 Simple HTTP Server extended to pick files
 from one of a number of directories.
 
 The server will change directory to the common parent of all directories
-specified."""
+specified.
+
+File names are looked up in an index of the directories, which is kept up to
+date by polling. Specify --no-index to look in each directory on every request
+instead.
+
+Files are served from an in-memory cache, with entity tags and last modified
+dates so that clients can revalidate them. Specify --cache 0 to disable the
+cache. Large files aren't cached and are sent with zero-copy sendfile() instead.
+Single byte range requests are supported.
+
+Specify --compress to build gzip, and brotli if installed, variants of text
+files at startup. Variants are sent to clients that accept them. Variants are
+built from cached files, so --compress can't be used with --cache 0.
+
+Specify --keep-alive to serve HTTP/1.1 persistent connections, so that a page
+load can reuse a few connections instead of opening one per request.
+
+By default, each connection is handled in a new thread. Specify --workers to
+handle connections in a fixed size pool of threads instead. Connections that
+arrive when the pool's queue is full are answered with 503 Service Unavailable.
+
+Specify --engine asyncio to serve all connections from one asyncio event loop
+instead. Command handlers can then be coroutines, which run in the loop. Other
+command handlers run in a pool of threads, of the --workers size if specified.
+Subclass AsyncCommandHandler to write a coroutine handler.
+
+A command handler can have a timeout property, after which the command fails,
+and a concurrency property, which limits how many calls to the handler can run
+at the same time, so that one slow command can't hold up the others.
+
+Specify --processes to run a number of server processes that all listen on the
+same port, with the SO_REUSEPORT socket option. A supervisor process restarts
+any server process that exits, and prefixes their log lines.
+
+Log messages are written by a background thread. Specify --log-level debug, or
+--verbose, to log request and response payloads. Specify --access-log json to
+write the access log as JSON lines.
+
+POST bodies can have a Content-Length or be chunked, and are limited to the
+--max-body size. A body over the limit gets 413 Payload Too Large, before it is
+read if the length is known. JSON bodies are parsed with the standard json
+module, or with orjson or ujson if selected by --json-decoder. Specify
+--compact-json to encode responses with the selected module too.
+
+POST a JSON array of command objects, or an object with a "batch" array of them,
+to run a number of commands in one request. The response is an array of their
+responses, in the same order. Add "concurrent": true to the object to run the
+commands at the same time, in a pool of --batch-workers threads.
+
+Pages can subscribe to push channels with an EventSource on the /_events/<name>
+path. Command handlers publish to a channel with their publish() method. Each
+subscriber has a buffer of --events-buffer events, with the --events-drop policy
+for when it is full. With the threads engine, each open event stream occupies a
+thread.
+
+Pages can also send command objects over a WebSocket on the /_ws path, which
+saves a request per command. Each message is a command object, limited to the
+--max-body size. Add an "id" item to the object to get the response as
+{"id": <id>, "response": <response>}. Up to --ws-concurrency commands from a
+connection are handled at the same time, so responses can arrive out of order.
+
+Command handlers can record responses to a --fixtures file, with --record, and
+replay them later without calling the original handlers. See the
+command_handler/record_replay.py module. Responses to commands that depend only
+on their parameters can be memoized with --memoize, see the memo.py module in
+the same directory.
+
+Request counts, bytes, and latency percentiles are served from the /_metrics
+path in Prometheus text format, and from the /_metrics.json path as JSON.
+"""
 #
 # Standard library imports, in alphabetic order.
 #
+# Asynchronous I/O module, only used to run the commands of a batch
+# concurrently in the asyncio engine.
+# https://docs.python.org/3/library/asyncio.html
+import asyncio
+#
 # Module for command line switches.
 # Tutorial: https://docs.python.org/3/howto/argparse.html
 # Reference: https://docs.python.org/3/library/argparse.html
 import argparse
 #
+# Thread pool for running the commands of a batch concurrently.
+# https://docs.python.org/3/library/concurrent.futures.html#threadpoolexecutor
+from concurrent.futures import ThreadPoolExecutor
+#
 # Module for HTTP server
 # https://docs.python.org/3/library/http.server.html
 from http.server import HTTPServer, SimpleHTTPRequestHandler
 #
-# JSON module.
+# JSON module, only used for indented output. Other JSON goes through the codec.
 # https://docs.python.org/3/library/json.html
 import json
 #
+# Logging module, only used for level constants.
+# https://docs.python.org/3/library/logging.html
+import logging
+#
+# Module for guessing the type of a file from its name.
+# https://docs.python.org/3/library/mimetypes.html
+import mimetypes
+#
 # Module for changing the current directory.
 #  https://docs.python.org/3/library/os.html#os.chdir
 from os import chdir
@@ -37,6 +124,10 @@ import os.path
 # https://docs.python.org/3/library/pathlib.html
 from pathlib import Path
 #
+# Module for socket options.
+# https://docs.python.org/3/library/socket.html
+import socket
+#
 # Module to create an HTTP server that spawns a thread for each request.
 # https://docs.python.org/3/library/socketserver.html#module-socketserver
 # The ThreadingMixIn is needed because of an apparent defect in Python, see:
@@ -50,12 +141,106 @@ from socketserver import ThreadingMixIn
 # https://docs.python.org/3/library/sys.html
 from sys import exit, stderr
 #
+# Module for threads and locks, used by WebSocket connections.
+# https://docs.python.org/3/library/threading.html
+import threading
+#
+# Module for monotonic time, used to measure request durations.
+# https://docs.python.org/3/library/time.html#time.monotonic
+import time
+#
 # Module for text dedentation.
 # Only used for --help description.
 # https://docs.python.org/3/library/textwrap.html
 import textwrap
+#
+# Module for parsing the channel name from an events path.
+# https://docs.python.org/3/library/urllib.parse.html
+from urllib.parse import unquote, urlsplit
+#
+# Local imports.
+#
+# Server engine based on asyncio streams.
+from harness.async_engine import AsyncioHandlerMixIn, AsyncioServerMixIn
+#
+# In-memory cache of served files.
+from harness.asset_cache import AssetCache
+#
+# JSON codec.
+from harness import codec
+#
+# Memoizing command handler wrapper.
+from harness.command_handler.memo import MemoizingCommandHandler, memoize
+#
+# Compressed variants of served files.
+from harness.compression import Compressor
+#
+# Command handler dispatch, with timeouts and concurrency limits.
+from harness.dispatch import Dispatcher, HandlerTimeout, handler_name
+#
+# Index of file names in the served directories.
+from harness.file_index import FileIndex
+#
+# Logging pipeline.
+from harness.log import (
+    LogPipeline, accessLogFormats, accessLogger, levels, logger)
+#
+# Request metrics.
+from harness.metrics import Metrics
+#
+# Push channels to pages.
+from harness.push import PushHub, dropPolicies, heartbeat
+#
+# Request body reading.
+from harness.request_body import BodyError, body_length, read_body
+#
+# Response objects that have their JSON encoding already.
+from harness.response_store import EncodedResponse, encode_response
+#
+# Static file responses.
+from harness.static import static_response
+#
+# Supervisor of multiple server processes.
+from harness.supervisor import Supervisor
+#
+# WebSocket protocol.
+from harness import websocket
+#
+# Fixed size pool of worker threads.
+from harness.worker_pool import WorkerPoolMixIn
+
+class HarnessServer(HTTPServer):
+    # Set to False to stat each directory on every request instead.
+    useIndex = True
+    # Seconds between checks of the directories for changes to the index. Zero
+    # means build the index once at startup.
+    pollInterval = 1.0
+    fileIndex = None
+    # AssetCache instance, which can have zero size.
+    assetCache = AssetCache(0)
+    # Files at least this size aren't cached and are sent with sendfile().
+    sendfileThreshold = 256 * 1024
+    # Compressor instance, or None to send files uncompressed.
+    compressor = None
+    # Persistent connection settings. If keepAlive is False then the handler
+    # speaks HTTP/1.0 and closes the connection after each response.
+    keepAlive = False
+    idleTimeout = 5.0
+    maxRequests = 100
+    # Largest request body, in bytes, or zero for no limit.
+    maxBodyBytes = 16 * 1024 * 1024
+    # Metrics instance, set by Main.
+    metrics = None
+    # PushHub instance, set by Main. Command handlers publish events to it.
+    push = None
+    # Names of the commands that a handler has answered, added to by Main.
+    # Metrics for any other command name are recorded under (unknown), so that
+    # clients can't add routes without limit.
+    commandNames = frozenset()
+    # Number of commands from one WebSocket connection that can be handled at
+    # the same time. Further messages aren't read until one finishes.
+    websocketConcurrency = 8
 
-class Server(ThreadingMixIn, HTTPServer):
     @property
     def directories(self):
         return self._directories
@@ -71,11 +256,57 @@ class Server(ThreadingMixIn, HTTPServer):
         filename = os.path.basename(filename)
         if filename == "":
             filename = "index.html"
+        if self.fileIndex is not None:
+            path = self.fileIndex.get(filename)
+            if path is None:
+                raise ValueError('File "{}" not found.'.format(filename))
+            return path
         for index, directory in enumerate(self.directories):
             if directory.joinpath(filename).is_file():
                 return self.relativePaths[index].joinpath(filename)
         raise ValueError('File "{}" not found.'.format(filename))
     
+    def bind_reuse_port(self):
+        """\
+        Bind and listen on a new socket that has the SO_REUSEPORT option, so
+        that other processes can listen on the same port."""
+        # The socket created by the constructor could be shared with other
+        # processes, if it was created before a fork, so replace it.
+        self.socket.close()
+        self.socket = socket.socket(self.address_family, self.socket_type)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        try:
+            self.server_bind()
+            self.server_activate()
+        except:
+            self.server_close()
+            raise
+
+    def path_for_request(self, requestPath):
+        """\
+        Relative path of the file to serve for a request path, and the index of
+        the directory that the request path is in, or None if the request was
+        for a resource from root. Raises PermissionError if the request path
+        isn't in any served directory, or ValueError if the file isn't found."""
+        # Check for resources that are allowed to be requested from root. Chrome
+        # seems to request everything other than the favicon with a path though.
+        parted = requestPath.rpartition("/")
+        if parted[0] == "" and (parted[1] == "/" or parted[1] == ""):
+            return self.path_for_file(requestPath), None
+
+        # Check for other resources in allowed directories.
+        effectivePath = (
+            requestPath[1:] if requestPath.startswith("/") else requestPath)
+        for index, prefix in enumerate(self.relativePaths):
+            if effectivePath.startswith(str(prefix)):
+                # By now, it's determined that the path in the request is one
+                # that is allowed by the server. It might have been requested
+                # from a resource in one directory but be in another. The
+                # path_for_file() method takes care of that.
+                return self.path_for_file(requestPath), index
+
+        raise PermissionError(f'Path "{requestPath}" not allowed.')
+
     def handle_command(self, commandObject, httpHandler):
         raise NotImplementedError(
             "Server method `handle_command` must be set by Main subclass.")
@@ -143,94 +374,566 @@ class Server(ThreadingMixIn, HTTPServer):
             , os.path.commonpath(self.directories), htmlFiles
         )
     
-    def serve_forever(self):
+    def build_variants(self):
+        variants = 0
+        for directory in self.directories:
+            for path in directory.iterdir():
+                try:
+                    asset = self.assetCache.get(path)
+                except OSError:
+                    continue
+                contentType, _ = mimetypes.guess_type(path)
+                variants += self.compressor.build(asset, contentType or "")
+        encodings = ", ".join(
+            encoding for encoding, _ in self.compressor.encodings)
+        logger.info(
+            'Compressed variants: %d. Encodings: %s.', variants, encodings)
+
+    def start_serving(self):
+        """Set up before serving. Called by serve_forever()."""
+        # Sockets of open WebSocket connections, in the threads engine.
+        self._websockets = set()
         chdir(os.path.commonpath(self.directories))
         fromDir = Path.cwd()
         self._relativePaths = tuple(
             directory.relative_to(fromDir) for directory in self.directories)
-        return super().serve_forever()
+        if self.useIndex:
+            self.fileIndex = FileIndex(
+                self.directories, self._relativePaths, self.pollInterval
+            ).start()
+        if self.compressor is not None:
+            self.build_variants()
+
+    def stop_serving(self):
+        """Clean up after serving. Called by serve_forever()."""
+        if self.fileIndex is not None:
+            self.fileIndex.stop()
+        # Ends the event streams, so that their threads finish.
+        if self.push is not None:
+            self.push.close()
+        # Same for WebSocket connections.
+        for connection in tuple(self._websockets):
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def serve_forever(self):
+        self.start_serving()
+        try:
+            return super().serve_forever()
+        finally:
+            self.stop_serving()
+
+class Server(ThreadingMixIn, HarnessServer):
+    pass
+
+class PoolServer(WorkerPoolMixIn, HarnessServer):
+    pass
 
 class Handler(SimpleHTTPRequestHandler):
+    # Reserved paths, from which the server metrics are served.
+    metricsPaths = ('/_metrics', '/_metrics.json')
+    # Reserved path prefix, under which each path is the event stream of a push
+    # channel.
+    eventsPath = '/_events/'
+    # Reserved path, on which WebSocket connections carry command objects.
+    websocketPath = '/_ws'
+
+    # Error codes after which a persistent connection can stay open. The request
+    # will have been read completely in these cases.
+    keepAliveErrors = (403, 404, 416)
+
+    # Override.
+    def setup(self):
+        self._setup_connection()
+        super().setup()
+
+    def _setup_connection(self):
+        self._requests = 0
+        self._keepAliveError = False
+        self._headOnly = False
+        self._started = None
+        self._status = None
+        self._contentLength = None
+        self._route = None
+        if self.server.keepAlive:
+            self.protocol_version = "HTTP/1.1"
+            # The base class sets the timeout on the socket, and closes the
+            # connection if it is idle for longer.
+            self.timeout = self.server.idleTimeout
+
+    # Override.
+    def handle_one_request(self):
+        self._requests += 1
+        self._keepAliveError = False
+        self._started = None
+        try:
+            super().handle_one_request()
+        finally:
+            self._end_request()
+
+    # Override.
+    def parse_request(self):
+        # Called after the request line has been read, so that the time spent
+        # waiting on an idle connection isn't counted.
+        self._started = time.monotonic()
+        self._status = None
+        self._contentLength = None
+        self._route = None
+        return super().parse_request()
+
+    def _end_request(self):
+        if self._started is None or self._status is None:
+            return
+        duration = time.monotonic() - self._started
+        self._started = None
+        if self._route is not None and self.server.metrics is not None:
+            self.server.metrics.observe(
+                *self._route, self._status, self._contentLength, duration)
+        if not accessLogger.isEnabledFor(logging.INFO):
+            return
+        accessLogger.info(
+            '"%s" %s %s', self.requestline, self._status,
+            '-' if self._contentLength is None else self._contentLength,
+            extra={'client': self.address_string(), 'access': {
+                'client': self.address_string(),
+                'method': self.command,
+                'path': self.path,
+                'version': self.request_version,
+                'status': self._status,
+                'bytes': self._contentLength,
+                'duration': round(duration, 6)
+            }})
+
+    # Override.
+    def log_request(self, code='-', size='-'):
+        # The access log is written by the _end_request() method, when the
+        # response has been sent.
+        self._status = int(code)
+
+    # Override.
+    def log_message(self, format, *args):
+        logger.info(format, *args, extra={'client': self.address_string()})
+
+    # Override.
+    def log_error(self, format, *args):
+        logger.warning(format, *args, extra={'client': self.address_string()})
+
+    def log_debug(self, format, *args):
+        logger.debug(format, *args, extra={'client': self.address_string()})
+
+    # Override.
+    def handle_expect_100(self):
+        # Reject a body that is too large before the client sends it.
+        try:
+            body_length(self.headers, self.server.maxBodyBytes)
+        except BodyError as error:
+            self.send_error(error.status, explain=error.message)
+            return False
+        return super().handle_expect_100()
+
+    # Override.
+    def end_headers(self):
+        if (
+            self.server.keepAlive and not self.close_connection
+            and self._requests >= self.server.maxRequests
+        ):
+            # Sending this header sets close_connection in the base class.
+            self.send_header("Connection", "close")
+        super().end_headers()
+
+    # Override.
+    def send_error(self, code, message=None, explain=None):
+        self._keepAliveError = (
+            self.server.keepAlive and code in self.keepAliveErrors)
+        super().send_error(code, message, explain)
+
+    # Override.
+    def send_header(self, keyword, value):
+        if keyword.lower() == "content-length":
+            self._contentLength = int(value)
+        # The base class send_error() always closes the connection. Skip that
+        # for errors that leave the connection in a good state.
+        if (
+            self._keepAliveError and keyword.lower() == "connection"
+            and value.lower() == "close"
+        ):
+            return
+        super().send_header(keyword, value)
+
     def do_GET(self):
-        responsePath = None
-        
-        # Check for resources that are allowed to be requested from root. Chrome
-        # seems to request everything other than the favicon with a path though.
-        
+        if self.path in self.metricsPaths:
+            self._send_metrics()
+            return
+        channel = self._events_channel()
+        if channel is not None:
+            self._send_events(channel)
+            return
+        if urlsplit(self.path).path == self.websocketPath:
+            self._serve_websocket()
+            return
+
         try:
-            parted = self.path.rpartition("/")
-            
-            if parted[0] == "" and (parted[1] == "/" or parted[1] == ""):
-                self.log_message("%s", 'Root resource "{}".'.format(self.path))
-                responsePath = self.server.path_for_file(self.path)
+            responsePath, directoryIndex = self.server.path_for_request(
+                self.path)
+        except PermissionError:
+            self._route = ('static', '(forbidden)')
+            self.send_error(403)
+            return
         except ValueError as error:
+            self._route = ('static', '(not found)')
             self.send_error(404, str(error))
             return
+        self._route = ('static', str(responsePath))
 
-        # Check for other resources in allowed directories.
-        directoryIndex = None
-        if responsePath is None:
-            effectivePath = (
-                self.path[1:] if self.path.startswith("/") else self.path)
-            for index, prefix in enumerate(self.server.relativePaths):
-                if effectivePath.startswith(str(prefix)):
-                    directoryIndex = index
+        if directoryIndex is None:
+            self.log_debug('Root resource "%s".', self.path)
+        self.log_debug(
+            'Response path "%s" "%s" %s.', self.path, responsePath,
+            directoryIndex)
+        self._send_asset(str(responsePath))
+
+    # Override.
+    def do_HEAD(self):
+        # The base class would look for the file in the current directory, so
+        # handle HEAD the same as GET and then leave out the body.
+        self._headOnly = True
+        try:
+            self.do_GET()
+        finally:
+            self._headOnly = False
+
+    def _send_asset(self, path):
+        try:
+            response = static_response(
+                self.server, path, self.headers, self.guess_type(path))
+        except OSError:
+            self.send_error(404, "File not found")
+            return
+
+        self.send_response(response.status)
+        for keyword, value in response.headers:
+            self.send_header(keyword, value)
+        self.end_headers()
+
+        if self._headOnly:
+            return
+        if response.data is not None:
+            self.wfile.write(response.data)
+            return
+        if response.path is not None:
+            self._send_file(response)
+
+    def _send_file(self, response):
+        with open(response.path, 'rb') as file:
+            if response.count >= self.server.sendfileThreshold:
+                # The socket sendfile() method uses the zero-copy os.sendfile()
+                # where available and falls back to send() otherwise.
+                # https://docs.python.org/3/library/socket.html#socket.socket.sendfile
+                self.connection.sendfile(file, response.start, response.count)
+            else:
+                file.seek(response.start)
+                remaining = response.count
+                while remaining > 0:
+                    chunk = file.read(min(remaining, 64 * 1024))
+                    if chunk == b'':
+                        break
+                    self.wfile.write(chunk)
+                    remaining -= len(chunk)
+
+    def _send_metrics(self):
+        metrics = self.server.metrics
+        if metrics is None:
+            self.send_error(404)
+            return
+        if self.path.endswith('.json'):
+            contentType = "application/json"
+            body = json.dumps(metrics.as_dict(), indent=2).encode()
+        else:
+            # https://prometheus.io/docs/instrumenting/exposition_formats/#basic-info
+            contentType = "text/plain; version=0.0.4; charset=utf-8"
+            body = metrics.prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-type", contentType)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if not self._headOnly:
+            self.wfile.write(body)
+
+    def _events_channel(self):
+        """Channel name if the request is for an event stream, or None."""
+        if not self.path.startswith(self.eventsPath):
+            return None
+        return unquote(urlsplit(self.path).path[len(self.eventsPath):])
+
+    def _start_events(self, channel):
+        """\
+        Send the headers of an event stream and return a subscription to the
+        channel. Returns None if there is no stream to send, because an error
+        was sent or the request was HEAD."""
+        push = self.server.push
+        if push is None or channel == "":
+            self._route = ('events', '(not found)')
+            self.send_error(404)
+            return None
+        self._route = ('events', channel)
+        subscription = None if self._headOnly else push.subscribe(
+            channel, self.headers.get('Last-Event-ID'))
+        self.send_response(200)
+        self.send_header("Content-type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        # The stream has no length, so it ends when the connection closes.
+        self.send_header("Connection", "close")
+        self.end_headers()
+        return subscription
+
+    def _send_events(self, channel):
+        subscription = self._start_events(channel)
+        if subscription is None:
+            return
+        push = self.server.push
+        try:
+            # An initial heartbeat tells the client that the stream is open.
+            self.wfile.write(heartbeat)
+            while True:
+                events = subscription.get(push.heartbeatInterval)
+                if events is None:
                     break
-        
-            if directoryIndex is None:
-                self.send_error(403)
-                return
-            
-            # By now, it's determined that the path in the request is one that
-            # is allowed by the server. It might have been requested from a
-            # resource in one directory but be in another. The path_for_file()
-            # method takes care of that.
+                self.wfile.write(
+                    b''.join(event.frame for event in events) if events
+                    else heartbeat)
+        except OSError:
+            # Client went away, or didn't read for the socket timeout.
+            pass
+        finally:
+            push.unsubscribe(subscription)
+
+    def _start_websocket(self):
+        """\
+        Send the handshake response and return True, or send an error and return
+        False."""
+        self._route = ('websocket', '(connection)')
+        if self._headOnly:
+            # The opening handshake has to be a GET.
+            # https://www.rfc-editor.org/rfc/rfc6455#section-4.1
+            self.send_response(405)
+            self.send_header('Allow', 'GET')
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return False
+        if self.headers.get('Sec-WebSocket-Version') != websocket.version:
+            self.send_response(426)
+            self.send_header('Sec-WebSocket-Version', websocket.version)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return False
+        try:
+            acceptKey = websocket.accept_key(self.headers)
+        except ValueError as error:
+            self.send_error(400, explain=str(error))
+            return False
+        # The connection isn't reused for HTTP after the WebSocket closes.
+        self.close_connection = True
+        # A browser requires the response to be HTTP/1.1.
+        self.protocol_version = "HTTP/1.1"
+        self.send_response(101)
+        self.send_header('Upgrade', 'websocket')
+        self.send_header('Connection', 'Upgrade')
+        self.send_header('Sec-WebSocket-Accept', acceptKey)
+        self.end_headers()
+        return True
+
+    def _websocket_request(self, payload):
+        """\
+        Request ID and command object of a message, or raises ValueError. The ID
+        is None if the message hasn't got one."""
+        message = codec.loads(payload)
+        if isinstance(message, dict) and 'id' in message:
+            return message.pop('id'), message
+        return None, message
+
+    def _websocket_response(
+        self, requestID, response, name, started, status='handled'
+    ):
+        """\
+        Frame of the response to a message. It has the request ID, if there was
+        one, so that the client can match responses to requests in any
+        order."""
+        body = encode_response(response)
+        if requestID is not None:
+            body = b'{"id": %s, "response": %s}' % (
+                codec.dumps(requestID), body)
+        if self.server.metrics is not None:
+            self.server.metrics.observe(
+                'websocket', name, status, len(body),
+                time.monotonic() - started)
+        return websocket.frame(websocket.TEXT, body)
+
+    def _websocket_failure(self, requestID, error, started):
+        self.log_error('WebSocket command failed. %r', error)
+        return self._websocket_response(
+            requestID, {"failed": f'{error.__class__.__name__}: {error}'},
+            '(failed)', started, 'error')
+
+    def _websocket_command(self, payload):
+        """Frame of the response to a message, in the threads engine."""
+        started = time.monotonic()
+        requestID = None
+        try:
+            requestID, commandObject = self._websocket_request(payload)
+            response = self.server.handle_command(commandObject, self)
+        except Exception as error:
+            return self._websocket_failure(requestID, error, started)
+        return self._websocket_response(
+            requestID, response, self._command_name(commandObject), started)
+
+    def _serve_websocket(self):
+        if not self._start_websocket():
+            return
+        # Messages can be any time apart so there's no idle timeout. The
+        # server shuts the socket down when it stops, which ends the loop.
+        self.connection.settimeout(None)
+        self.server._websockets.add(self.connection)
+        writeLock = threading.Lock()
+        concurrency = threading.BoundedSemaphore(
+            self.server.websocketConcurrency)
+        executor = ThreadPoolExecutor(
+            self.server.websocketConcurrency, thread_name_prefix='WebSocket')
+
+        def send(header, payload):
+            with writeLock:
+                self.wfile.write(header)
+                self.wfile.write(payload)
+
+        def run(payload):
             try:
-                responsePath = self.server.path_for_file(self.path)
-            except ValueError as error:
-                self.send_error(404, str(error))
-                return
-        
-        self.log_message("%s", 'Response path "{}" "{}" {}.'.format(
-            self.path, responsePath, directoryIndex))
-        if responsePath is not None:
-            self.path = str(responsePath)
-        super().do_GET()
-    
+                send(*self._websocket_command(payload))
+            except OSError:
+                # Connection closed before the response could be sent.
+                pass
+            finally:
+                concurrency.release()
+
+        parser = websocket.FrameParser(self.server.maxBodyBytes)
+        try:
+            while True:
+                data = self.rfile.read1(64 * 1024)
+                if data == b'':
+                    break
+                try:
+                    messages = parser.feed(data)
+                except websocket.ProtocolError as error:
+                    send(*websocket.frame(websocket.CLOSE, (
+                        websocket.close_payload(error.code, str(error)))))
+                    break
+                for opcode, payload in messages:
+                    if opcode == websocket.CLOSE:
+                        send(*websocket.frame(websocket.CLOSE, payload[:2]))
+                        return
+                    if opcode == websocket.PING:
+                        send(*websocket.frame(websocket.PONG, payload))
+                    elif opcode in (websocket.TEXT, websocket.BINARY):
+                        # Blocks while the connection has the maximum number
+                        # of commands running.
+                        concurrency.acquire()
+                        executor.submit(run, payload)
+        except OSError:
+            pass
+        finally:
+            executor.shutdown(wait=True)
+            self.server._websockets.discard(self.connection)
+
     def _send_object(self, responseObject):
-        responseBytes = json.dumps(responseObject).encode()
-        self.log_message("%s", 'Response object {} {}.'.format(
-            responseObject, responseBytes))
+        responseBytes = encode_response(responseObject)
+        self.log_debug('Response object %s %s.', responseObject, responseBytes)
         self.send_response(200)
+        self.send_header("Content-Length", str(len(responseBytes)))
         self.end_headers()
         self.wfile.write(responseBytes)
     
     def do_POST(self):
-        # TOTH: https://github.com/sjjhsjjh/blender-driver/blob/master/blender_driver/application/http.py#L263
-        contentLengthHeader = self.headers.get('Content-Length')
-        contentLength = (
-            0 if contentLengthHeader is None else int(contentLengthHeader))
-        contentJSON = (
-            self.rfile.read(contentLength).decode('utf-8') if contentLength > 0
-            else None)
-        content = None if contentJSON is None else json.loads(contentJSON)
-
-        self.log_message("%s", "POST object {}.".format(
-            json.dumps(content, indent=2)))
-        
-        if content is None:
-            self.send_error(400)
-        else:
-            try:
-                response = self.server.handle_command(content, self)
-                if response is not None:
-                    self._send_object(response)
-            except:
-                self.send_error(501)
-                raise
+        try:
+            content = self._read_content()
+        except BodyError as error:
+            self._route = ('command', '(none)')
+            # The rest of the body, if any, hasn't been read so the connection
+            # can't be reused. The base class send_error() closes it.
+            self.send_error(error.status, explain=error.message)
+            return
+        try:
+            if content is None:
+                self.send_error(400)
+            else:
+                try:
+                    response = self.server.handle_command(content, self)
+                    if response is not None:
+                        self._send_object(response)
+                except:
+                    self.send_error(501)
+                    raise
+        finally:
+            # Set after the command is handled, so that a command that is
+            # answered for the first time is counted under its name.
+            self._route = ('command', self._command_name(content))
         
         # self.path is ignored.
 
+    def _command_name(self, content):
+        if batch_commands(content) is not None:
+            return '(batch)'
+        try:
+            command = content['command']
+        except (KeyError, TypeError):
+            return '(none)'
+        try:
+            known = command in self.server.commandNames
+        except TypeError:
+            # Not a hashable value.
+            known = False
+        return str(command) if known else '(unknown)'
+
+    def _read_body(self):
+        return read_body(self.rfile, self.headers, self.server.maxBodyBytes)
+
+    def _read_content(self):
+        # TOTH: https://github.com/sjjhsjjh/blender-driver/blob/master/blender_driver/application/http.py#L263
+        body = self._read_body()
+        try:
+            content = codec.loads(body) if len(body) > 0 else None
+        except ValueError as error:
+            raise BodyError(400, f'Invalid JSON. {error}')
+        # Release the body before any debug dump of the content.
+        del body
+
+        if logger.isEnabledFor(logging.DEBUG):
+            self.log_debug("POST object %s.", json.dumps(content, indent=2))
+        return content
+
+class AsyncHandler(AsyncioHandlerMixIn, Handler):
+    pass
+
+class AsyncServer(AsyncioServerMixIn, HarnessServer):
+    def handle_command_async(self, commandObject, httpHandler):
+        raise NotImplementedError(
+            "Server method `handle_command_async` must be set by Main"
+            " subclass.")
+
+def batch_commands(commandObject):
+    """\
+    Tuple of the list of command objects in a batch, and whether they can run
+    concurrently, or None if the object isn't a batch."""
+    if isinstance(commandObject, list):
+        return commandObject, False
+    if (
+        isinstance(commandObject, dict)
+        and 'command' not in commandObject
+        and isinstance(commandObject.get('batch'), list)
+    ):
+        return (
+            commandObject['batch'], commandObject.get('concurrent') is True)
+    return None
+
 class Main:
     def __init__(self, prog, description, argv):
         argumentParser = argparse.ArgumentParser(
@@ -242,13 +945,213 @@ class Main:
         argumentParser.add_argument(
             '-p', '--port', type=int, default=8001, help=
             'Port number. Default: 8001.')
+        argumentParser.add_argument(
+            '--no-index', dest='index', action='store_false', help=
+            'Look for each requested file in every directory, instead of in an'
+            ' index of file names built at startup.')
+        argumentParser.add_argument(
+            '--poll', type=float, default=1.0, metavar='SECONDS', help=
+            'Interval between checks of the directories for added and removed'
+            ' files, to keep the index up to date. Zero to build the index only'
+            ' at startup. Default: 1.')
+        argumentParser.add_argument(
+            '--cache', type=float, default=32, metavar='MEGABYTES', help=
+            'Size of the in-memory cache of served files. Zero to read every'
+            ' file from disk on every request. Default: 32.')
+        argumentParser.add_argument(
+            '--sendfile', type=float, default=256, metavar='KILOBYTES', help=
+            'Size from which files are sent with zero-copy sendfile() instead'
+            ' of being cached in memory. Default: 256.')
+        argumentParser.add_argument(
+            '--compress', action='store_true', help=
+            'Build compressed variants of text files at startup and send them'
+            ' to clients that accept them. Only files that fit in the cache are'
+            ' compressed.')
+        argumentParser.add_argument(
+            '--keep-alive', action='store_true', help=
+            'Serve HTTP/1.1 persistent connections.')
+        argumentParser.add_argument(
+            '--idle-timeout', type=float, default=5, metavar='SECONDS', help=
+            'Time after which an idle persistent connection is closed.'
+            ' Default: 5.')
+        argumentParser.add_argument(
+            '--max-requests', type=int, default=100, metavar='REQUESTS', help=
+            'Number of requests after which a persistent connection is closed.'
+            ' Default: 100.')
+        argumentParser.add_argument(
+            '--workers', type=int, default=0, metavar='THREADS', help=
+            'Number of threads in a fixed size pool that handles connections.'
+            ' A persistent connection occupies a thread until it closes.'
+            ' Default: 0, meaning a new thread for each connection.')
+        argumentParser.add_argument(
+            '--queue', type=int, default=64, metavar='CONNECTIONS', help=
+            'Number of accepted connections that can wait for a thread in the'
+            ' pool. Further connections get 503. Default: 64.')
+        argumentParser.add_argument(
+            '--max-body', type=float, default=16, metavar='MEGABYTES', help=
+            'Size limit of request bodies. Larger requests get 413. Zero for'
+            ' no limit. Default: 16.')
+        argumentParser.add_argument(
+            '--json-decoder', choices=codec.decoders, default='json', help=
+            'Module that parses JSON request bodies. The auto decoder is the'
+            ' first installed of orjson, ujson, and json. orjson is fastest but'
+            ' reads integers too big for 64 bits as floats. Default: json.')
+        argumentParser.add_argument(
+            '--compact-json', action='store_true', help=
+            'Encode JSON responses with the decoder module, which is faster.'
+            ' The output has no spaces and doesn\'t escape non-ASCII'
+            ' characters. By default, responses are the same as the standard'
+            ' json module output.')
+        argumentParser.add_argument(
+            '--events-buffer', type=int, default=64, metavar='EVENTS', help=
+            'Number of events that can wait to be sent to each subscriber of a'
+            ' push channel. Default: 64.')
+        argumentParser.add_argument(
+            '--events-drop', choices=dropPolicies, default='oldest', help=
+            'What to do when an event is published to a subscriber whose buffer'
+            ' is full. Drop the oldest buffered event, drop the new event, or'
+            ' disconnect the subscriber. Default: oldest.')
+        argumentParser.add_argument(
+            '--heartbeat', type=float, default=15, metavar='SECONDS', help=
+            'Interval after which an idle event stream is sent a comment line.'
+            ' Default: 15.')
+        argumentParser.add_argument(
+            '--ws-concurrency', type=int, default=8, metavar='COMMANDS', help=
+            'Number of commands from one WebSocket connection that can be'
+            ' handled at the same time. Default: 8.')
+        argumentParser.add_argument(
+            '--batch-workers', type=int, default=4, metavar='THREADS', help=
+            'Number of threads that run the commands of a concurrent batch.'
+            ' Zero to run them one after another. Default: 4.')
+        argumentParser.add_argument(
+            '--memoize', action='append', default=[],
+            metavar='COMMAND=SECONDS', help=
+            'Memoize the responses to a command for a number of seconds, in'
+            ' the handlers that declare it. Only for commands whose responses'
+            ' depend on nothing but their parameters. Can be specified more'
+            ' than once.')
+        argumentParser.add_argument(
+            '--fixtures', metavar='FILE', help=
+            'JSON lines file of recorded command responses, for command'
+            ' handlers that can record and replay them. Responses are replayed'
+            ' unless --record is specified too.')
+        argumentParser.add_argument(
+            '--record', action='store_true', help=
+            'Record command responses to the --fixtures file, instead of'
+            ' replaying them. Record with only one process.')
+        argumentParser.add_argument(
+            '--openssl-check', action='store_true', help=
+            'Check the thumbprint of each fetched server certificate with the'
+            ' openssl CLI too, in the background, for command handlers that'
+            ' fetch. A fetch can also ask for the check in its parameters.')
+        argumentParser.add_argument(
+            '--engine', choices=('threads', 'asyncio'), default='threads',
+            help=
+            'Server engine. The threads engine handles each connection in its'
+            ' own thread, or in a thread from the --workers pool. The asyncio'
+            ' engine handles all connections in one event loop. Default:'
+            ' threads.')
+        argumentParser.add_argument(
+            '--processes', type=int, default=1, metavar='PROCESSES', help=
+            'Number of server processes, which share the port. Each process'
+            ' uses the selected engine. Default: 1.')
+        argumentParser.add_argument(
+            '--log-level', choices=levels, default='info', help=
+            'Minimum level of messages to log. Default: info.')
+        argumentParser.add_argument(
+            '-v', '--verbose', dest='log_level', action='store_const',
+            const='debug', help=
+            'Log at debug level, which includes request and response payloads.'
+            ' Same as --log-level debug.')
+        argumentParser.add_argument(
+            '--access-log', choices=accessLogFormats, default='text', help=
+            'Format of the access log, which has one line per request.'
+            ' Default: text.')
         argumentParser.add_argument(
             dest='directories', metavar='directory', type=str, nargs='*', help=
             'Directory from which to server web content.')
 
         self.arguments = argumentParser.parse_args(argv[1:])
-        self.server = Server(('localhost', self.arguments.port), Handler)
+        if self.arguments.compress and self.arguments.cache <= 0:
+            # Otherwise nothing would be compressed, without any warning.
+            argumentParser.error(
+                '--compress needs the cache and can\'t be used with --cache 0.')
+        if self.arguments.processes > 1 and self.arguments.port == 0:
+            argumentParser.error(
+                "A port number must be specified to use --processes.")
+        if self.arguments.record and (
+            self.arguments.fixtures is None or self.arguments.processes > 1
+        ):
+            argumentParser.error(
+                "--record requires --fixtures and only one process.")
+        # Dictionary of command name to seconds.
+        self._memoized = {}
+        for memoize_ in self.arguments.memoize:
+            command, _, seconds = memoize_.partition('=')
+            try:
+                self._memoized[command] = float(seconds)
+            except ValueError:
+                argumentParser.error(
+                    f'--memoize "{memoize_}" isn\'t like COMMAND=SECONDS.')
+        try:
+            codec.configure(
+                self.arguments.json_decoder, self.arguments.compact_json)
+        except ValueError as error:
+            argumentParser.error(str(error))
+
+        address = ('localhost', self.arguments.port)
+        # With multiple processes, each process binds its own socket later.
+        bind = self.arguments.processes <= 1
+        if self.arguments.engine == 'asyncio':
+            self.server = AsyncServer(
+                address, AsyncHandler, bind, executorWorkers=(
+                    self.arguments.workers if self.arguments.workers > 0
+                    else None))
+            self.server.handle_command_async = self.handle_command_async
+        elif self.arguments.workers > 0:
+            self.server = PoolServer(
+                address, Handler, bind, workers=self.arguments.workers,
+                queueSize=self.arguments.queue)
+        else:
+            self.server = Server(address, Handler, bind)
         self.server.handle_command = self.handle_command
+        self.server.metrics = Metrics()
+        self.server.metrics.add_collector('assets', lambda: {
+            'entries': len(self.server.assetCache),
+            'bytes': self.server.assetCache.bytes,
+            'hits': self.server.assetCache.hits,
+            'misses': self.server.assetCache.misses
+        })
+        self.server.push = PushHub(
+            self.arguments.events_buffer, self.arguments.events_drop,
+            self.arguments.heartbeat)
+        self.server.metrics.add_collector('push', self.server.push.as_dict)
+        if isinstance(self.server, PoolServer):
+            self.server.metrics.add_collector('pool', lambda: {
+                'depth': self.server.queueDepth,
+                **self.server.poolMetrics.as_dict()
+            })
+        self.logPipeline = LogPipeline(
+            self.arguments.log_level, self.arguments.access_log)
+        self.server.useIndex = self.arguments.index
+        self.server.pollInterval = self.arguments.poll
+        self.server.sendfileThreshold = int(self.arguments.sendfile * 1024)
+        cacheBytes = int(self.arguments.cache * 1024 * 1024)
+        self.server.assetCache = AssetCache(
+            cacheBytes, min(cacheBytes // 4, self.server.sendfileThreshold - 1))
+        if self.arguments.compress:
+            self.server.compressor = Compressor()
+        self.server.keepAlive = self.arguments.keep_alive
+        self.server.idleTimeout = self.arguments.idle_timeout
+        self.server.maxRequests = self.arguments.max_requests
+        self.server.maxBodyBytes = int(self.arguments.max_body * 1024 * 1024)
+        self.server.websocketConcurrency = max(self.arguments.ws_concurrency, 1)
+        # The executor only starts threads when it's first used, so it can be
+        # created before any fork.
+        self._batchExecutor = (
+            ThreadPoolExecutor(
+                self.arguments.batch_workers, thread_name_prefix='Batch')
+            if self.arguments.batch_workers > 0 else None)
 
     def server_directories(self):
         for directory in self.arguments.directories:
@@ -267,14 +1170,126 @@ class Main:
         for directory in self.server.directories:
             if not directory.is_dir():
                 raise ValueError(f'Not a directory "{directory}".')
-        self._commandHandlers = tuple(self.command_handlers())
+        self._commandHandlers = tuple(
+            self._memoize(self.command_handlers()))
+        self._build_routes()
+        # Added to from any handler thread. Adding to a set is atomic.
+        self.server.commandNames = set()
+        self._dispatcher = Dispatcher(self._commandHandlers)
+        self.server.metrics.add_collector(
+            'handlers', self._dispatcher.as_dict, 'handler')
+        memoizers = tuple(
+            handler for handler in self._commandHandlers
+            if isinstance(handler, MemoizingCommandHandler))
+        if memoizers:
+            self.server.metrics.add_collector(
+                'memo', lambda: self._memo_metrics(memoizers), 'handler')
         print(self.server.start_message)
-        self.server.serve_forever()
+        if self.arguments.processes > 1:
+            self.server.socket.close()
+            return Supervisor(self.arguments.processes, self._serve_process)()
+        self._serve()
+
+    def _memoize(self, handlers):
+        unused = set(self._memoized)
+        for handler in handlers:
+            memoized = {
+                command: self._memoized[command]
+                for command in (getattr(handler, 'commands', None) or ())
+                if command in self._memoized}
+            unused.difference_update(memoized)
+            yield memoize(handler, memoized) if memoized else handler
+        if unused:
+            raise ValueError(
+                f'No handler declares --memoize command "{unused.pop()}".')
+
+    def _memo_metrics(self, memoizers):
+        metrics = {}
+        for memoizer in memoizers:
+            counts = memoizer.cache.as_dict()
+            # Memoizers of handlers with the same name are counted together.
+            name = memoizer.name
+            if name in metrics:
+                counts = {
+                    key: metrics[name][key] + value
+                    for key, value in counts.items()}
+            metrics[name] = counts
+        return metrics
+
+    def _serve_process(self):
+        self.server.bind_reuse_port()
+        self._serve()
+
+    def _serve(self):
+        # The log pipeline has a thread, so it's started here and not before
+        # any fork.
+        self.logPipeline.start()
+        try:
+            self.server.serve_forever()
+        finally:
+            self.logPipeline.stop()
+
+    def _build_routes(self):
+        # Dictionary of command name to the handlers for that command, in
+        # registration order. That is the handlers that declare the command,
+        # and the fallback handlers. Commands that aren't declared by any
+        # handler go to the fallback handlers only. A handler that isn't a
+        # CommandHandler, like a plain function, has no commands attribute and
+        # is a fallback.
+        commands = tuple(
+            (handler, getattr(handler, 'commands', None))
+            for handler in self._commandHandlers)
+        self._fallbackHandlers = tuple(
+            handler for handler, names in commands if names is None)
+        self._routes = {
+            name: tuple(
+                handler for handler, names in commands
+                if names is None or name in names)
+            for name in set(
+                name for _, names in commands if names is not None
+                for name in names)
+        }
+
+    def route(self, commandObject):
+        """Handlers for a command object, in the order to call them."""
+        try:
+            return self._routes.get(
+                commandObject['command'], self._fallbackHandlers)
+        except (KeyError, TypeError):
+            # No command, or the command isn't a hashable value.
+            return self._fallbackHandlers
 
     def handle_command(self, commandObject, httpHandler):
+        batch = batch_commands(commandObject)
+        if batch is None:
+            return self._handle_one(commandObject, httpHandler)
+
+        # Commands in a batch can't be batches, so that a batch can't occupy
+        # every thread in the executor waiting for other batches.
+        commands, concurrent = batch
+        if concurrent and self._batchExecutor is not None and len(commands) > 1:
+            return list(self._batchExecutor.map(
+                lambda command: self._handle_one(command, httpHandler),
+                commands))
+        return [self._handle_one(command, httpHandler) for command in commands]
+
+    def _handle_one(self, commandObject, httpHandler):
+        if not isinstance(commandObject, dict):
+            # For example, a batch inside a batch.
+            return {"failed": "Not a command object."}
         response = None
-        for handle in self._commandHandlers:
-            response = handle(commandObject, httpHandler)
+        for handle in self.route(commandObject):
+            with self.server.metrics.timer(
+                'handler', handler_name(handle)
+            ) as timer:
+                try:
+                    response = self._dispatcher.call(
+                        handle, commandObject, httpHandler)
+                except HandlerTimeout as error:
+                    response = self._timed_out(error, commandObject, httpHandler)
+                    timer.status = 'timeout'
+                else:
+                    timer.status = 'passed' if response is None else 'handled'
             if response is not None:
                 break
 
@@ -292,15 +1307,68 @@ class Main:
         #     httpHandler.wfile.write(responseBytes)
         #     return None
 
+        return self._complete_response(response, commandObject, httpHandler)
+
+    async def handle_command_async(self, commandObject, httpHandler):
+        batch = batch_commands(commandObject)
+        if batch is None:
+            return await self._handle_one_async(commandObject, httpHandler)
+
+        commands, concurrent = batch
+        if concurrent:
+            return list(await asyncio.gather(*(
+                self._handle_one_async(command, httpHandler)
+                for command in commands)))
+        return [
+            await self._handle_one_async(command, httpHandler)
+            for command in commands]
+
+    async def _handle_one_async(self, commandObject, httpHandler):
+        if not isinstance(commandObject, dict):
+            return {"failed": "Not a command object."}
+        response = None
+        for handle in self.route(commandObject):
+            with self.server.metrics.timer(
+                'handler', handler_name(handle)
+            ) as timer:
+                try:
+                    response = await self._dispatcher.call_async(
+                        handle, commandObject, httpHandler)
+                except HandlerTimeout as error:
+                    response = self._timed_out(error, commandObject, httpHandler)
+                    timer.status = 'timeout'
+                else:
+                    timer.status = 'passed' if response is None else 'handled'
+            if response is not None:
+                break
+        return self._complete_response(response, commandObject, httpHandler)
+
+    def _timed_out(self, error, commandObject, httpHandler):
+        # Later handlers aren't tried, because the command could have been
+        # handled by the one that timed out.
+        httpHandler.log_error('%s', error)
+        return {**commandObject, "failed": str(error)}
+
+    def _complete_response(self, response, commandObject, httpHandler):
         # TOTH for ** syntax: https://stackoverflow.com/a/26853961
         if response is None:
             response = { **commandObject, "failed": f"Unhandled." }
+        else:
+            try:
+                self.server.commandNames.add(commandObject['command'])
+            except (KeyError, TypeError):
+                # No command, or the command isn't a hashable value.
+                pass
 
         if 'failed' not in response and 'confirm' not in response:
-            response['confirm'] = " ".join((
+            confirm = " ".join((
                 self.__class__.__name__,
                 httpHandler.server_version,
                 httpHandler.sys_version))
+            if isinstance(response, EncodedResponse):
+                # Shared by other requests, so don't modify it.
+                return response.with_items(confirm=confirm)
+            response['confirm'] = confirm
 
         return response
 
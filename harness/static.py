@@ -0,0 +1,178 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Static file responses for the Captive Web View python harness server.
+
+The static_response() function decides the status, headers, and body of the
+response to a GET request for a served file, taking account of the conditional,
+range, and encoding headers in the request. It doesn't write anything, so that
+it can be used by any server engine."""
+#
+# Standard library imports, in alphabetic order.
+#
+# Module for date and time, only used to compare If-Modified-Since headers.
+# https://docs.python.org/3/library/datetime.html
+import datetime
+#
+# Module for parsing HTTP dates.
+# https://docs.python.org/3/library/email.utils.html
+import email.utils
+#
+# Regular expression module, for parsing Range headers.
+# https://docs.python.org/3/library/re.html
+import re
+#
+# Module for simple immutable objects with type specification.
+# https://docs.python.org/3/library/typing.html#typing.NamedTuple
+from typing import NamedTuple, Optional, Tuple
+
+class StaticResponse(NamedTuple):
+    status: int
+    headers: Tuple[Tuple[str, str], ...]
+    # Body to send from memory, or None.
+    data: Optional[bytes] = None
+    # Body to send from a file, or None, and the offset and number of bytes.
+    path: Optional[str] = None
+    start: int = 0
+    count: int = 0
+
+# Range of the Range header, which is first-pos and last-pos in ASCII digits,
+# either of which can be omitted.
+# https://www.rfc-editor.org/rfc/rfc9110#section-14.1.1
+rangeSpec = re.compile(r'([0-9]*)-([0-9]*)')
+
+def static_response(server, path, headers, contentType):
+    """\
+    Response for a GET of a file. The server parameter supplies the assetCache
+    and compressor. Raises OSError if the file can't be read."""
+    asset = server.assetCache.get(path)
+
+    compressor = server.compressor
+    compressible = (
+        compressor is not None and compressor.compressible(asset, contentType))
+    # Byte ranges are of the uncompressed file, so don't compress a range
+    # request.
+    variant = (
+        compressor.variant(asset, contentType, headers.get("Accept-Encoding"))
+        if compressible and "Range" not in headers else None)
+    etag = asset.etag if variant is None else variant.etag
+    vary = (("Vary", "Accept-Encoding"),) if compressible else ()
+
+    if not_modified(asset, etag, headers):
+        return StaticResponse(304, (
+            ("ETag", etag), ("Last-Modified", asset.lastModified)) + vary)
+
+    if variant is not None:
+        return StaticResponse(200, (
+            ("Content-type", contentType),
+            ("Content-Encoding", variant.encoding),
+            ("Content-Length", str(len(variant.data))),
+            ("Last-Modified", asset.lastModified),
+            ("ETag", etag)
+        ) + vary, data=variant.data)
+
+    try:
+        byteRange = byte_range(asset, headers)
+    except ValueError:
+        return StaticResponse(416, (
+            ("Content-Range", f'bytes */{asset.size}'),
+            ("Content-Length", "0")))
+
+    if byteRange is None:
+        status, start, end = 200, 0, asset.size
+        rangeHeaders = ()
+    else:
+        start, end = byteRange
+        status = 206
+        rangeHeaders = (
+            ("Content-Range", f'bytes {start}-{end - 1}/{asset.size}'),)
+    responseHeaders = rangeHeaders + (
+        ("Content-type", contentType),
+        ("Content-Length", str(end - start)),
+        ("Last-Modified", asset.lastModified),
+        ("ETag", asset.etag),
+        ("Accept-Ranges", "bytes")
+    ) + vary
+
+    if asset.data is None:
+        return StaticResponse(
+            status, responseHeaders, path=asset.path, start=start,
+            count=end - start)
+    return StaticResponse(
+        status, responseHeaders,
+        data=(
+            asset.data if byteRange is None
+            else memoryview(asset.data)[start:end]))
+
+def byte_range(asset, headers):
+    """\
+    Returns None for the whole file, or the start and end offsets of the single
+    range in the Range header. The end offset is exclusive. Raises ValueError if
+    the range can't be satisfied."""
+    # https://www.rfc-editor.org/rfc/rfc9110#section-14.2
+    rangeHeader = headers.get("Range")
+    if rangeHeader is None:
+        return None
+
+    # If-Range means ignore the Range header if the file has changed. An entity
+    # tag has to match by strong comparison, so a weak one never does.
+    # https://www.rfc-editor.org/rfc/rfc9110#section-13.1.5
+    ifRange = headers.get("If-Range")
+    if ifRange is not None:
+        ifRange = ifRange.strip()
+        if ifRange.startswith(('"', 'W/')):
+            if ifRange != asset.etag or asset.etag.startswith('W/'):
+                return None
+        elif ifRange != asset.lastModified:
+            return None
+
+    unit, _, ranges = rangeHeader.partition("=")
+    # Multiple ranges aren't supported. The server may ignore the header and
+    # send the whole file instead.
+    if unit.strip() != "bytes" or "," in ranges:
+        return None
+    match = rangeSpec.fullmatch(ranges.strip())
+    if match is None or match[0] == "-":
+        # Syntactically invalid so ignore it.
+        return None
+    first, last = match.groups()
+    if first == "":
+        # Suffix range, the last so many bytes.
+        start = max(asset.size - int(last), 0)
+        end = asset.size
+    else:
+        start = int(first)
+        if last != "" and int(last) < start:
+            # Also invalid.
+            return None
+        end = asset.size if last == "" else min(int(last) + 1, asset.size)
+    if start >= end:
+        raise ValueError(f'Unsatisfiable range "{rangeHeader}".')
+    return start, end
+
+def not_modified(asset, etag, headers):
+    # If-None-Match takes precedence over If-Modified-Since, see:
+    # https://www.rfc-editor.org/rfc/rfc9110#section-13.1.3
+    ifNoneMatch = headers.get("If-None-Match")
+    if ifNoneMatch is not None:
+        # Weak comparison, which is the rule for If-None-Match.
+        etag = etag.removeprefix("W/")
+        for tag in ifNoneMatch.split(","):
+            tag = tag.strip()
+            if tag == "*" or tag.removeprefix("W/") == etag:
+                return True
+        return False
+
+    ifModifiedSince = headers.get("If-Modified-Since")
+    if ifModifiedSince is None:
+        return False
+    # Same comparison as the SimpleHTTPRequestHandler.send_head() method.
+    try:
+        since = email.utils.parsedate_to_datetime(ifModifiedSince)
+    except (TypeError, IndexError, OverflowError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=datetime.timezone.utc)
+    lastModified = datetime.datetime.fromtimestamp(
+        asset.mtime, datetime.timezone.utc).replace(microsecond=0)
+    return lastModified <= since
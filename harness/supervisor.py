@@ -0,0 +1,193 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Multi-process supervisor for the Captive Web View python harness server.
+
+The supervisor forks a number of worker processes, each of which runs the same
+serve function. Typically, each worker listens on the same port, with the
+SO_REUSEPORT socket option, and the operating system spreads connections across
+them. The supervisor restarts any worker that exits, and copies each line that
+the workers write to their standard output and standard error to its own
+standard error, prefixed with the worker number and process identifier.
+
+Only available on platforms that have os.fork(), which excludes Windows."""
+#
+# Standard library imports, in alphabetic order.
+#
+# Module for the operating system interface.
+# https://docs.python.org/3/library/os.html
+import os
+#
+# Module for waiting on the worker output pipes.
+# https://docs.python.org/3/library/selectors.html
+import selectors
+#
+# Module for sending signals to worker processes.
+# https://docs.python.org/3/library/signal.html
+import signal
+#
+# Module for the operating system interface.
+# https://docs.python.org/3/library/sys.html
+import sys
+#
+# Module for monotonic time, used to slow down restarts of failing workers.
+# https://docs.python.org/3/library/time.html#time.monotonic
+import time
+#
+# Module for printing exceptions in workers.
+# https://docs.python.org/3/library/traceback.html
+import traceback
+
+class Worker:
+    def __init__(self, index):
+        self.index = index
+        self.pid = None
+        self.pipe = None
+        self.started = None
+        self.partial = b''
+
+    @property
+    def prefix(self):
+        return f'[{self.index}:{self.pid}] '.encode()
+
+class Supervisor:
+    # A worker that exits sooner than this many seconds after it started isn't
+    # restarted immediately, in case it exits on every start.
+    restartDelay = 1.0
+
+    def __init__(self, processes, serve, output=None):
+        """\
+        serve is a function that runs in each worker process and returns when
+        the worker should exit."""
+        self._serve = serve
+        self._output = sys.stderr.buffer if output is None else output
+        self._workers = tuple(Worker(index) for index in range(processes))
+        self._selector = selectors.DefaultSelector()
+        self._stopping = False
+
+    def __call__(self):
+        previous = signal.signal(signal.SIGTERM, self._on_signal)
+        try:
+            for worker in self._workers:
+                self._start(worker)
+            while not self._stopping:
+                self._read(0.5)
+                self._reap()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._stopping = True
+            self._stop_all()
+            signal.signal(signal.SIGTERM, previous)
+        return 0
+
+    def _on_signal(self, signum, frame):
+        self._stopping = True
+
+    def _start(self, worker):
+        readFD, writeFD = os.pipe()
+        # Flush now so that buffered output isn't written by the child too.
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            # Worker process. Never returns.
+            os.close(readFD)
+            for other in self._workers:
+                if other.pipe is not None:
+                    os.close(other.pipe)
+            self._run_worker(writeFD)
+
+        os.close(writeFD)
+        worker.pid = pid
+        worker.pipe = readFD
+        worker.started = time.monotonic()
+        worker.partial = b''
+        self._selector.register(readFD, selectors.EVENT_READ, worker)
+        self._write(worker, b'Started.\n')
+
+    def _run_worker(self, writeFD):
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        os.dup2(writeFD, sys.stdout.fileno())
+        os.dup2(writeFD, sys.stderr.fileno())
+        os.close(writeFD)
+        sys.stdout.reconfigure(line_buffering=True)
+        status = 0
+        try:
+            self._serve()
+        except BaseException:
+            traceback.print_exc()
+            status = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(status)
+
+    def _read(self, timeout):
+        for key, _ in self._selector.select(timeout):
+            worker = key.data
+            data = os.read(worker.pipe, 64 * 1024)
+            if data == b'':
+                self._close_pipe(worker)
+                continue
+            lines = (worker.partial + data).split(b'\n')
+            worker.partial = lines.pop()
+            for line in lines:
+                self._write(worker, line + b'\n')
+
+    def _write(self, worker, line):
+        self._output.write(worker.prefix + line)
+        self._output.flush()
+
+    def _close_pipe(self, worker):
+        if worker.pipe is None:
+            return
+        if worker.partial != b'':
+            self._write(worker, worker.partial + b'\n')
+            worker.partial = b''
+        self._selector.unregister(worker.pipe)
+        os.close(worker.pipe)
+        worker.pipe = None
+
+    def _reap(self):
+        for worker in self._workers:
+            if worker.pid is None:
+                continue
+            pid, status = os.waitpid(worker.pid, os.WNOHANG)
+            if pid == 0:
+                continue
+            self._exited(worker, status)
+            if self._stopping:
+                continue
+            if time.monotonic() - worker.started < self.restartDelay:
+                time.sleep(self.restartDelay)
+            self._start(worker)
+
+    def _exited(self, worker, status):
+        # Drain whatever the worker wrote before it exited.
+        while worker.pipe is not None:
+            data = os.read(worker.pipe, 64 * 1024)
+            if data == b'':
+                self._close_pipe(worker)
+            else:
+                worker.partial += data
+                *lines, worker.partial = worker.partial.split(b'\n')
+                for line in lines:
+                    self._write(worker, line + b'\n')
+        self._write(worker, (
+            f'Exited with status {os.waitstatus_to_exitcode(status)}.\n'
+        ).encode())
+        worker.pid = None
+
+    def _stop_all(self):
+        for worker in self._workers:
+            if worker.pid is not None:
+                try:
+                    os.kill(worker.pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+        for worker in self._workers:
+            if worker.pid is not None:
+                _, status = os.waitpid(worker.pid, 0)
+                self._exited(worker, status)
@@ -0,0 +1,72 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Tests of the static asset cache. Run them with pytest, like this.
+
+    cd /path/where/you/cloned/captive-web-view/
+    python3 -m pytest harness
+"""
+#
+# Standard library imports, in alphabetic order.
+#
+# Module for setting file modification times.
+# https://docs.python.org/3/library/os.html#os.utime
+import os
+#
+# PyPI https://pypi.org/project/pytest
+import pytest
+#
+# Local imports.
+#
+# Module under test.
+from harness.asset_cache import AssetCache
+
+def write(path, data, mtimeNs=None):
+    path.write_bytes(data)
+    if mtimeNs is not None:
+        os.utime(path, ns=(mtimeNs, mtimeNs))
+    return path
+
+def test_hit_and_reload_on_change(tmp_path):
+    path = write(tmp_path / 'a.js', b'one', 1_000_000_000)
+    cache = AssetCache(1024)
+    asset = cache.get(path)
+    assert asset.data == b'one'
+    assert asset.etag.startswith('"')
+    assert cache.get(path) is asset
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    write(path, b'two', 2_000_000_000)
+    changed = cache.get(path)
+    assert changed.data == b'two'
+    assert changed.etag != asset.etag
+    assert changed.lastModified != asset.lastModified
+    assert cache.bytes == 3
+
+def test_least_recently_used_is_evicted(tmp_path):
+    paths = [write(tmp_path / f'{name}.js', bytes(4)) for name in 'abc']
+    cache = AssetCache(8, 8)
+    cache.get(paths[0])
+    cache.get(paths[1])
+    cache.get(paths[0])
+    cache.get(paths[2])
+    assert len(cache) == 2
+    assert cache.bytes == 8
+    misses = cache.misses
+    cache.get(paths[0])
+    assert cache.misses == misses
+    cache.get(paths[1])
+    assert cache.misses == misses + 1
+
+def test_large_file_isnt_cached(tmp_path):
+    path = write(tmp_path / 'big.bin', bytes(100))
+    cache = AssetCache(1000, 50)
+    asset = cache.get(path)
+    assert asset.data is None
+    assert asset.size == 100
+    assert asset.etag.startswith('W/"')
+    assert len(cache) == 0
+
+def test_missing_file(tmp_path):
+    with pytest.raises(OSError):
+        AssetCache(1024).get(tmp_path / 'missing.js')
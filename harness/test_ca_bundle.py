@@ -0,0 +1,119 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Tests of the CA bundles. Run them with pytest, like this.
+
+    cd /path/where/you/cloned/captive-web-view/
+    python3 -m pytest harness
+
+The keychain tests use a stand-in for the macOS security CLI, which outputs the
+test CA certificate."""
+#
+# Standard library imports, in alphabetic order.
+#
+# Module for the PATH separator.
+# https://docs.python.org/3/library/os.html#os.pathsep
+import os
+#
+# Module for OO path handling.
+# https://docs.python.org/3/library/pathlib.html
+from pathlib import Path
+#
+# Module for SSL contexts and the default store.
+# https://docs.python.org/3/library/ssl.html
+import ssl
+#
+# PyPI https://pypi.org/project/pytest
+import pytest
+#
+# Local imports.
+#
+# Module under test.
+from harness import ca_bundle
+
+@pytest.fixture
+def security(tmp_path, monkeypatch, certificates):
+    """\
+    Puts a security CLI that outputs the test CA on the PATH. Returns the path
+    of a file that has a line for each time it runs."""
+    binPath = tmp_path / 'bin'
+    binPath.mkdir()
+    runs = tmp_path / 'runs'
+    script = binPath / 'security'
+    script.write_text(
+        f'#!/bin/sh\necho "$@" >> "{runs}"\ncat "{certificates / "ca.pem"}"\n')
+    script.chmod(0o755)
+    monkeypatch.setenv('PATH', str(binPath), prepend=os.pathsep)
+    return runs
+
+@pytest.fixture
+def keychainPaths(tmp_path):
+    paths = tuple(tmp_path / f'{name}.keychain' for name in ('one', 'two'))
+    for path in paths:
+        path.write_text(path.name)
+    return paths
+
+def test_keychain_export_is_cached(tmp_path, security, keychainPaths):
+    directory = tmp_path / 'cache'
+    bundle = ca_bundle.keychain_bundle(keychainPaths, directory)
+    assert bundle.source == 'keychain'
+    assert bundle.cafile.startswith(str(directory))
+    assert 'BEGIN CERTIFICATE' in open(bundle.cafile).read()
+    assert len(security.read_text().splitlines()) == 2
+
+    assert ca_bundle.keychain_bundle(keychainPaths, directory) == bundle
+    assert len(security.read_text().splitlines()) == 2
+
+    # A change to a keychain means a new export, and the old one is deleted.
+    keychainPaths[1].write_text('changed')
+    changed = ca_bundle.keychain_bundle(keychainPaths, directory)
+    assert changed != bundle
+    assert len(security.read_text().splitlines()) == 4
+    assert list(directory.glob('keychains-*.pem')) == [Path(changed.cafile)]
+
+def test_cache_directory(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    assert ca_bundle.cache_directory() == tmp_path / 'captive-web-view'
+
+def test_unwritable_cache(tmp_path, security, keychainPaths):
+    # The cache directory can't be made under a file.
+    notDirectory = tmp_path / 'file'
+    notDirectory.write_text('')
+    bundle = ca_bundle.keychain_bundle(keychainPaths, notDirectory / 'cache')
+    assert bundle.source == 'keychain'
+    assert not bundle.cafile.startswith(str(notDirectory))
+    assert 'BEGIN CERTIFICATE' in open(bundle.cafile).read()
+
+def test_no_keychain_bundle(tmp_path, monkeypatch, keychainPaths):
+    # No security CLI.
+    monkeypatch.setenv('PATH', str(tmp_path))
+    assert ca_bundle.keychain_bundle(keychainPaths, tmp_path) is None
+
+def test_no_keychains(tmp_path, security):
+    assert ca_bundle.keychain_bundle(
+        (tmp_path / 'missing.keychain',), tmp_path) is None
+    assert not security.exists()
+
+def test_fallback(tmp_path, monkeypatch):
+    monkeypatch.setenv('PATH', str(tmp_path))
+    monkeypatch.setattr(ca_bundle, 'certifi', None)
+    bundle = ca_bundle.default_bundle()
+    paths = ssl.get_default_verify_paths()
+    assert bundle == ('system', paths.cafile, paths.capath)
+
+    if ca_bundle.certifi is None:
+        return
+    monkeypatch.undo()
+    monkeypatch.setenv('PATH', str(tmp_path))
+    assert ca_bundle.default_bundle().source == 'certifi'
+
+def test_bundle(certificates):
+    bundle = ca_bundle.CABundle('keychain', str(certificates / 'ca.pem'), None)
+    assert bundle.openssl_arguments() == ('-CAfile', bundle.cafile)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    bundle.load(context)
+    assert context.cert_store_stats()['x509_ca'] == 1
+
+    assert ca_bundle.CABundle('system', None, '/etc/ssl/certs'
+    ).openssl_arguments() == ('-CApath', '/etc/ssl/certs')
+    assert ca_bundle.CABundle('system', None, None).openssl_arguments() == ()
@@ -0,0 +1,67 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Tests of the peer certificate cache. Run them with pytest, like this.
+
+    cd /path/where/you/cloned/captive-web-view/
+    python3 -m pytest harness
+"""
+#
+# Standard library imports, in alphabetic order.
+#
+# Module for Base 64 decoding.
+# https://docs.python.org/3/library/base64.html
+import base64
+#
+# Cryptographic hash module, for checking thumbprints.
+# https://docs.python.org/3/library/hashlib.html
+import hashlib
+#
+# Module for SSL, only used to convert PEM to DER.
+# https://docs.python.org/3/library/ssl.html#ssl.PEM_cert_to_DER_cert
+import ssl
+#
+# Local imports.
+#
+# Module under test.
+from harness.certificate_cache import CertificateCache
+
+notAfter = {'notAfter': 'Jan  1 00:00:00 2100 GMT'}
+
+def test_certificate(certificates):
+    binary = ssl.PEM_cert_to_DER_cert(
+        certificates.joinpath('localhost.pem').read_text())
+    cache = CertificateCache()
+    assert cache.get(binary) is None
+    certificate = cache.put(binary, notAfter)
+    assert base64.b64decode(certificate.DER) == binary
+    assert certificate.length == len(binary)
+    assert certificate.sha1 == hashlib.sha1(binary).hexdigest()
+    assert certificate.sha256 == hashlib.sha256(binary).hexdigest()
+    assert certificate.details is notAfter
+    assert certificate.expires == ssl.cert_time_to_seconds(
+        notAfter['notAfter'])
+
+    assert cache.get(binary) is certificate
+    assert cache.as_dict() == {'entries': 1, 'hits': 1, 'misses': 1}
+
+def test_expired_certificate_is_a_miss():
+    cache = CertificateCache()
+    cache.put(b'expired', {'notAfter': 'Jan  1 00:00:00 2000 GMT'})
+    assert cache.get(b'expired') is None
+    assert cache.as_dict() == {'entries': 0, 'hits': 0, 'misses': 1}
+
+def test_no_expiry():
+    cache = CertificateCache()
+    assert cache.put(b'unvalidated', {}).expires == float('inf')
+    assert cache.get(b'unvalidated') is not None
+
+def test_least_recently_used_is_evicted():
+    cache = CertificateCache(2)
+    for binary in (b'one', b'two'):
+        cache.put(binary, notAfter)
+    cache.get(b'one')
+    cache.put(b'three', notAfter)
+    assert cache.get(b'two') is None
+    assert cache.get(b'one') is not None
+    assert cache.get(b'three') is not None
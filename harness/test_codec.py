@@ -0,0 +1,78 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Tests of the JSON codec. Run them with pytest, like this.
+
+    cd /path/where/you/cloned/captive-web-view/
+    python3 -m pytest harness
+
+The faster modules are only tested if they're installed."""
+#
+# Standard library imports, in alphabetic order.
+#
+# JSON module.
+# https://docs.python.org/3/library/json.html
+import json
+#
+# Module for checking NaN.
+# https://docs.python.org/3/library/math.html#math.isnan
+import math
+#
+# PyPI https://pypi.org/project/pytest
+import pytest
+#
+# Local imports.
+#
+# Module under test.
+from harness import codec
+
+payload = {
+    "command": "fetch", "parameters": {"resource": "https://example.com/a/b"},
+    "list": [1, 2.5, True, None, "text"], "unicode": "café ☃",
+    "big": 2 ** 70, "negative": -(2 ** 64)}
+
+@pytest.fixture(autouse=True)
+def default_codec():
+    yield
+    codec.configure()
+
+def test_default_is_the_standard_module():
+    assert (codec.decoderName, codec.encoderName) == ('json', 'json')
+    # Byte for byte the same as before the codec.
+    assert codec.dumps(payload) == json.dumps(payload).encode()
+    for data in (
+        json.dumps(payload), json.dumps(payload).encode(),
+        bytearray(json.dumps(payload).encode())
+    ):
+        loaded = codec.loads(data)
+        assert loaded == payload
+        # Integers too big for 64 bits are exact.
+        assert type(loaded['big']) is int
+
+def test_unknown_decoder():
+    with pytest.raises(ValueError):
+        codec.configure('missing')
+    # The selection is unchanged.
+    assert codec.decoderName == 'json'
+
+@pytest.mark.parametrize('decoder', codec.available())
+@pytest.mark.parametrize('compact', (False, True))
+def test_round_trip(decoder, compact):
+    codec.configure(decoder, compact)
+    assert codec.decoderName == decoder
+    encoded = codec.dumps(payload)
+    assert isinstance(encoded, bytes)
+    if not compact:
+        assert encoded == json.dumps(payload).encode()
+    # Check with the standard module, and with the selected one.
+    assert json.loads(encoded) == payload
+    assert codec.loads(encoded) == json.loads(encoded)
+    # Non-standard JSON that the standard module accepts still works.
+    assert math.isnan(codec.loads(b'{"n": NaN}')['n'])
+    with pytest.raises(json.JSONDecodeError):
+        codec.loads(b'{')
+
+def test_auto_decoder():
+    codec.configure('auto')
+    assert codec.decoderName == codec.available()[0]
+    assert codec.encoderName == 'json'
@@ -0,0 +1,86 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Tests of the compressed variants of static files. Run them with pytest, like
+this.
+
+    cd /path/where/you/cloned/captive-web-view/
+    python3 -m pytest harness
+"""
+#
+# Standard library imports, in alphabetic order.
+#
+# Module for gzip decompression.
+# https://docs.python.org/3/library/gzip.html
+import gzip
+#
+# Module for random bytes, which don't compress.
+# https://docs.python.org/3/library/os.html#os.urandom
+import os
+#
+# PyPI https://pypi.org/project/pytest
+import pytest
+#
+# Local imports.
+#
+# Cached file, which variants are built from.
+from harness.asset_cache import Asset
+#
+# Module under test.
+from harness.compression import Compressor, accepted_encodings
+#
+# Harness server, for the command line check.
+from harness.server import Main
+
+def asset(data, etag='"one"'):
+    return Asset('a.js', data, len(data), 0.0, 0, etag, 'date')
+
+_text = b'function f() { return 1; }\n' * 100
+
+def test_accepted_encodings():
+    assert accepted_encodings(None) == {}
+    assert accepted_encodings('gzip, br;q=0.5, identity;q=0, , x;q=bad') == {
+        'gzip': 1.0, 'br': 0.5, 'identity': 0.0, 'x': 0.0}
+    assert accepted_encodings(' GZip ;Q=0.8') == {'gzip': 0.8}
+
+def test_gzip_variant():
+    compressor = Compressor()
+    # Only gzip, so that the test doesn't depend on brotli being installed.
+    variant = compressor.variant(asset(_text), 'text/javascript', 'gzip')
+    assert variant.encoding == 'gzip'
+    assert variant.etag == '"one-gzip"'
+    assert gzip.decompress(variant.data) == _text
+    # Built once per entity tag.
+    assert compressor.variant(
+        asset(_text), 'text/javascript', 'gzip;q=1') is variant
+    assert len(compressor) == 1
+
+    changed = compressor.variant(
+        asset(_text + b'//', '"two"'), 'text/javascript', 'gzip')
+    assert changed.etag == '"two-gzip"'
+    assert gzip.decompress(changed.data) == _text + b'//'
+
+@pytest.mark.parametrize('data, contentType, acceptEncoding', (
+    (_text, 'text/javascript', None),
+    (_text, 'text/javascript', 'gzip;q=0'),
+    (_text, 'text/javascript', 'identity'),
+    (_text, 'image/png', 'gzip'),
+    # Too small.
+    (b'x' * 10, 'text/plain', 'gzip'),
+    # Not cached.
+    (None, 'text/plain', 'gzip'),
+))
+def test_no_variant(data, contentType, acceptEncoding):
+    assert Compressor().variant(
+        Asset(
+            'a', data, len(_text if data is None else data), 0.0, 0, '"one"',
+            'date'),
+        contentType, acceptEncoding) is None
+
+def test_incompressible_file_has_no_variant():
+    data = os.urandom(512)
+    assert Compressor(16).variant(asset(data), 'text/plain', '*') is None
+
+def test_compress_needs_the_cache():
+    with pytest.raises(SystemExit):
+        Main('harness', None, ('harness', '--compress', '--cache', '0'))
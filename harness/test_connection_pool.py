@@ -0,0 +1,109 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Tests of the connection pool, which make requests to a TLS server running in a
+thread. Run them with pytest, like this.
+
+    cd /path/where/you/cloned/captive-web-view/
+    python3 -m pytest harness
+
+The certificates and tls_server fixtures are in the conftest.py file."""
+#
+# Standard library imports, in alphabetic order.
+#
+# JSON module.
+# https://docs.python.org/3/library/json.html
+import json
+#
+# Module for TLS.
+# https://docs.python.org/3/library/ssl.html
+import ssl
+#
+# Module for waiting for the server to close connections.
+# https://docs.python.org/3/library/time.html#time.sleep
+import time
+#
+# PyPI https://pypi.org/project/pytest
+import pytest
+#
+# Local imports.
+#
+# Module under test.
+from harness.connection_pool import ConnectionPool
+
+@pytest.fixture
+def pool(certificates):
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.load_verify_locations(certificates / 'ca.pem')
+    pool = ConnectionPool(context, maxPerHost=2, idleTimeout=30)
+    yield pool
+    pool.close()
+
+def get(pool, server, path='/', reuse=True):
+    """\
+    Client port of the connection that made the request, and whether the
+    connection came from the pool."""
+    connection, reused = pool.acquire(
+        'localhost', server.server_address[1], 5, reuse)
+    if not reused:
+        connection.connect()
+    connection.request('GET', path)
+    response = json.loads(connection.getresponse().read())
+    pool.release(connection)
+    return response['port'], reused
+
+def test_reuse(pool, tls_server):
+    port, reused = get(pool, tls_server)
+    assert not reused
+    assert get(pool, tls_server) == (port, True)
+    assert get(pool, tls_server) == (port, True)
+    assert pool.as_dict() == {
+        'open': 1, 'idle': 1, 'created': 1, 'reused': 2, 'resumed': 0,
+        'evicted': 0}
+
+def test_new_connection_resumes_tls_session(pool, tls_server):
+    get(pool, tls_server)
+    # Not reusing closes the idle connection to make room, and then the new
+    # connection resumes the session of the first.
+    _, reused = get(pool, tls_server, reuse=False)
+    assert not reused
+    counts = pool.as_dict()
+    assert (counts['open'], counts['created'], counts['evicted']) == (1, 2, 1)
+    assert counts['resumed'] == 1
+
+def test_connection_closed_by_response_isnt_pooled(pool, tls_server):
+    firstPort, _ = get(pool, tls_server, '/close')
+    assert pool.as_dict()['open'] == 0
+    port, reused = get(pool, tls_server)
+    assert (reused, port != firstPort) == (False, True)
+
+def test_connection_closed_by_server_is_evicted(pool, tls_server):
+    firstPort, _ = get(pool, tls_server)
+    tls_server.close_connections()
+    # Give the close time to arrive.
+    time.sleep(0.1)
+    port, reused = get(pool, tls_server)
+    assert (reused, port != firstPort) == (False, True)
+    assert pool.as_dict()['evicted'] == 1
+
+def test_idle_timeout(pool, tls_server):
+    pool.idleTimeout = 0.05
+    firstPort, _ = get(pool, tls_server)
+    time.sleep(0.1)
+    port, reused = get(pool, tls_server)
+    assert (reused, port != firstPort) == (False, True)
+    assert pool.as_dict()['evicted'] == 1
+
+def test_limit_per_host(pool):
+    first, _ = pool.acquire('localhost', 1, 0)
+    second, _ = pool.acquire('localhost', 1, 0)
+    with pytest.raises(TimeoutError):
+        pool.acquire('localhost', 1, 0.05)
+    # The limit is per host and port.
+    other, _ = pool.acquire('localhost', 2, 0)
+    pool.discard(first)
+    third, reused = pool.acquire('localhost', 1, 0)
+    assert not reused
+    for connection in (second, other, third):
+        pool.discard(connection)
+    assert pool.as_dict()['open'] == 0
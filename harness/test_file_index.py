@@ -0,0 +1,86 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Tests of the filename index. Run them with pytest, like this.
+
+    cd /path/where/you/cloned/captive-web-view/
+    python3 -m pytest harness
+"""
+#
+# Standard library imports, in alphabetic order.
+#
+# Module for OO path handling.
+# https://docs.python.org/3/library/pathlib.html
+from pathlib import Path
+#
+# Module for monotonic time, used to wait for the poll.
+# https://docs.python.org/3/library/time.html#time.monotonic
+import time
+#
+# Local imports.
+#
+# Module under test.
+from harness.file_index import FileIndex
+
+def make_directories(tmp_path):
+    first = tmp_path / 'first'
+    second = tmp_path / 'second'
+    for directory, names in ((first, ('a.html', 'both.js')), (
+        second, ('b.css', 'both.js')
+    )):
+        directory.mkdir()
+        for name in names:
+            directory.joinpath(name).write_text(directory.name)
+    # Subdirectories aren't indexed.
+    first.joinpath('sub').mkdir()
+    return (first, second), (Path('first'), Path('second'))
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'Timed out.'
+        time.sleep(0.01)
+
+def test_build(tmp_path):
+    directories, relativePaths = make_directories(tmp_path)
+    index = FileIndex(directories, relativePaths, 0).build()
+    assert len(index) == 3
+    assert index.get('a.html') == Path('first', 'a.html')
+    assert index.get('b.css') == Path('second', 'b.css')
+    assert index.get('sub') is None
+    assert index.get('missing.html') is None
+
+def test_first_directory_wins(tmp_path):
+    directories, relativePaths = make_directories(tmp_path)
+    index = FileIndex(directories, relativePaths, 0).build()
+    assert index.get('both.js') == Path('first', 'both.js')
+    index = FileIndex(
+        reversed(directories), reversed(relativePaths), 0).build()
+    assert index.get('both.js') == Path('second', 'both.js')
+
+def test_poll_sees_add_and_rename(tmp_path):
+    directories, relativePaths = make_directories(tmp_path)
+    first, second = directories
+    index = FileIndex(directories, relativePaths, 0.01).start()
+    try:
+        second.joinpath('added.js').write_text('added')
+        wait_for(lambda: index.get('added.js') is not None)
+        assert index.get('added.js') == Path('second', 'added.js')
+
+        first.joinpath('a.html').rename(first / 'renamed.html')
+        wait_for(lambda: index.get('a.html') is None)
+        assert index.get('renamed.html') == Path('first', 'renamed.html')
+
+        # Removing the file from the first directory uncovers the second.
+        first.joinpath('both.js').unlink()
+        wait_for(lambda: index.get('both.js') == Path('second', 'both.js'))
+    finally:
+        index.stop()
+
+def test_no_poll_without_interval(tmp_path):
+    directories, relativePaths = make_directories(tmp_path)
+    index = FileIndex(directories, relativePaths, 0).start()
+    directories[0].joinpath('added.js').write_text('added')
+    time.sleep(0.05)
+    assert index.get('added.js') is None
+    index.stop()
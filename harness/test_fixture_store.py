@@ -0,0 +1,89 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Tests of the fixture store, mainly recovery of its index after the recorder was
+interrupted. Run them with pytest, like this.
+
+    cd /path/where/you/cloned/captive-web-view/
+    python3 -m pytest harness
+"""
+#
+# Local imports.
+#
+# Module under test.
+from harness.fixture_store import FixtureStore
+
+def record(path, *keys):
+    store = FixtureStore(path, True)
+    for key in keys:
+        store.record(key, {'command': key}, {'key': key})
+    store.close()
+
+def index_path(path):
+    return path.with_name(path.name + '.index')
+
+def test_record_and_replay(tmp_path):
+    path = tmp_path / 'fixtures.jsonl'
+    record(path, 'one', 'two')
+    record(path, 'one')
+    store = FixtureStore(path)
+    assert len(store) == 2
+    assert store.get('one') == {'key': 'one'}
+    assert store.get('three') is None
+    # Decoded once, and then shared.
+    assert store.get('one') is store.get('one')
+    assert len(index_path(path).read_text().splitlines()) == 3
+
+def test_lines_after_the_index_are_indexed(tmp_path):
+    path = tmp_path / 'fixtures.jsonl'
+    record(path, 'one', 'two')
+    # Recorder interrupted before it wrote the index of the second line.
+    indexPath = index_path(path)
+    indexPath.write_text(indexPath.read_text().splitlines()[0] + '\n')
+
+    assert FixtureStore(path).get('two') == {'key': 'two'}
+    # The index is repaired in record mode.
+    record(path, 'three')
+    assert len(indexPath.read_text().splitlines()) == 3
+    store = FixtureStore(path)
+    assert [store.get(key)['key'] for key in ('one', 'two', 'three')] == [
+        'one', 'two', 'three']
+
+def test_torn_index_line(tmp_path):
+    path = tmp_path / 'fixtures.jsonl'
+    record(path, 'one', 'two')
+    indexPath = index_path(path)
+    # Recorder interrupted part way through the index of the second line.
+    indexPath.write_text(indexPath.read_text().rpartition(' ')[0])
+
+    assert FixtureStore(path).get('two') == {'key': 'two'}
+    record(path, 'three')
+    store = FixtureStore(path)
+    assert len(store) == 3
+    assert store.get('three') == {'key': 'three'}
+
+def test_torn_responses_line(tmp_path):
+    path = tmp_path / 'fixtures.jsonl'
+    record(path, 'one', 'two')
+    # Recorder interrupted part way through the second line, and before it
+    # wrote the index.
+    content = path.read_bytes()
+    path.write_bytes(content[:-10])
+    indexPath = index_path(path)
+    indexPath.write_text(indexPath.read_text().splitlines()[0] + '\n')
+
+    assert FixtureStore(path).get('two') is None
+    record(path, 'three')
+    store = FixtureStore(path)
+    assert len(store) == 2
+    assert store.get('one') == {'key': 'one'}
+    assert store.get('three') == {'key': 'three'}
+
+def test_index_past_the_end_is_ignored(tmp_path):
+    path = tmp_path / 'fixtures.jsonl'
+    record(path, 'one')
+    with index_path(path).open('a') as file:
+        file.write('two 1000 50\n')
+    store = FixtureStore(path)
+    assert store.get('two') is None
+    assert store.get('one') == {'key': 'one'}
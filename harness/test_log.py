@@ -0,0 +1,70 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Tests of the logging pipeline. Run them with pytest, like this.
+
+    cd /path/where/you/cloned/captive-web-view/
+    python3 -m pytest harness
+"""
+#
+# Standard library imports, in alphabetic order.
+#
+# Module for in-memory text streams, used to capture the log.
+# https://docs.python.org/3/library/io.html#io.StringIO
+from io import StringIO
+#
+# JSON module, used to parse the JSON lines access log.
+# https://docs.python.org/3/library/json.html
+import json
+#
+# Local imports.
+#
+# Module under test.
+from harness.log import LogPipeline, accessLogger, logger
+
+def run_pipeline(level, accessLog, log):
+    stream = StringIO()
+    pipeline = LogPipeline(level, accessLog, stream).start()
+    try:
+        log()
+    finally:
+        pipeline.stop()
+    return stream.getvalue().splitlines()
+
+def test_text_log():
+    def log():
+        logger.info('Started %s.', 'server')
+        logger.info('Request %s.', 'one', extra={'client': '127.0.0.1'})
+        logger.debug('Not written %s.', 'debug')
+    lines = run_pipeline('info', 'text', log)
+    assert len(lines) == 2
+    # A record without a client gets a placeholder.
+    assert lines[0].startswith('- - - [')
+    assert lines[0].endswith('] Started server.')
+    assert lines[1].startswith('127.0.0.1 - - [')
+    assert lines[1].endswith('] Request one.')
+
+def test_levels():
+    def log():
+        logger.debug('Debug.')
+        logger.warning('Warning.')
+    assert len(run_pipeline('debug', 'text', log)) == 2
+    assert len(run_pipeline('error', 'text', log)) == 0
+
+def test_access_log_formats():
+    access = {'client': '127.0.0.1', 'method': 'GET', 'status': 200}
+    def log():
+        accessLogger.info(
+            '"%s" %s', 'GET / HTTP/1.1', 200,
+            extra={'client': '127.0.0.1', 'access': access})
+    line, = run_pipeline('info', 'json', log)
+    record = json.loads(line)
+    assert 'time' in record
+    del record['time']
+    assert record == access
+
+    line, = run_pipeline('info', 'text', log)
+    assert line.endswith('] "GET / HTTP/1.1" 200')
+    # The access log is independent of the main log level.
+    assert len(run_pipeline('error', 'text', log)) == 1
+    assert len(run_pipeline('info', 'off', log)) == 0
@@ -0,0 +1,183 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Tests of the metrics module. Run them with pytest, like this.
+
+    cd /path/where/you/cloned/captive-web-view/
+    python3 -m pytest harness
+"""
+#
+# Standard library imports, in alphabetic order.
+#
+# JSON module.
+# https://docs.python.org/3/library/json.html
+import json
+#
+# Regular expression module, for parsing the exposition format.
+# https://docs.python.org/3/library/re.html
+import re
+#
+# Module for monotonic time, used to wait for the metrics.
+# https://docs.python.org/3/library/time.html#time.monotonic
+import time
+#
+# Local imports.
+#
+# Command handler base class, and the handler that answers from JSON files.
+from harness.command_handler.base import CommandHandler, JSONFileCommandHandler
+#
+# Command handler dispatch, which has a collector.
+from harness.dispatch import Dispatcher
+#
+# Module under test.
+from harness.metrics import Metrics
+#
+# Harness, to be subclassed with a command handler.
+from harness.server import Main
+
+# Sample line of the Prometheus text exposition format.
+# https://prometheus.io/docs/instrumenting/exposition_formats/#text-format-details
+_sample = re.compile(
+    r'(?P<name>[a-zA-Z_:][a-zA-Z0-9_:]*)'
+    r'(?:\{(?P<labels>[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\]|\\.)*"'
+    r'(?:,[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\]|\\.)*")*)\})?'
+    r' (?P<value>\S+)')
+
+def parse_exposition(text):
+    """\
+    Dictionary of family name to type, and list of sample name, labels, and
+    value. Fails the test if the text isn't valid."""
+    families = {}
+    samples = []
+    for line in text.splitlines():
+        if line == '' or line.startswith('# HELP '):
+            continue
+        if line.startswith('# TYPE '):
+            _, _, name, type_ = line.split(' ')
+            assert name not in families, f'Family repeated "{line}".'
+            families[name] = type_
+            continue
+        match = _sample.fullmatch(line)
+        assert match is not None, f'Invalid sample "{line}".'
+        value = float(match['value'])
+        name = match['name']
+        family = re.sub(r'_(bucket|sum|count)$', '', name)
+        assert name in families or family in families, (
+            f'Sample before its family "{line}".')
+        samples.append((name, match['labels'], value))
+    return families, samples
+
+class Handler(CommandHandler):
+    commands = ('one',)
+    concurrency = 2
+
+def test_routes_and_collectors_parse():
+    metrics = Metrics()
+    metrics.observe('command', 'one', 200, 10, 0.002)
+    metrics.observe('static', 'C:\\a "b"\nc', 404, None, 0.5)
+    metrics.add_collector('assets', lambda: {'entries': 3, 'bytes': 1024})
+    metrics.add_collector(
+        'handlers', Dispatcher((Handler(), Handler())).as_dict, 'handler')
+    families, samples = parse_exposition(metrics.prometheus())
+
+    assert families['harness_requests_total'] == 'counter'
+    assert families['harness_request_duration_seconds'] == 'histogram'
+    assert (
+        'harness_requests_total', 'kind="command",name="one",status="200"', 1.0
+    ) in samples
+    assert (
+        'harness_response_bytes_total', 'kind="static",'
+        'name="C:\\\\a \\"b\\"\\nc"', 0.0) in samples
+    assert ('harness_assets_bytes', None, 1024.0) in samples
+    assert (
+        'harness_handlers_running', 'handler="Handler"', 0.0) in samples
+    assert 'harness_handlers_timeouts' in families
+
+def test_as_dict():
+    metrics = Metrics()
+    for seconds in (0.001, 0.002, 0.003):
+        metrics.observe('static', '/page.html', 200, 100, seconds)
+    with metrics.timer('handler', 'Handler') as timer:
+        timer.status = 'handled'
+    metrics.add_collector('pool', lambda: {'depth': 0})
+    metrics = metrics.as_dict()
+    route = metrics['routes']['static']['/page.html']
+    assert route['count'] == 3
+    assert route['statuses'] == {'200': 3}
+    assert route['bytes'] == 300
+    assert route['seconds']['max'] == 0.003
+    assert set(route['seconds']) == {'sum', 'max', 'p50', 'p95', 'p99'}
+    assert metrics['routes']['handler']['Handler']['statuses'] == {
+        'handled': 1}
+    assert metrics['pool'] == {'depth': 0}
+
+def test_labelled_collector_has_a_sample_per_label_value():
+    metrics = Metrics()
+    metrics.add_collector('memo', lambda: {
+        'One': {'hits': 1, 'misses': 2},
+        'Two': {'hits': 3, 'misses': 4, 'note': 'not a number'}
+    }, 'handler')
+    families, samples = parse_exposition(metrics.prometheus())
+
+    assert sorted(
+        name for name in families if name.startswith('harness_memo')
+    ) == ['harness_memo_hits', 'harness_memo_misses']
+    assert [
+        (labels, value) for name, labels, value in samples
+        if name == 'harness_memo_hits'
+    ] == [('handler="One"', 1.0), ('handler="Two"', 3.0)]
+
+def test_as_dict_keeps_nesting():
+    metrics = Metrics()
+    metrics.add_collector(
+        'handlers', lambda: {'One': {'running': 1}}, 'handler')
+    assert metrics.as_dict()['handlers'] == {'One': {'running': 1}}
+
+def test_command_names(tmp_path, serve, connect):
+    commands = tmp_path / 'commands'
+    commands.mkdir()
+    commands.joinpath('known.json').write_text('{"answer": 1}')
+    class CommandMain(Main):
+        def command_handlers(self):
+            yield JSONFileCommandHandler(commands)
+    main = serve(mainClass=CommandMain)
+    for command in ('known', 'known', 'other', 'secret-1234'):
+        connection = connect(main)
+        connection.request(
+            'POST', '/', json.dumps({'command': command}),
+            {'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        assert response.status == 200
+        response.read()
+        connection.close()
+
+    # Requests are observed after the response has been sent, so wait for the
+    # last one.
+    deadline = time.monotonic() + 5
+    while True:
+        routes = main.server.metrics.as_dict()['routes']
+        counts = {
+            name: route['count'] for name, route in routes['command'].items()}
+        if sum(counts.values()) == 4 or time.monotonic() > deadline:
+            break
+        time.sleep(0.01)
+    # A command answered by a fallback handler is counted under its name.
+    # Commands that nothing answered are counted together.
+    assert counts == {'known': 2, '(unknown)': 2}
+
+    connection = connect(main)
+    connection.request('GET', '/_metrics')
+    response = connection.getresponse()
+    families, _ = parse_exposition(response.read().decode())
+    connection.close()
+    assert families['harness_requests_total'] == 'counter'
+
+def test_head_of_metrics(serve, connect):
+    main = serve()
+    connection = connect(main)
+    connection.request('HEAD', '/_metrics')
+    response = connection.getresponse()
+    assert response.status == 200
+    assert int(response.getheader('Content-Length')) > 0
+    assert response.read() == b''
+    connection.close()
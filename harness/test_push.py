@@ -0,0 +1,146 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Tests of the push channels and their event streams. Run them with pytest, like
+this.
+
+    cd /path/where/you/cloned/captive-web-view/
+    python3 -m pytest harness
+"""
+#
+# Standard library imports, in alphabetic order.
+#
+# Asynchronous I/O module, used to test the asyncio waiter.
+# https://docs.python.org/3/library/asyncio.html
+import asyncio
+#
+# Module for monotonic time, used to wait for the subscriber.
+# https://docs.python.org/3/library/time.html#time.monotonic
+import time
+#
+# PyPI https://pypi.org/project/pytest
+import pytest
+#
+# Local imports.
+#
+# Module under test.
+from harness.push import PushHub, event_frame, heartbeat
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'Timed out.'
+        time.sleep(0.01)
+
+def test_event_frame():
+    assert event_frame(1, 'text') == b'id: 1\ndata: text\n\n'
+    assert event_frame(2, {'one': 1}, 'update') == (
+        b'id: 2\nevent: update\ndata: {"one": 1}\n\n')
+    # Each line of the data is a field of its own.
+    assert event_frame(3, 'a\r\nb\rc\nd') == (
+        b'id: 3\ndata: a\ndata: b\ndata: c\ndata: d\n\n')
+    with pytest.raises(ValueError):
+        event_frame(4, 'text', 'two\nlines')
+
+def test_publish_and_subscribe():
+    hub = PushHub()
+    assert hub.publish('news', 'before') == 0
+    first = hub.subscribe('news')
+    second = hub.subscribe('news')
+    other = hub.subscribe('other')
+    assert hub.publish('news', 'one') == 2
+    events = first.get(0)
+    assert [event.frame for event in events] == [event_frame(2, 'one')]
+    # The encoded event is shared.
+    assert second.get(0)[0].frame is events[0].frame
+    assert other.get(0) == []
+
+    hub.unsubscribe(second)
+    assert hub.publish('news', 'two') == 1
+    assert hub.as_dict() == {
+        'channels': 2, 'subscribers': 2, 'published': 3, 'dropped': 0}
+    hub.close()
+    assert first.get(0) is None
+    assert hub.subscribe('news').get(0) is None
+
+def test_last_event_id_replays_history():
+    hub = PushHub(historySize=2)
+    for data in ('one', 'two', 'three'):
+        hub.publish('news', data)
+    subscription = hub.subscribe('news', '2')
+    assert [event.id for event in subscription.get(0)] == [3]
+    # Event 1 isn't in the history any more, so only the later events are sent.
+    subscription = hub.subscribe('news', '0')
+    assert [event.id for event in subscription.get(0)] == [2, 3]
+    assert hub.subscribe('news', '3').get(0) == []
+    assert hub.subscribe('news', 'invalid').get(0) == []
+
+@pytest.mark.parametrize('dropPolicy,ids,closed', (
+    ('oldest', [2, 3], False),
+    ('newest', [1, 2], False),
+    ('disconnect', None, True),
+))
+def test_drop_policies(dropPolicy, ids, closed):
+    hub = PushHub(bufferSize=2, dropPolicy=dropPolicy)
+    subscription = hub.subscribe('news')
+    for data in ('one', 'two', 'three'):
+        hub.publish('news', data)
+    events = subscription.get(0)
+    assert (None if events is None else [event.id for event in events]) == ids
+    assert subscription.closed is closed
+    assert hub.as_dict()['dropped'] == 1
+
+def test_unknown_drop_policy():
+    with pytest.raises(ValueError):
+        PushHub(dropPolicy='other')
+
+def test_get_async():
+    hub = PushHub()
+    subscription = hub.subscribe('news')
+    async def wait():
+        # Published from another thread while the loop is waiting.
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.05, lambda: loop.run_in_executor(
+            None, hub.publish, 'news', 'one'))
+        started = time.monotonic()
+        events = await subscription.get_async(5)
+        return events, time.monotonic() - started
+    events, elapsed = asyncio.run(wait())
+    assert [event.id for event in events] == [1]
+    assert elapsed < 1
+    # Empty if the timeout elapses.
+    assert asyncio.run(subscription.get_async(0.01)) == []
+
+@pytest.mark.parametrize('engine', ('threads', 'asyncio'))
+def test_event_stream(serve, connect, engine):
+    main = serve('--engine', engine, '--heartbeat', '0.1')
+    push = main.server.push
+    connection = connect(main)
+    connection.request('GET', '/_events/news')
+    response = connection.getresponse()
+    assert response.status == 200
+    assert response.getheader('Content-type') == 'text/event-stream'
+    # The stream starts with a heartbeat.
+    assert response.readline() + response.readline() == heartbeat
+    wait_for(lambda: push.as_dict()['subscribers'] == 1)
+
+    push.publish('news', {'one': 1}, 'update')
+    frame = event_frame(1, {'one': 1}, 'update')
+    assert b''.join(
+        response.readline() for _ in range(frame.count(b'\n'))) == frame
+    # An idle stream gets heartbeats.
+    assert response.readline() + response.readline() == heartbeat
+    connection.close()
+
+    # A HEAD request gets the headers but doesn't subscribe.
+    connection = connect(main)
+    connection.request('HEAD', '/_events/news')
+    response = connection.getresponse()
+    assert (response.status, response.read()) == (200, b'')
+    assert response.getheader('Content-type') == 'text/event-stream'
+    connection.close()
+
+    connection = connect(main)
+    connection.request('GET', '/_events/')
+    assert connection.getresponse().status == 404
+    connection.close()
@@ -0,0 +1,94 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Tests of the request body reader. Run them with pytest, like this.
+
+    cd /path/where/you/cloned/captive-web-view/
+    python3 -m pytest harness
+"""
+#
+# Standard library imports, in alphabetic order.
+#
+# Module for asynchronous I/O, for the asynchronous reader.
+# https://docs.python.org/3/library/asyncio.html
+import asyncio
+#
+# Module for in-memory binary files, which stand in for the rfile.
+# https://docs.python.org/3/library/io.html#io.BytesIO
+from io import BytesIO
+#
+# PyPI https://pypi.org/project/pytest
+import pytest
+#
+# Local imports.
+#
+# Module under test.
+from harness.request_body import BodyError, read_body, read_body_async
+
+_chunked = {'Transfer-Encoding': 'chunked'}
+
+def read(data, headers, maxBytes=0):
+    rfile = BytesIO(data)
+    body = read_body(rfile, headers, maxBytes)
+    # Nothing after the body is read, so that the next request on the
+    # connection can be.
+    return body, rfile.read()
+
+def read_async(data, headers, maxBytes=0):
+    async def read():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await read_body_async(reader, headers, maxBytes)
+    return asyncio.run(read())
+
+@pytest.mark.parametrize('data, expected', (
+    (b'5\r\nhello\r\n6\r\n world\r\n0\r\n\r\nNEXT', b'hello world'),
+    (b'5;name=value\r\nhello\r\n0\r\n\r\nNEXT', b'hello'),
+    (b'A\n0123456789\n0\nTrailer: x\n\nNEXT', b'0123456789'),
+    (b'0\r\n\r\nNEXT', b''),
+))
+def test_chunked(data, expected):
+    assert read(data, _chunked) == (expected, b'NEXT')
+    assert read_async(data, _chunked) == expected
+
+@pytest.mark.parametrize('data, status', (
+    (b'x\r\nhello\r\n0\r\n\r\n', 400),
+    (b'-5\r\nhello\r\n0\r\n\r\n', 400),
+    (b'3\r\nhello\r\n0\r\n\r\n', 400),
+    (b'5\r\nhel', 400),
+    (b'5', 400),
+))
+def test_invalid_chunked(data, status):
+    with pytest.raises(BodyError) as raised:
+        read(data, _chunked)
+    assert raised.value.status == status
+
+def test_chunked_limit():
+    data = b'4\r\nabcd\r\n4\r\nefgh\r\n0\r\n\r\n'
+    assert read(data, _chunked, 8)[0] == b'abcdefgh'
+    for reader in (read, read_async):
+        with pytest.raises(BodyError) as raised:
+            reader(data, _chunked, 7)
+        assert raised.value.status == 413
+
+def test_content_length():
+    assert read(b'helloNEXT', {'Content-Length': '5'}) == (b'hello', b'NEXT')
+    assert read(b'NEXT', {}) == (b'', b'NEXT')
+    assert read_async(b'hello', {'Content-Length': '5'}) == b'hello'
+
+@pytest.mark.parametrize('headers, status', (
+    ({'Content-Length': '-1'}, 400),
+    ({'Content-Length': 'five'}, 400),
+    ({'Content-Length': '6'}, 413),
+    ({'Transfer-Encoding': 'gzip'}, 501),
+))
+def test_invalid_headers(headers, status):
+    with pytest.raises(BodyError) as raised:
+        read(b'hello', headers, 5)
+    assert raised.value.status == status
+
+def test_incomplete_content():
+    with pytest.raises(BodyError) as raised:
+        read(b'hell', {'Content-Length': '5'})
+    assert raised.value.status == 400
@@ -0,0 +1,130 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Tests of the response store. Run them with pytest, like this.
+
+    cd /path/where/you/cloned/captive-web-view/
+    python3 -m pytest harness
+"""
+#
+# Standard library imports, in alphabetic order.
+#
+# Module for shallow copies.
+# https://docs.python.org/3/library/copy.html
+import copy
+#
+# JSON module.
+# https://docs.python.org/3/library/json.html
+import json
+#
+# Module for pickling, which uses the same protocol as copying.
+# https://docs.python.org/3/library/pickle.html
+import pickle
+#
+# Module for sleeping past the check interval.
+# https://docs.python.org/3/library/time.html#time.sleep
+import time
+#
+# PyPI https://pypi.org/project/pytest
+import pytest
+#
+# Local imports.
+#
+# Module under test.
+from harness.response_store import EncodedResponse, ResponseStore
+
+def test_encoded_response_is_read_only():
+    response = EncodedResponse({'one': 1, 'list': [1, 2]})
+    assert response.encoded == json.dumps({'one': 1, 'list': [1, 2]}).encode()
+    for modify in (
+        lambda: response.__setitem__('two', 2),
+        lambda: response.__delitem__('one'),
+        lambda: response.update(two=2),
+        lambda: response.pop('one'),
+        lambda: response.setdefault('two', 2),
+        response.clear,
+        response.popitem,
+    ):
+        with pytest.raises(TypeError):
+            modify()
+    with pytest.raises(TypeError):
+        response |= {'two': 2}
+    assert response == {'one': 1, 'list': [1, 2]}
+
+    # A copy is a plain dictionary that can be modified.
+    modifiable = response.copy()
+    modifiable['two'] = 2
+    assert type(modifiable) is dict
+
+    for duplicate in (
+        copy.copy(response), pickle.loads(pickle.dumps(response))
+    ):
+        assert isinstance(duplicate, EncodedResponse)
+        assert duplicate == response
+        assert duplicate.encoded == response.encoded
+
+def test_with_items():
+    response = EncodedResponse({'one': 1})
+    extended = response.with_items(confirm='yes')
+    assert extended == {'one': 1, 'confirm': 'yes'}
+    assert json.loads(extended.encoded) == extended
+    assert response == {'one': 1}
+    # The extended response is only encoded once.
+    assert response.with_items(confirm='yes') is extended
+    assert response.with_items(confirm='no') == {'one': 1, 'confirm': 'no'}
+
+def test_get(tmp_path):
+    tmp_path.joinpath('one.json').write_text('{"one": 1}')
+    tmp_path.joinpath('list.json').write_text('[1, 2]')
+    tmp_path.joinpath('invalid.json').write_text('{')
+    tmp_path.joinpath('other.txt').write_text('{"other": true}')
+    store = ResponseStore(tmp_path, 0)
+    response = store.get('one')
+    assert isinstance(response, EncodedResponse)
+    assert response == {'one': 1}
+    # The same shared object is returned every time.
+    assert store.get('one') is response
+    # Any suffix is replaced, like the original handler did.
+    assert store.get('one.txt') is response
+    assert store.get('other') is None
+    assert store.get('missing') is None
+    assert len(store) == 3
+
+    # Other JSON values are loaded again for each get, so they can be modified.
+    loaded = store.get('list')
+    assert loaded == [1, 2]
+    loaded.append(3)
+    assert store.get('list') == [1, 2]
+
+    with pytest.raises(ValueError):
+        store.get('invalid')
+
+def test_reload_on_change(tmp_path):
+    path = tmp_path / 'one.json'
+    path.write_text('{"one": 1}')
+    interval = 0.05
+    store = ResponseStore(tmp_path, interval)
+    assert store.get('one') == {'one': 1}
+    assert store.get('two') is None
+
+    path.write_text('{"one": "changed"}')
+    tmp_path.joinpath('two.json').write_text('{"two": 2}')
+    # Not checked again until the interval has passed.
+    assert store.get('one') == {'one': 1}
+    time.sleep(interval * 2)
+    assert store.get('one') == {'one': 'changed'}
+    # The remembered miss was discarded by the reload.
+    assert store.get('two') == {'two': 2}
+
+    path.unlink()
+    time.sleep(interval * 2)
+    assert store.get('one') is None
+
+def test_no_reload_without_interval(tmp_path):
+    path = tmp_path / 'one.json'
+    path.write_text('{"one": 1}')
+    store = ResponseStore(tmp_path, 0)
+    assert store.get('one') == {'one': 1}
+    path.write_text('{"one": "changed"}')
+    time.sleep(0.01)
+    assert store.get('one') == {'one': 1}
@@ -0,0 +1,289 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Tests of the harness server, made by HTTP requests to a harness running in a
+thread. Run them with pytest, like this.
+
+    cd /path/where/you/cloned/captive-web-view/
+    python3 -m pytest harness
+
+The serve and connect fixtures are in the conftest.py file."""
+#
+# Standard library imports, in alphabetic order.
+#
+# JSON module.
+# https://docs.python.org/3/library/json.html
+import json
+#
+# Module for monotonic time, used to time concurrent batches.
+# https://docs.python.org/3/library/time.html#time.monotonic
+import time
+#
+# PyPI https://pypi.org/project/pytest
+import pytest
+#
+# Local imports.
+#
+# Command handler base class.
+from harness.command_handler.base import CommandHandler
+#
+# Harness, to be subclassed with command handlers.
+from harness.server import Main
+
+def get(connection, path, headers={}):
+    connection.request('GET', path, headers=headers)
+    response = connection.getresponse()
+    return response, response.read()
+
+def post(connection, commandObject):
+    connection.request(
+        'POST', '/', json.dumps(commandObject),
+        {'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    return response, json.loads(response.read())
+
+def test_not_modified(tmp_path, serve, connect):
+    tmp_path.joinpath('page.html').write_text('<p>Page</p>')
+    main = serve()
+    response, body = get(connect(main), '/page.html')
+    assert (response.status, body) == (200, b'<p>Page</p>')
+    etag = response.getheader('ETag')
+    lastModified = response.getheader('Last-Modified')
+
+    for headers in (
+        {'If-None-Match': etag},
+        {'If-None-Match': f'"other", W/{etag}'},
+        {'If-None-Match': '*'},
+        {'If-Modified-Since': lastModified},
+        # If-None-Match takes precedence.
+        {'If-None-Match': etag, 'If-Modified-Since': 'invalid'},
+    ):
+        response, body = get(connect(main), '/page.html', headers)
+        assert (response.status, body) == (304, b''), headers
+        assert response.getheader('ETag') == etag
+
+    for headers in (
+        {'If-None-Match': '"other"'},
+        {'If-Modified-Since': 'Thu, 01 Jan 1970 00:00:00 GMT'},
+        {'If-None-Match': '"other"', 'If-Modified-Since': lastModified},
+    ):
+        response, body = get(connect(main), '/page.html', headers)
+        assert response.status == 200, headers
+
+def test_byte_ranges(tmp_path, serve, connect):
+    tmp_path.joinpath('data.txt').write_bytes(bytes(range(100)))
+    main = serve()
+    response, body = get(connect(main), '/data.txt')
+    etag = response.getheader('ETag')
+    lastModified = response.getheader('Last-Modified')
+    assert response.getheader('Accept-Ranges') == 'bytes'
+
+    for rangeHeader, start, end in (
+        ('bytes=0-9', 0, 10),
+        ('bytes=90-', 90, 100),
+        ('bytes=-10', 90, 100),
+        ('bytes=95-1000', 95, 100),
+    ):
+        response, body = get(connect(main), '/data.txt', {'Range': rangeHeader})
+        assert response.status == 206, rangeHeader
+        assert body == bytes(range(start, end))
+        assert response.getheader('Content-Range') == (
+            f'bytes {start}-{end - 1}/100')
+
+    # Multiple ranges aren't supported, and malformed ranges are ignored.
+    for rangeHeader in (
+        'bytes=0-9,20-29', 'lines=0-9', 'bytes=5', 'bytes=-', 'bytes=5--3',
+        'bytes=+5-9', 'bytes=50-10'
+    ):
+        response, body = get(connect(main), '/data.txt', {'Range': rangeHeader})
+        assert (response.status, len(body)) == (200, 100), rangeHeader
+
+    for rangeHeader in ('bytes=100-', 'bytes=-0'):
+        response, body = get(connect(main), '/data.txt', {'Range': rangeHeader})
+        assert response.status == 416, rangeHeader
+        assert response.getheader('Content-Range') == 'bytes */100'
+
+    for ifRange, status in (
+        (etag, 206), (lastModified, 206), ('"changed"', 200), (f'W/{etag}', 200)
+    ):
+        response, body = get(connect(main), '/data.txt', {
+            'Range': 'bytes=0-9', 'If-Range': ifRange})
+        assert response.status == status, ifRange
+
+def test_weak_entity_tag_never_matches_if_range(tmp_path, serve, connect):
+    # Files over the sendfile threshold aren't cached, and have a weak entity
+    # tag.
+    data = bytes(range(256)) * 16
+    tmp_path.joinpath('big.bin').write_bytes(data)
+    main = serve('--sendfile', '1')
+    response, body = get(connect(main), '/big.bin')
+    etag = response.getheader('ETag')
+    assert etag.startswith('W/"')
+    assert body == data
+
+    response, body = get(connect(main), '/big.bin', {
+        'Range': 'bytes=1024-2047', 'If-Range': etag})
+    assert (response.status, body) == (200, data)
+    response, body = get(connect(main), '/big.bin', {'Range': 'bytes=1024-'})
+    assert (response.status, body) == (206, data[1024:])
+
+def test_persistent_connection(tmp_path, serve, connect):
+    tmp_path.joinpath('page.html').write_text('<p>Page</p>')
+    main = serve('--keep-alive', '--max-requests', '4')
+    connection = connect(main)
+    response, body = get(connection, '/page.html')
+    assert response.version == 11
+    assert not response.will_close
+    sock = connection.sock
+
+    # A 404 leaves the connection open.
+    response, body = get(connection, '/missing.html')
+    assert response.status == 404
+    assert not response.will_close
+    response, body = get(connection, '/page.html')
+    assert not response.will_close
+    assert connection.sock is sock
+
+    # The last request allowed on the connection.
+    response, body = get(connection, '/page.html')
+    assert (response.status, body) == (200, b'<p>Page</p>')
+    assert response.getheader('Connection') == 'close'
+    assert response.will_close
+
+def test_connection_closes_without_keep_alive(tmp_path, serve, connect):
+    tmp_path.joinpath('page.html').write_text('<p>Page</p>')
+    response, body = get(connect(serve()), '/page.html')
+    assert response.version == 10
+    assert response.will_close
+
+@pytest.mark.parametrize('engine', ('threads', 'asyncio'))
+def test_head(tmp_path, serve, connect, engine):
+    tmp_path.joinpath('page.html').write_text('<p>Page</p>')
+    main = serve('--engine', engine, '--keep-alive')
+    connection = connect(main)
+    for _ in range(2):
+        connection.request('HEAD', '/page.html')
+        response = connection.getresponse()
+        assert (response.status, response.read()) == (200, b'')
+        assert response.getheader('Content-Length') == '11'
+        assert response.getheader('ETag') is not None
+    connection.request('HEAD', '/missing.html')
+    response = connection.getresponse()
+    assert (response.status, response.read()) == (404, b'')
+    # The connection is still usable, so the HEAD responses had no body.
+    response, body = get(connection, '/page.html')
+    assert (response.status, body) == (200, b'<p>Page</p>')
+    connection.close()
+
+def test_asyncio_engine(tmp_path, serve, connect):
+    tmp_path.joinpath('page.html').write_text('<p>Page</p>')
+    main = serve('--engine', 'asyncio', '--keep-alive')
+    connection = connect(main)
+    response, body = get(connection, '/page.html')
+    assert (response.status, body) == (200, b'<p>Page</p>')
+    etag = response.getheader('ETag')
+
+    response, body = get(connection, '/page.html', {'If-None-Match': etag})
+    assert (response.status, body) == (304, b'')
+    response, body = get(connection, '/page.html', {'Range': 'bytes=3-6'})
+    assert (response.status, body) == (206, b'Page')
+    response, body = get(connection, '/missing.html')
+    assert response.status == 404
+    connection.close()
+
+def test_command_routes(serve, connect):
+    calls = []
+    class Declared(CommandHandler):
+        commands = ('one', 'two')
+        def __call__(self, commandObject, httpHandler):
+            calls.append('Declared')
+            command, _ = self.parseCommandObject(commandObject)
+            return None if command == 'two' else {'by': 'Declared'}
+    # A plain function has no commands attribute, so it's a fallback.
+    def fallback(commandObject, httpHandler):
+        calls.append('fallback')
+        return {'by': 'fallback'}
+    class CommandMain(Main):
+        def command_handlers(self):
+            yield fallback
+            yield Declared()
+    main = serve(mainClass=CommandMain)
+
+    for command, by, called in (
+        # Fallbacks are called before a declaring handler if they were
+        # registered first.
+        ('one', 'fallback', ['fallback']),
+        ('other', 'fallback', ['fallback']),
+    ):
+        calls.clear()
+        response, responseObject = post(connect(main), {'command': command})
+        assert response.status == 200
+        assert responseObject['by'] == by, command
+        assert calls == called
+
+    class DeclaredFirst(CommandMain):
+        def command_handlers(self):
+            yield Declared()
+            yield fallback
+    main = serve(mainClass=DeclaredFirst)
+    for command, by, called in (
+        ('one', 'Declared', ['Declared']),
+        # The declaring handler passes, so the fallback is called next.
+        ('two', 'fallback', ['Declared', 'fallback']),
+        # An undeclared command skips the declaring handler.
+        ('other', 'fallback', ['fallback']),
+        ({'not': 'hashable'}, 'fallback', ['fallback']),
+    ):
+        calls.clear()
+        _, responseObject = post(connect(main), {'command': command})
+        assert responseObject['by'] == by, command
+        assert calls == called
+
+class Echo(CommandHandler):
+    commands = ('echo', 'sleep')
+    def __call__(self, commandObject, httpHandler):
+        command, parameters = self.parseCommandObject(commandObject)
+        if command == 'sleep':
+            time.sleep(parameters)
+        return {'echo': parameters}
+
+class EchoMain(Main):
+    def command_handlers(self):
+        yield Echo()
+
+@pytest.mark.parametrize('engine', ('threads', 'asyncio'))
+def test_batch(serve, connect, engine):
+    main = serve('--engine', engine, mainClass=EchoMain)
+    items = [
+        {'command': 'echo', 'parameters': index} for index in range(3)]
+    for batch in (items, {'batch': items}):
+        response, responseObject = post(connect(main), batch)
+        assert response.status == 200
+        assert [item['echo'] for item in responseObject] == [0, 1, 2]
+
+    # An item that isn't a command object, like a nested batch, fails on its
+    # own.
+    _, responseObject = post(connect(main), [
+        {'command': 'echo', 'parameters': 'one'}, [], 'two',
+        {'command': 'other'}])
+    assert responseObject[0]['echo'] == 'one'
+    assert [
+        'failed' in item for item in responseObject
+    ] == [False, True, True, True]
+
+    # Not a batch because it has a command.
+    _, responseObject = post(connect(main), {
+        'command': 'echo', 'parameters': 'one', 'batch': items})
+    assert responseObject['echo'] == 'one'
+
+@pytest.mark.parametrize('engine', ('threads', 'asyncio'))
+def test_concurrent_batch(serve, connect, engine):
+    main = serve('--engine', engine, mainClass=EchoMain)
+    items = [{'command': 'sleep', 'parameters': 0.2} for _ in range(3)]
+    for concurrent, minimum, maximum in ((True, 0.2, 0.5), (False, 0.6, 5)):
+        started = time.monotonic()
+        _, responseObject = post(connect(main), {
+            'batch': items, 'concurrent': concurrent})
+        elapsed = time.monotonic() - started
+        assert [item['echo'] for item in responseObject] == [0.2] * 3
+        assert minimum <= elapsed < maximum, concurrent
@@ -0,0 +1,84 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Tests of the static file responses. Run them with pytest, like this.
+
+    cd /path/where/you/cloned/captive-web-view/
+    python3 -m pytest harness
+"""
+#
+# Standard library imports, in alphabetic order.
+#
+# Module for a simple object with attributes, used as a stand-in asset.
+# https://docs.python.org/3/library/types.html#types.SimpleNamespace
+from types import SimpleNamespace
+#
+# PyPI https://pypi.org/project/pytest
+import pytest
+#
+# Local imports.
+#
+# Module under test.
+from harness.static import byte_range, not_modified
+
+lastModified = 'Thu, 01 Jan 2026 00:00:00 GMT'
+asset = SimpleNamespace(
+    etag='"one"', lastModified=lastModified, size=100, mtime=1767225600)
+
+@pytest.mark.parametrize('rangeHeader,expected', (
+    (None, None),
+    ('bytes=0-9', (0, 10)),
+    ('bytes=90-', (90, 100)),
+    ('bytes=-10', (90, 100)),
+    ('bytes=-1000', (0, 100)),
+    ('bytes=95-1000', (95, 100)),
+    (' bytes = 5-5 ', (5, 6)),
+    # Ignored, so the whole file is sent.
+    ('bytes=0-1,5-6', None),
+    ('lines=0-9', None),
+    ('bytes=-', None),
+    ('bytes=5--3', None),
+    ('bytes=a-9', None),
+    ('bytes=50-10', None),
+))
+def test_byte_range(rangeHeader, expected):
+    headers = {} if rangeHeader is None else {'Range': rangeHeader}
+    assert byte_range(asset, headers) == expected
+
+@pytest.mark.parametrize('rangeHeader', ('bytes=100-', 'bytes=-0'))
+def test_unsatisfiable_byte_range(rangeHeader):
+    with pytest.raises(ValueError):
+        byte_range(asset, {'Range': rangeHeader})
+
+@pytest.mark.parametrize('ifRange,expected', (
+    ('"one"', (0, 10)),
+    (lastModified, (0, 10)),
+    ('"two"', None),
+    ('W/"one"', None),
+    ('Fri, 02 Jan 2026 00:00:00 GMT', None),
+))
+def test_if_range(ifRange, expected):
+    headers = {'Range': 'bytes=0-9', 'If-Range': ifRange}
+    assert byte_range(asset, headers) == expected
+
+def test_weak_entity_tag_never_matches_if_range():
+    weak = SimpleNamespace(**vars(asset))
+    weak.etag = 'W/"one"'
+    for ifRange in ('W/"one"', '"one"'):
+        headers = {'Range': 'bytes=0-9', 'If-Range': ifRange}
+        assert byte_range(weak, headers) is None
+
+@pytest.mark.parametrize('headers,expected', (
+    ({}, False),
+    ({'If-None-Match': '"one"'}, True),
+    ({'If-None-Match': 'W/"one"'}, True),
+    ({'If-None-Match': '"two", "one"'}, True),
+    ({'If-None-Match': '*'}, True),
+    ({'If-None-Match': '"two"'}, False),
+    ({'If-Modified-Since': lastModified}, True),
+    ({'If-Modified-Since': 'Wed, 31 Dec 2025 23:59:59 GMT'}, False),
+    ({'If-Modified-Since': 'invalid'}, False),
+    ({'If-None-Match': '"two"', 'If-Modified-Since': lastModified}, False),
+))
+def test_not_modified(headers, expected):
+    assert not_modified(asset, asset.etag, headers) is expected
@@ -0,0 +1,203 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Tests of the WebSocket frame codec. Run them with pytest, like this.
+
+    cd /path/where/you/cloned/captive-web-view/
+    python3 -m pytest harness
+"""
+#
+# Standard library imports, in alphabetic order.
+#
+# JSON module.
+# https://docs.python.org/3/library/json.html
+import json
+#
+# Module for TCP sockets, used as the WebSocket client.
+# https://docs.python.org/3/library/socket.html
+import socket
+#
+# PyPI https://pypi.org/project/pytest
+import pytest
+#
+# Local imports.
+#
+# Command handler base class.
+from harness.command_handler.base import CommandHandler
+#
+# Harness, to be subclassed with a command handler.
+from harness.server import Main
+#
+# Module under test.
+from harness import websocket
+from harness.websocket import (
+    BINARY, CLOSE, CONTINUATION, MESSAGE_TOO_BIG, PING, PROTOCOL_ERROR, TEXT,
+    FrameParser, ProtocolError, frame)
+
+_mask = b'\x01\x02\x03\x04'
+
+def client_frame(opcode, payload, final=True, mask=_mask):
+    """Frame as a client would send it, which is always masked."""
+    length = len(payload)
+    header = bytes(((0x80 if final else 0) | opcode,))
+    if length < 126:
+        header += bytes((0x80 | length,))
+    elif length < 0x10000:
+        header += bytes((0x80 | 126,)) + length.to_bytes(2, 'big')
+    else:
+        header += bytes((0x80 | 127,)) + length.to_bytes(8, 'big')
+    return header + mask + bytes(
+        byte ^ mask[index % 4] for index, byte in enumerate(payload))
+
+@pytest.mark.parametrize('length', (0, 1, 125, 126, 0xFFFF, 0x10000))
+def test_frame_lengths(length):
+    payload = bytes(range(256)) * (length // 256) + bytes(length % 256)
+    assert FrameParser(0).feed(client_frame(BINARY, payload)) == [
+        (BINARY, payload)]
+
+    header, sent = frame(BINARY, payload)
+    assert sent is payload
+    assert header[0] == 0x80 | BINARY
+    assert len(header) == (2 if length < 126 else 4 if length < 0x10000 else 10)
+
+def test_byte_at_a_time():
+    data = client_frame(TEXT, 'héllo'.encode()) + client_frame(PING, b'p')
+    parser = FrameParser(0)
+    messages = []
+    for index in range(len(data)):
+        messages += parser.feed(data[index:index + 1])
+    assert messages == [(TEXT, 'héllo'.encode()), (PING, b'p')]
+
+def test_fragments_with_control_frame_between():
+    parser = FrameParser(0)
+    assert parser.feed(
+        client_frame(TEXT, b'one ', False)
+        + client_frame(PING, b'')
+        + client_frame(CONTINUATION, b'two ', False)
+    ) == [(PING, b'')]
+    assert parser.feed(client_frame(CONTINUATION, b'three')) == [
+        (TEXT, b'one two three')]
+
+@pytest.mark.parametrize('data', (
+    # Not masked.
+    b'\x81\x01a',
+    # Reserved bit.
+    b'\xC1\x81' + _mask + b'a',
+    # Fragmented control frame.
+    client_frame(PING, b'', False),
+    # Control frame payload over 125 bytes.
+    client_frame(CLOSE, bytes(126)),
+    # Continuation of nothing.
+    client_frame(CONTINUATION, b'a'),
+    # New message in the middle of a fragmented one.
+    client_frame(TEXT, b'a', False) + client_frame(TEXT, b'b'),
+    # Reserved opcode.
+    client_frame(0x3, b'a'),
+))
+def test_protocol_errors(data):
+    with pytest.raises(ProtocolError) as raised:
+        FrameParser(0).feed(data)
+    assert raised.value.code == PROTOCOL_ERROR
+
+def test_size_limit_before_payload_arrives():
+    parser = FrameParser(10)
+    assert parser.feed(client_frame(TEXT, bytes(10))) == [(TEXT, bytes(10))]
+    with pytest.raises(ProtocolError) as raised:
+        # Only the header, without any of the payload.
+        parser.feed(client_frame(TEXT, bytes(11))[:6])
+    assert raised.value.code == MESSAGE_TOO_BIG
+
+def test_size_limit_of_fragments():
+    parser = FrameParser(10)
+    parser.feed(client_frame(TEXT, bytes(6), False))
+    with pytest.raises(ProtocolError) as raised:
+        parser.feed(client_frame(CONTINUATION, bytes(6)))
+    assert raised.value.code == MESSAGE_TOO_BIG
+
+def test_close_payload():
+    payload = websocket.close_payload(websocket.GOING_AWAY, 'bye')
+    assert payload == b'\x03\xE9bye'
+    assert len(websocket.close_payload(1000, 'x' * 200)) == 125
+
+def test_accept_key():
+    # Example from the RFC.
+    # https://www.rfc-editor.org/rfc/rfc6455#section-1.3
+    headers = {
+        'Upgrade': 'websocket', 'Connection': 'keep-alive, Upgrade',
+        'Sec-WebSocket-Key': 'dGhlIHNhbXBsZSBub25jZQ=='
+    }
+    assert websocket.accept_key(headers) == 's3pPLMBiTxaQ9kYGzzhZRbK+xOo='
+    with pytest.raises(ValueError):
+        websocket.accept_key({**headers, 'Sec-WebSocket-Key': 'c2hvcnQ='})
+
+class Echo(CommandHandler):
+    commands = ('echo',)
+    def __call__(self, commandObject, httpHandler):
+        _, parameters = self.parseCommandObject(commandObject)
+        return {'echo': parameters}
+
+class EchoMain(Main):
+    def command_handlers(self):
+        yield Echo()
+
+def read_exactly(client, length):
+    data = b''
+    while len(data) < length:
+        chunk = client.recv(length - len(data))
+        assert chunk != b'', 'Connection closed.'
+        data += chunk
+    return data
+
+def read_frame(client):
+    """Opcode and payload of a frame from the server."""
+    first, length = read_exactly(client, 2)
+    if length == 126:
+        length = int.from_bytes(read_exactly(client, 2), 'big')
+    elif length == 127:
+        length = int.from_bytes(read_exactly(client, 8), 'big')
+    return first & 0x0F, read_exactly(client, length)
+
+@pytest.mark.parametrize('engine', ('threads', 'asyncio'))
+def test_commands_over_websocket(serve, connect, engine):
+    main = serve('--engine', engine, mainClass=EchoMain)
+    client = socket.create_connection(
+        main.server.server_address[:2], timeout=5)
+    try:
+        client.sendall(
+            b'GET /_ws HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\n'
+            b'Connection: Upgrade\r\n'
+            b'Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\n'
+            b'Sec-WebSocket-Version: 13\r\n\r\n')
+        head = b''
+        while not head.endswith(b'\r\n\r\n'):
+            head += read_exactly(client, 1)
+        assert head.startswith(b'HTTP/1.1 101 ')
+        assert b's3pPLMBiTxaQ9kYGzzhZRbK+xOo=' in head
+
+        for requestID in (7, 'eight'):
+            client.sendall(client_frame(TEXT, json.dumps({
+                'id': requestID, 'command': 'echo', 'parameters': requestID
+            }).encode()))
+            opcode, payload = read_frame(client)
+            assert opcode == TEXT
+            message = json.loads(payload)
+            assert message['id'] == requestID
+            assert message['response']['echo'] == requestID
+
+        client.sendall(client_frame(PING, b'ping'))
+        assert read_frame(client) == (websocket.PONG, b'ping')
+        client.sendall(client_frame(CLOSE, websocket.close_payload(1000)))
+        assert read_frame(client) == (CLOSE, b'\x03\xE8')
+    finally:
+        client.close()
+
+    # The handshake has to be a GET.
+    connection = connect(main)
+    connection.request('HEAD', '/_ws', headers={
+        'Upgrade': 'websocket', 'Connection': 'Upgrade',
+        'Sec-WebSocket-Key': 'dGhlIHNhbXBsZSBub25jZQ==',
+        'Sec-WebSocket-Version': '13'})
+    response = connection.getresponse()
+    assert response.status == 405
+    assert response.getheader('Allow') == 'GET'
+    connection.close()
@@ -0,0 +1,73 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Tests of the worker pool server mode. Run them with pytest, like this.
+
+    cd /path/where/you/cloned/captive-web-view/
+    python3 -m pytest harness
+"""
+#
+# Standard library imports, in alphabetic order.
+#
+# Module for TCP sockets, used to hold connections open without a request.
+# https://docs.python.org/3/library/socket.html
+import socket
+#
+# Module for monotonic time, used to wait for the worker.
+# https://docs.python.org/3/library/time.html#time.monotonic
+import time
+#
+# Local imports.
+#
+# Module under test.
+from harness.worker_pool import PoolMetrics
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'Timed out.'
+        time.sleep(0.01)
+
+def test_pool_metrics():
+    metrics = PoolMetrics()
+    metrics.record_queued(1)
+    metrics.record_queued(3)
+    metrics.record_rejected()
+    metrics.record_wait(0.5)
+    metrics.record_wait(1.5)
+    assert metrics.as_dict() == {
+        'accepted': 2, 'rejected': 1, 'maxDepth': 3,
+        'waits': 2, 'waitMean': 1.0, 'waitMax': 1.5}
+
+def test_full_queue_gets_service_unavailable(tmp_path, serve, connect):
+    tmp_path.joinpath('index.html').write_text('index')
+    main = serve('--workers', '1', '--queue', '1')
+    address = main.server.server_address[:2]
+    # The first connection occupies the only worker, which waits for a request
+    # that isn't sent. The second connection fills the queue.
+    busy = socket.create_connection(address, timeout=5)
+    wait_for(lambda: main.server.poolMetrics.waits == 1)
+    queued = socket.create_connection(address, timeout=5)
+    wait_for(lambda: main.server.poolMetrics.accepted == 2)
+    try:
+        connection = connect(main)
+        connection.request('GET', '/index.html')
+        response = connection.getresponse()
+        response.read()
+        assert response.status == 503
+        assert response.getheader('Retry-After') == '1'
+        connection.close()
+        assert main.server.poolMetrics.rejected == 1
+    finally:
+        busy.close()
+        queued.close()
+    # The queue is empty once the worker has taken the second connection.
+    wait_for(lambda: main.server.poolMetrics.waits == 2)
+
+    # Once the held connections close, the worker serves requests again.
+    connection = connect(main)
+    connection.request('GET', '/index.html')
+    response = connection.getresponse()
+    assert response.status == 200
+    assert response.read() == b'index'
+    connection.close()
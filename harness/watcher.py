@@ -0,0 +1,79 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Polling watcher for the Captive Web View python harness.
+
+The standard library has no portable file system notification interface, so
+changes are detected by polling a cheap snapshot, for example the modification
+times of some directories, in a daemon thread."""
+#
+# Standard library imports, in alphabetic order.
+#
+# Module for threads and events.
+# https://docs.python.org/3/library/threading.html
+import threading
+
+class Watcher:
+    def __init__(self, snapshot, callback, interval=1.0):
+        """\
+        snapshot is a function that returns a comparable value. callback is
+        called with the new value whenever it differs from the previous one.
+        interval is the number of seconds between calls to snapshot."""
+        self._snapshot = snapshot
+        self._callback = callback
+        self._interval = interval
+        self._stopEvent = threading.Event()
+        self._thread = None
+        self._last = None
+
+    @property
+    def interval(self):
+        return self._interval
+
+    def start(self):
+        self._last = self._snapshot()
+        self._stopEvent.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=self.__class__.__name__, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopEvent.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def check(self):
+        """Take a snapshot now and call back if it changed. Returns True if it
+        changed."""
+        current = self._snapshot()
+        if current == self._last:
+            return False
+        self._last = current
+        self._callback(current)
+        return True
+
+    def _run(self):
+        # The wait() returns True when the stop event is set.
+        while not self._stopEvent.wait(self._interval):
+            try:
+                self.check()
+            except OSError:
+                # For example, a directory was removed. Try again next time.
+                pass
+
+def stat_snapshot(paths):
+    """Snapshot function that returns the modification time and size of each
+    path, or None for paths that don't exist."""
+    def snapshot():
+        stats = []
+        for path in paths:
+            try:
+                stat = path.stat()
+            except OSError:
+                stats.append(None)
+            else:
+                stats.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(stats)
+    return snapshot
@@ -0,0 +1,181 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+WebSocket protocol for the Captive Web View python harness server.
+
+Only what the command bridge needs is implemented: the opening handshake, text
+and binary messages, which can be fragmented, ping, pong, and close. See:
+https://www.rfc-editor.org/rfc/rfc6455
+
+The FrameParser class doesn't do any I/O. Each server engine reads bytes from
+its connection in its own way and feeds them to the parser, which returns the
+complete messages."""
+#
+# Standard library imports, in alphabetic order.
+#
+# Module for base 64 encoding, used in the handshake.
+# https://docs.python.org/3/library/base64.html
+import base64
+#
+# Module for the SHA-1 digest, used in the handshake.
+# https://docs.python.org/3/library/hashlib.html
+import hashlib
+
+# https://www.rfc-editor.org/rfc/rfc6455#section-1.3
+handshakeGUID = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+version = '13'
+
+# Opcodes.
+# https://www.rfc-editor.org/rfc/rfc6455#section-5.2
+CONTINUATION = 0x0
+TEXT = 0x1
+BINARY = 0x2
+CLOSE = 0x8
+PING = 0x9
+PONG = 0xA
+
+# Close status codes.
+# https://www.rfc-editor.org/rfc/rfc6455#section-7.4.1
+NORMAL_CLOSURE = 1000
+GOING_AWAY = 1001
+PROTOCOL_ERROR = 1002
+MESSAGE_TOO_BIG = 1009
+
+class ProtocolError(Exception):
+    """\
+    Frame that breaks the protocol. The code property is the status code to
+    close the connection with."""
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+def accept_key(headers):
+    """\
+    Value of the Sec-WebSocket-Accept header of the handshake response. Raises
+    ValueError if the request headers aren't a valid handshake."""
+    if headers.get('Upgrade', '').strip().lower() != 'websocket':
+        raise ValueError('Upgrade header isn\'t websocket.')
+    connection = headers.get('Connection', '')
+    if 'upgrade' not in (
+        token.strip().lower() for token in connection.split(',')
+    ):
+        raise ValueError('Connection header doesn\'t have upgrade.')
+    key = headers.get('Sec-WebSocket-Key', '').strip()
+    try:
+        if len(base64.b64decode(key, validate=True)) != 16:
+            raise ValueError()
+    except ValueError:
+        raise ValueError(f'Invalid Sec-WebSocket-Key "{key}".')
+    return base64.b64encode(
+        hashlib.sha1(key.encode() + handshakeGUID).digest()).decode()
+
+def frame(opcode, payload=b''):
+    """\
+    Header and payload of an unfragmented frame from the server, which is never
+    masked. They are returned separately so that a large payload isn't copied
+    to join them."""
+    length = len(payload)
+    if length < 126:
+        header = bytes((0x80 | opcode, length))
+    elif length < 0x10000:
+        header = bytes((0x80 | opcode, 126)) + length.to_bytes(2, 'big')
+    else:
+        header = bytes((0x80 | opcode, 127)) + length.to_bytes(8, 'big')
+    return header, payload
+
+def close_payload(code, reason=''):
+    return code.to_bytes(2, 'big') + reason.encode()[:123]
+
+def _unmask(data, mask):
+    # XOR of the whole payload as one big integer, which is much quicker than a
+    # loop over the bytes in Python.
+    length = len(data)
+    if length == 0:
+        return b''
+    repeated = (mask * (length // 4 + 1))[:length]
+    return (
+        int.from_bytes(data, 'little') ^ int.from_bytes(repeated, 'little')
+    ).to_bytes(length, 'little')
+
+class FrameParser:
+    def __init__(self, maxBytes):
+        """maxBytes is the size limit of a message, or zero for no limit."""
+        self._maxBytes = maxBytes
+        self._buffer = bytearray()
+        # Opcode and payload of a fragmented message, while it is received.
+        self._opcode = None
+        self._fragments = None
+
+    def feed(self, data):
+        """\
+        List of the complete messages in the data, and any earlier data, as
+        tuples of opcode and payload. Raises ProtocolError."""
+        self._buffer += data
+        messages = []
+        while True:
+            parsed = self._frame()
+            if parsed is None:
+                return messages
+            final, opcode, payload = parsed
+            if opcode >= CLOSE:
+                # Control frames can come between the fragments of a message.
+                if not final or len(payload) > 125:
+                    raise ProtocolError(
+                        PROTOCOL_ERROR, 'Invalid control frame.')
+                messages.append((opcode, payload))
+                continue
+
+            if opcode == CONTINUATION:
+                if self._fragments is None:
+                    raise ProtocolError(
+                        PROTOCOL_ERROR, 'Continuation without a message.')
+                self._fragments += payload
+            elif opcode in (TEXT, BINARY):
+                if self._fragments is not None:
+                    raise ProtocolError(
+                        PROTOCOL_ERROR, 'New message before the last ended.')
+                self._opcode = opcode
+                self._fragments = bytearray(payload)
+            else:
+                raise ProtocolError(PROTOCOL_ERROR, f'Opcode {opcode:#x}.')
+            self._check_size(len(self._fragments))
+            if final:
+                messages.append((self._opcode, bytes(self._fragments)))
+                self._opcode = None
+                self._fragments = None
+
+    def _check_size(self, size):
+        if self._maxBytes > 0 and size > self._maxBytes:
+            raise ProtocolError(
+                MESSAGE_TOO_BIG,
+                f'Message is more than {self._maxBytes} bytes.')
+
+    def _frame(self):
+        buffer = self._buffer
+        if len(buffer) < 2:
+            return None
+        if buffer[0] & 0x70:
+            raise ProtocolError(PROTOCOL_ERROR, 'Reserved bits set.')
+        if not buffer[1] & 0x80:
+            raise ProtocolError(PROTOCOL_ERROR, 'Client frame isn\'t masked.')
+        length = buffer[1] & 0x7F
+        offset = 2
+        if length == 126:
+            offset = 4
+        elif length == 127:
+            offset = 10
+        if len(buffer) < offset:
+            return None
+        if offset > 2:
+            length = int.from_bytes(buffer[2:offset], 'big')
+        # Check before the payload arrives, so that it isn't buffered.
+        self._check_size(
+            length + (0 if self._fragments is None else len(self._fragments)))
+        end = offset + 4 + length
+        if len(buffer) < end:
+            return None
+        payload = _unmask(buffer[offset + 4:end], buffer[offset:offset + 4])
+        final = bool(buffer[0] & 0x80)
+        opcode = buffer[0] & 0x0F
+        del buffer[:end]
+        return final, opcode, payload
@@ -0,0 +1,152 @@
+# Copyright 2026 VMware, Inc.
+# SPDX-License-Identifier: BSD-2-Clause
+"""\
+Fixed size worker pool for the Captive Web View python harness server.
+
+Accepted connections are put in a bounded queue and handled by a fixed number of
+worker threads. If the queue is full then the connection is answered with 503
+Service Unavailable and a Retry-After header, and closed, instead of being
+queued. That applies back pressure to clients instead of spawning an unbounded
+number of threads."""
+#
+# Standard library imports, in alphabetic order.
+#
+# Module for a thread-safe bounded queue.
+# https://docs.python.org/3/library/queue.html
+import queue
+#
+# Module for threads and locks.
+# https://docs.python.org/3/library/threading.html
+import threading
+#
+# Module for monotonic time, used to measure time spent in the queue.
+# https://docs.python.org/3/library/time.html#time.monotonic
+import time
+
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.accepted = 0
+        self.rejected = 0
+        self.maxDepth = 0
+        self.waits = 0
+        self.waitTotal = 0.0
+        self.waitMax = 0.0
+
+    def record_queued(self, depth):
+        with self._lock:
+            self.accepted += 1
+            self.maxDepth = max(self.maxDepth, depth)
+
+    def record_rejected(self):
+        with self._lock:
+            self.rejected += 1
+
+    def record_wait(self, seconds):
+        with self._lock:
+            self.waits += 1
+            self.waitTotal += seconds
+            self.waitMax = max(self.waitMax, seconds)
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'accepted': self.accepted,
+                'rejected': self.rejected,
+                'maxDepth': self.maxDepth,
+                'waits': self.waits,
+                'waitMean': (
+                    self.waitTotal / self.waits if self.waits > 0 else 0.0),
+                'waitMax': self.waitMax
+            }
+
+class WorkerPoolMixIn:
+    """\
+    Mix-in for a socketserver.TCPServer subclass, to be used instead of
+    ThreadingMixIn."""
+    # Seconds for the Retry-After header in a 503 response.
+    retryAfter = 1
+
+    def __init__(self, *args, workers=8, queueSize=64, **kwargs):
+        self._workerCount = workers
+        self._queue = queue.Queue(queueSize)
+        self._workers = []
+        self.poolMetrics = PoolMetrics()
+        super().__init__(*args, **kwargs)
+
+    @property
+    def queueDepth(self):
+        return self._queue.qsize()
+
+    @property
+    def workerCount(self):
+        return self._workerCount
+
+    @property
+    def queueSize(self):
+        return self._queue.maxsize
+
+    # Override.
+    def server_activate(self):
+        super().server_activate()
+        for index in range(self._workerCount):
+            worker = threading.Thread(
+                target=self._work, name=f'Worker{index}', daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    # Override.
+    def process_request(self, request, client_address):
+        try:
+            self._queue.put_nowait(
+                (request, client_address, time.monotonic()))
+        except queue.Full:
+            self.poolMetrics.record_rejected()
+            self._reject(request)
+            return
+        self.poolMetrics.record_queued(self._queue.qsize())
+
+    # Override.
+    def server_close(self):
+        super().server_close()
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            request, client_address, queued = item
+            self.poolMetrics.record_wait(time.monotonic() - queued)
+            # Same as the ThreadingMixIn.process_request_thread() method.
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    def _reject(self, request):
+        try:
+            # Read whatever of the request has already arrived so that closing
+            # the socket doesn't reset the connection before the client reads
+            # the response.
+            request.setblocking(False)
+            try:
+                request.recv(64 * 1024)
+            except OSError:
+                pass
+            request.setblocking(True)
+            request.sendall(b''.join((
+                b'HTTP/1.0 503 Service Unavailable\r\n',
+                f'Retry-After: {self.retryAfter}\r\n'.encode(),
+                b'Content-Length: 0\r\n',
+                b'Connection: close\r\n\r\n')))
+        except OSError:
+            pass
+        finally:
+            self.shutdown_request(request)